@@ -1,44 +1,12 @@
-import os
 import streamlit as st
-import joblib
 
-# --- Paths ---
-# Use "models" if that's your repo folder name
-MODEL_DIR = "model"
-MODEL_FILENAME = "deepsea_model_v2.pkl"  # change if your file is named differently
-MODEL_PATH = os.path.join(MODEL_DIR, MODEL_FILENAME)
+from inference import MODEL_PATH, interpret_score, predict_p_hot
+from inference import load_model as _load_model
 
 
 @st.cache_resource
 def load_model(path: str = MODEL_PATH):
-    return joblib.load(path)
-
-
-def interpret_score(score: float):
-    """
-    Interpret probability that the text is Emotionally Dependent / Hot (class 1).
-    Returns (verdict, description).
-    """
-    if score < 0.3:
-        verdict = "🧊 Mostly Task-Oriented / Side-by-Side"
-        desc = (
-            "The model sees the interaction as primarily focused on tasks, ideas, or external goals. "
-            "Signals of emotional dependency are low."
-        )
-    elif score < 0.7:
-        verdict = "🟡 Mixed Orientation / Ambiguous"
-        desc = (
-            "The model detects a blend of task/idea focus and relational/emotional cues. "
-            "This often happens in supportive friendships or high-frequency collaboration."
-        )
-    else:
-        verdict = "🔥 Mostly Emotionally Dependent / Face-to-Face"
-        desc = (
-            "The model detects strong relational-focus signals such as emotional validation-seeking, "
-            "prioritization of the interaction, dependency language, or boundary-blurring patterns."
-        )
-
-    return verdict, desc
+    return _load_model(path)
 
 
 def main():
@@ -59,7 +27,7 @@ def main():
     except FileNotFoundError:
         st.error(
             f"Model file not found at: `{MODEL_PATH}`\n\n"
-            "Check that the model exists and that `MODEL_DIR` / `MODEL_FILENAME` match your repo."
+            "Check that the model exists and that `MODEL_DIR` / `MODEL_FILENAME` in `src/inference.py` match your repo."
         )
         return
 
@@ -87,13 +55,8 @@ def main():
             st.warning("Please paste some text first.")
             return
 
-        # Predict probability for class 1
-        proba = model.predict_proba([text])[0]
-
-        # Safer than assuming proba[1] is class 1:
-        # map by model.classes_
-        class_to_proba = {int(c): float(p) for c, p in zip(model.classes_, proba)}
-        p_hot = class_to_proba.get(1, float(proba[-1]))
+        # Predict probability for class 1 (mapped by model.classes_)
+        p_hot = float(predict_p_hot(model, [text])[0])
 
         verdict, desc = interpret_score(p_hot)
 
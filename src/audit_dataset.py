@@ -13,16 +13,19 @@ import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 import argparse
 
+from feature_cache import FeatureCache
+
 DATA_DIR = "data"
 DEFAULT_INPUT = os.path.join(DATA_DIR, "deepsea_conversations_llm_v1.csv")
 
 
-def audit_dataset(csv_path: str):
+def audit_dataset(csv_path: str, use_cache: bool = True):
     """
     Audit the dataset and print statistics.
     
     Args:
         csv_path: Path to the CSV file
+        use_cache: Reuse cached TF-IDF matrices for unchanged files
     """
     if not os.path.exists(csv_path):
         print(f"❌ Error: File not found: {csv_path}")
@@ -100,6 +103,7 @@ def audit_dataset(csv_path: str):
     print("=" * 60)
     print("(Higher TF-IDF = more distinctive to that class)\n")
     
+    cache = FeatureCache(enabled=use_cache)
     for label in sorted(df['label'].unique()):
         label_name = df[df['label'] == label]['label_name'].iloc[0] if 'label_name' in df.columns else f"label_{label}"
         label_texts = df[df['label'] == label]['text'].tolist()
@@ -115,10 +119,10 @@ def audit_dataset(csv_path: str):
         )
         
         all_texts = label_texts + other_texts
-        vectorizer.fit(all_texts)
+        vectorizer, all_vectors = cache.fit_transform(vectorizer, all_texts, csv_path, tag=f"audit_label={label}")
         
-        # Transform label texts
-        label_vectors = vectorizer.transform(label_texts)
+        # Label texts come first in all_texts, so their rows are the leading block
+        label_vectors = all_vectors[:len(label_texts)]
         
         # Calculate mean TF-IDF scores for this class
         mean_scores = label_vectors.mean(axis=0).A1
@@ -136,6 +140,8 @@ def audit_dataset(csv_path: str):
             score = mean_scores[idx]
             print(f"  {token:30s} {score:.4f}")
         print()
+    print(cache.summary())
+    print()
     
     # Check for potential shortcut words (words that appear in one class but not the other)
     print("=" * 60)
@@ -181,10 +187,12 @@ def main():
     parser = argparse.ArgumentParser(description="Audit the LLM-generated dataset")
     parser.add_argument("--input", type=str, default=DEFAULT_INPUT,
                        help=f"Input CSV path (default: {DEFAULT_INPUT})")
+    parser.add_argument("--no_cache", action="store_true",
+                       help="Re-vectorize instead of using the feature cache")
     
     args = parser.parse_args()
     
-    return audit_dataset(args.input)
+    return audit_dataset(args.input, use_cache=not args.no_cache)
 
 
 if __name__ == "__main__":
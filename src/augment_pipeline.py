@@ -0,0 +1,188 @@
+"""
+Streaming text augmentation for template and LLM-generated datasets.
+
+The perturbations of generate_data_v2.py are exposed here as composable
+stages. A pipeline takes any iterator of row dicts (with `text` and `label`)
+and lazily yields augmented rows, so a large corpus, e.g. LLM-generated rows
+read chunk by chunk from deepsea_conversations_llm_v1.csv, can be augmented
+without intermediate files or in-memory lists.
+
+Each stage has its own probability of applying to a row, its own seeded
+random stream and optionally the labels it applies to. For the same input rows
+(in the same order), the output is reproducible.
+
+Stages (name -> generate_data_v2 function, default labels):
+    template_breaking       add_template_breaking_noise (paraphrasing, structure, length)
+    soften_cues             soften_explicit_cues
+    platonic_hard_negative  add_platonic_hard_negative_noise (label 0 only)
+    emotional_hard_negative add_emotional_hard_negative_noise (label 1 only)
+
+Usage:
+    stages = [AugmentationStage("template_breaking", prob=0.6, seed=1),
+              AugmentationStage("platonic_hard_negative", prob=0.3, seed=2)]
+    for row in augment(iter_rows("data/deepsea_conversations_llm_v1.csv"), stages):
+        ...
+
+    python src/augment_pipeline.py --input data/deepsea_conversations_llm_v1.csv \\
+        --output data/deepsea_conversations_llm_v1_aug.csv \\
+        --stage template_breaking:0.6 --stage soften_cues:0.5 --keep_original
+"""
+
+import os
+import sys
+import random
+import argparse
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dataset_io import CsvAppender, csv_to_parquet, detect_format, iter_dataset_chunks
+from generate_data_v2 import (add_emotional_hard_negative_noise, add_platonic_hard_negative_noise,
+                              add_template_breaking_noise, soften_explicit_cues)
+
+# name -> (function(text, rng=..., **params), labels it applies to (None = all), default params)
+STAGE_FUNCTIONS: Dict[str, Tuple[Callable, Optional[Tuple[int, ...]], Dict]] = {
+    "template_breaking": (add_template_breaking_noise, None, {"prob": 0.6}),
+    "soften_cues": (soften_explicit_cues, None, {"prob": 0.5}),
+    "platonic_hard_negative": (add_platonic_hard_negative_noise, (0,), {}),
+    "emotional_hard_negative": (add_emotional_hard_negative_noise, (1,), {}),
+}
+AUGMENTATIONS_COLUMN = "augmentations"
+
+
+def applied_stages(row: Dict) -> str:
+    """The row's `augmentations` value, "" if missing (pandas reads empty cells as NaN)."""
+    value = row.get(AUGMENTATIONS_COLUMN)
+    return value if isinstance(value, str) else ""
+
+
+class AugmentationStage:
+    """
+    One perturbation applied to a stream of rows.
+
+    Args:
+        name: Stage name (see STAGE_FUNCTIONS)
+        prob: Chance that the stage runs on an eligible row
+        seed: Seed of the stage's random stream
+        labels: Labels the stage applies to (default: the stage's own default)
+        **params: Extra arguments for the perturbation function (e.g. prob=0.8 for
+            template_breaking's internal per-technique probability)
+    """
+
+    def __init__(self, name: str, prob: float = 1.0, seed: int = 0,
+                 labels: Optional[Sequence[int]] = None, **params):
+        if name not in STAGE_FUNCTIONS:
+            raise ValueError(f"Unknown augmentation stage: {name} (expected one of {list(STAGE_FUNCTIONS)})")
+        if not 0.0 <= prob <= 1.0:
+            raise ValueError(f"prob must be between 0.0 and 1.0, got {prob}")
+        fn, default_labels, default_params = STAGE_FUNCTIONS[name]
+        self.name = name
+        self.prob = prob
+        self.seed = seed
+        self.labels = set(labels if labels is not None else default_labels or ()) or None
+        self.params = {**default_params, **params}
+        self._fn = fn
+        self._rng = random.Random(f"{seed}:{name}")
+
+    def augment_row(self, row: Dict) -> Dict:
+        """Return `row`, or a perturbed copy of it with the stage recorded in `augmentations`."""
+        if self.labels is not None and int(row["label"]) not in self.labels:
+            return row
+        if self._rng.random() >= self.prob:
+            return row
+        text = self._fn(row["text"], rng=self._rng, **self.params)
+        if text == row["text"]:
+            return row
+        applied = applied_stages(row)
+        return {**row, "text": text, AUGMENTATIONS_COLUMN: f"{applied}+{self.name}" if applied else self.name}
+
+    def __call__(self, rows: Iterable[Dict]) -> Iterator[Dict]:
+        for row in rows:
+            yield self.augment_row(row)
+
+
+def augment(rows: Iterable[Dict], stages: Sequence[AugmentationStage], keep_original: bool = False) -> Iterator[Dict]:
+    """
+    Lazily run `rows` through `stages` in order.
+
+    Args:
+        rows: Input rows (dicts with at least `text` and `label`)
+        stages: Stages to apply, in order
+        keep_original: Also yield each input row before its augmented copy
+            (copies get "<id>-aug" ids; unchanged rows are not duplicated)
+    """
+    for row in rows:
+        augmented = row
+        for stage in stages:
+            augmented = stage.augment_row(augmented)
+        if not keep_original:
+            yield augmented
+            continue
+        yield row
+        if augmented is not row:
+            if "id" in augmented:
+                augmented = {**augmented, "id": f"{augmented['id']}-aug"}
+            yield augmented
+
+
+def iter_rows(path: str, chunk_size: int = 10_000) -> Iterator[Dict]:
+    """Rows of a CSV/Parquet dataset, read chunk by chunk."""
+    for chunk in iter_dataset_chunks(path, chunk_size):
+        yield from chunk.to_dict("records")
+
+
+def parse_stage(spec: str, seed: int) -> AugmentationStage:
+    """"name" or "name:prob" -> AugmentationStage seeded from `seed` and the stage name."""
+    name, _, prob = spec.partition(":")
+    return AugmentationStage(name, float(prob) if prob else 1.0, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a dataset through text augmentation stages")
+    parser.add_argument("--input", type=str, required=True,
+                        help="Input dataset (CSV/Parquet with text and label columns)")
+    parser.add_argument("--output", type=str, required=True,
+                        help="Output dataset (.csv or .parquet)")
+    parser.add_argument("--stage", type=str, action="append", default=None,
+                        help=f"Stage as name[:prob], repeatable, applied in order ({', '.join(STAGE_FUNCTIONS)})")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Seed for all stages (default: 42)")
+    parser.add_argument("--keep_original", action="store_true",
+                        help="Keep every input row and add augmented copies after it")
+    parser.add_argument("--chunk_size", type=int, default=10_000,
+                        help="Rows read and written at a time (default: 10000)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ Error: File not found: {args.input}")
+        return 1
+    try:
+        stages = [parse_stage(spec, args.seed) for spec in (args.stage or ["template_breaking:0.6"])]
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    columns = list(next(iter_dataset_chunks(args.input, 1)).columns)
+    fieldnames = columns + ([AUGMENTATIONS_COLUMN] if AUGMENTATIONS_COLUMN not in columns else [])
+    staging_path = args.output if detect_format(args.output) == "csv" else os.path.splitext(args.output)[0] + ".partial.csv"
+
+    print(f"Augmenting {args.input} with: " + ", ".join(f"{s.name} (p={s.prob})" for s in stages))
+    n_rows = n_augmented = 0
+    batch: List[Dict] = []
+    with CsvAppender(staging_path, fieldnames) as out:
+        for row in augment(iter_rows(args.input, args.chunk_size), stages, args.keep_original):
+            n_rows += 1
+            n_augmented += bool(applied_stages(row))
+            batch.append(row)
+            if len(batch) >= args.chunk_size:
+                out.append(batch)
+                batch = []
+        out.append(batch)
+
+    if staging_path != args.output:
+        csv_to_parquet(staging_path, args.output)
+        os.remove(staging_path)
+    print(f"✓ Wrote {n_rows} rows ({n_augmented} augmented) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: phrase-replacement augmentation of the v2 template texts.
+
+Compares add_paraphrasing_variation in generate_data_v2.py (rules prepared
+once, see replacement_rules.py) with the previous
+per-phrase loop (kept here as the baseline), which lowercased the line and
+compiled a regex for every phrase of every line.
+
+Both run on the same corpus of template conversations with identically
+seeded random streams, so besides timing the benchmark checks that they
+produce the same outputs (and therefore the same output distribution).
+
+Usage:
+    python src/bench_augmentation.py
+    python src/bench_augmentation.py --n_samples 20000 --repeat 5
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from typing import Callable, List
+
+from generate_data_v2 import (add_paraphrasing_variation, make_emotional_example, make_platonic_example,
+                              paraphrasing_replacements, word_substitutions)
+
+
+def legacy_add_paraphrasing_variation(text, prob=0.4, rng=random):
+    """Previous implementation: per-phrase lowercase check and regex compile on every line."""
+    if rng.random() > prob:
+        return text
+    result_lines = []
+    for line in text.split('\n'):
+        for original, variations in paraphrasing_replacements.items():
+            if original.lower() in line.lower() and rng.random() < 0.3:
+                replacement = rng.choice(variations)
+                pattern = re.compile(re.escape(original), re.IGNORECASE)
+                line = pattern.sub(lambda m: replacement if m.group().islower() else replacement.capitalize(), line, count=1)
+        for original, variations in word_substitutions.items():
+            if original.lower() in line.lower() and rng.random() < 0.2:
+                replacement = rng.choice(variations)
+                pattern = re.compile(re.escape(original), re.IGNORECASE)
+                line = pattern.sub(lambda m: replacement if m.group().islower() else replacement.capitalize(), line, count=1)
+        result_lines.append(line)
+    return '\n'.join(result_lines)
+
+
+def template_corpus(n: int, seed: int = 42) -> List[str]:
+    """Template conversations from both classes (after the generators' own noise)."""
+    rng = random.Random(seed)
+    make = (make_platonic_example, make_emotional_example)
+    return [make[i % 2](rng)[0] for i in range(n)]
+
+
+def time_per_item(fn: Callable, corpus: List[str], prob: float, repeat: int) -> float:
+    """Best-of-`repeat` time per sample in microseconds (same seed every repetition)."""
+    best = float("inf")
+    for _ in range(repeat):
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text, prob, rng)
+        best = min(best, time.perf_counter() - start)
+    return best / max(1, len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the phrase-replacement augmentation")
+    parser.add_argument("--n_samples", type=int, default=5000,
+                        help="Template conversations in the corpus (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timing repetitions, best one is reported (default: 5)")
+    args = parser.parse_args()
+
+    corpus = template_corpus(args.n_samples)
+    print(f"Corpus: {len(corpus)} template conversations, "
+          f"{sum(text.count(chr(10)) + 1 for text in corpus) / len(corpus):.1f} lines on average\n")
+
+    for prob in (1.0, 0.4):
+        legacy_rng, new_rng = random.Random(1), random.Random(1)
+        legacy_out = [legacy_add_paraphrasing_variation(text, prob, legacy_rng) for text in corpus]
+        new_out = [add_paraphrasing_variation(text, prob, new_rng) for text in corpus]
+        n_same = sum(a == b for a, b in zip(legacy_out, new_out))
+        n_changed = sum(a != text for a, text in zip(new_out, corpus))
+
+        legacy_us = time_per_item(legacy_add_paraphrasing_variation, corpus, prob, args.repeat)
+        new_us = time_per_item(add_paraphrasing_variation, corpus, prob, args.repeat)
+        label = "always applied" if prob == 1.0 else "generator default"
+        print(f"prob={prob} ({label}):")
+        print(f"  identical outputs with the same seed: {n_same}/{len(corpus)} ({n_changed} samples changed)")
+        print(f"  baseline:    {legacy_us:8.1f} µs/sample")
+        print(f"  precompiled: {new_us:8.1f} µs/sample ({legacy_us / new_us:.2f}x)\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
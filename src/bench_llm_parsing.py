@@ -0,0 +1,219 @@
+"""
+Micro-benchmark: JSON extraction and validation of raw LLM responses.
+
+Compares the single-pass extractor / validator in generate_data_llm.py with
+the previous regex + find/rfind extractor and multi-pass validator (kept here
+as the baseline). The corpus is made of:
+    - raw responses recorded in the failure log (data/failed_generations.jsonl,
+      or a failed_generations.log from before the JSONL format)
+    - raw responses in the LLM response cache (cache/llm)
+    - synthetic stub-backend responses in the shapes seen in practice
+      (clean, fenced, leading/trailing prose, truncated, schema-invalid)
+
+Besides timing, it checks that both implementations agree wherever the
+baseline succeeded, and counts truncated responses the new extractor can repair.
+
+Usage:
+    python src/bench_llm_parsing.py
+    python src/bench_llm_parsing.py --n_synthetic 5000 --repeat 20
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+
+from generate_data_llm import create_prompt, extract_json_from_text, validate_response
+from llm_backends import StubBackend
+from llm_cache import LLM_CACHE_DIR
+from failure_log import FAILURE_LOG_PATH, iter_failures
+SCENARIOS = [
+    {"scenario_id": f"scenario_{i:03d}", "description": "discussing a project timeline",
+     "setting": ("coworkers", "classmates", "friends")[i % 3], "difficulty": ("easy", "medium", "hard")[i % 3]}
+    for i in range(1, 51)
+]
+
+
+def legacy_extract_json_from_text(text: str) -> Optional[Dict]:
+    """Previous extractor: DOTALL fenced-block regex, then first '{' .. last '}'."""
+    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
+    if json_match:
+        try:
+            return json.loads(json_match.group(1))
+        except json.JSONDecodeError:
+            pass
+    first_brace = text.find('{')
+    if first_brace == -1:
+        return None
+    last_brace = text.rfind('}')
+    if last_brace == -1 or last_brace <= first_brace:
+        return None
+    try:
+        return json.loads(text[first_brace:last_brace + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def legacy_validate_response(data: Dict, scenario: Dict, samples_per_scenario: int = 2) -> Tuple[bool, Optional[str]]:
+    """Previous validator: label lists, then several line splits per pair."""
+    for key in ["scenario_id", "setting", "difficulty", "pairs"]:
+        if key not in data:
+            return False, f"Missing required key: {key}"
+    if data["scenario_id"] != scenario["scenario_id"]:
+        return False, f"scenario_id mismatch: expected {scenario['scenario_id']}, got {data['scenario_id']}"
+    if data["difficulty"] not in ["easy", "medium", "hard"]:
+        return False, f"Invalid difficulty: {data['difficulty']} (must be easy/medium/hard)"
+    if not isinstance(data["pairs"], list):
+        return False, "pairs must be a list"
+    if len(data["pairs"]) != samples_per_scenario:
+        return False, f"pairs must have exactly {samples_per_scenario} items, got {len(data['pairs'])}"
+    labels = [pair.get("label") for pair in data["pairs"]]
+    expected_per_label = samples_per_scenario // 2
+    if labels.count(0) != expected_per_label:
+        return False, f"Expected {expected_per_label} samples with label 0, got {labels.count(0)}"
+    if labels.count(1) != expected_per_label:
+        return False, f"Expected {expected_per_label} samples with label 1, got {labels.count(1)}"
+    if set(labels) != {0, 1}:
+        return False, f"pairs must only contain labels 0 and 1, got {set(labels)}"
+    for pair in data["pairs"]:
+        label = pair.get("label")
+        label_name = pair.get("label_name")
+        text = pair.get("text", "")
+        if label == 0 and label_name != "task_oriented":
+            return False, f"label 0 must have label_name 'task_oriented', got '{label_name}'"
+        if label == 1 and label_name != "emotionally_dependent":
+            return False, f"label 1 must have label_name 'emotionally_dependent', got '{label_name}'"
+        if not isinstance(text, str) or not text.strip():
+            return False, f"text must be a non-empty string for label {label}"
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        if len(lines) < 6 or len(lines) > 10:
+            return False, f"text for label {label} must have 6-10 lines, got {len(lines)}"
+        if len([line for line in lines if line.startswith('A:')]) < 3:
+            return False, f"text for label {label} must have at least 3 lines starting with 'A:'"
+        if len([line for line in lines if line.startswith('B:')]) < 3:
+            return False, f"text for label {label} must have at least 3 lines starting with 'B:'"
+    return True, None
+
+
+def load_failed_log(path: str) -> List[str]:
+    """Raw responses from a JSONL failure log (with its rotations) or the old free-text .log format."""
+    if path.endswith(".log"):
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return [match.group(1) for match in re.finditer(r"Raw Response:\n(.*?)\n={60}\n", content, re.DOTALL)]
+    return [record["raw_response"] for record in iter_failures(path) if record.get("raw_response")]
+
+
+def load_cached_responses(cache_dir: str) -> List[str]:
+    if not os.path.isdir(cache_dir):
+        return []
+    responses = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".json"):
+            with open(entry.path, "r", encoding="utf-8") as f:
+                responses.append(json.load(f)["raw_response"])
+    return responses
+
+
+def synthetic_responses(n: int, samples_per_scenario: int, seed: int = 42) -> List[str]:
+    """Stub responses wrapped the ways real models return them."""
+    rng = random.Random(seed)
+    backend = StubBackend(latency_ms=0, latency_jitter_ms=0, malformed_rate=0.1, seed=seed)
+    wrappers = [
+        lambda r: r,
+        lambda r: f"```json\n{r}\n```",
+        lambda r: f"Sure! Here is the JSON you asked for:\n\n{r}",
+        lambda r: f"```\n{r}\n```\nLet me know if you need more variations.",
+        lambda r: r[:int(len(r) * 0.8)],  # Truncated by the output token limit
+    ]
+    responses = []
+    for i in range(n):
+        prompt = create_prompt(SCENARIOS[i % len(SCENARIOS)], samples_per_scenario)
+        responses.append(rng.choice(wrappers)(backend.generate(prompt)))
+    return responses
+
+
+def time_per_item(fn: Callable, items: List, repeat: int) -> float:
+    """Best-of-`repeat` time per item in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / max(1, len(items)) * 1e6
+
+
+def scenario_for(data: Dict) -> Dict:
+    return {"scenario_id": data.get("scenario_id")}
+
+
+def run(corpus: List[str], samples_per_scenario: int, repeat: int):
+    print(f"Corpus: {len(corpus)} raw responses, {sum(map(len, corpus)) / max(1, len(corpus)):.0f} chars on average\n")
+
+    legacy_parsed = [legacy_extract_json_from_text(r) for r in corpus]
+    new_parsed = [extract_json_from_text(r) for r in corpus]
+    repaired = [extract_json_from_text(r, repair_truncated=True) for r in corpus]
+
+    disagreements = sum(1 for old, new in zip(legacy_parsed, new_parsed) if old is not None and old != new)
+    print("Extraction:")
+    print(f"  baseline parsed {sum(p is not None for p in legacy_parsed)}, "
+          f"single-pass parsed {sum(p is not None for p in new_parsed)}, "
+          f"+{sum(p is not None for p in repaired) - sum(p is not None for p in new_parsed)} more with repair_truncated")
+    print(f"  disagreements where the baseline parsed: {disagreements}")
+
+    legacy_us = time_per_item(legacy_extract_json_from_text, corpus, repeat)
+    new_us = time_per_item(extract_json_from_text, corpus, repeat)
+    print(f"  baseline:    {legacy_us:8.1f} µs/response")
+    print(f"  single-pass: {new_us:8.1f} µs/response ({legacy_us / new_us:.2f}x)\n")
+
+    parsed = [p for p in new_parsed if p is not None]
+    items = [(p, scenario_for(p)) for p in parsed]
+    mismatched = sum(
+        1 for p, sc in items
+        if legacy_validate_response(p, sc, samples_per_scenario) != validate_response(p, sc, samples_per_scenario)
+    )
+    n_valid = sum(validate_response(p, sc, samples_per_scenario)[0] for p, sc in items)
+    print("Validation:")
+    print(f"  {n_valid}/{len(items)} parsed responses valid; results differing from baseline: {mismatched}")
+
+    legacy_us = time_per_item(lambda item: legacy_validate_response(item[0], item[1], samples_per_scenario), items, repeat)
+    new_us = time_per_item(lambda item: validate_response(item[0], item[1], samples_per_scenario), items, repeat)
+    print(f"  baseline:    {legacy_us:8.1f} µs/response")
+    print(f"  single-pass: {new_us:8.1f} µs/response ({legacy_us / new_us:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM response JSON extraction and validation")
+    parser.add_argument("--failed_log", type=str, default=FAILURE_LOG_PATH,
+                        help=f"Recorded failures to include, .jsonl or legacy .log (default: {FAILURE_LOG_PATH})")
+    parser.add_argument("--cache_dir", type=str, default=LLM_CACHE_DIR,
+                        help=f"Response cache whose entries to include (default: {LLM_CACHE_DIR})")
+    parser.add_argument("--n_synthetic", type=int, default=2000,
+                        help="Synthetic stub responses to add (default: 2000)")
+    parser.add_argument("--samples_per_scenario", type=int, default=10,
+                        help="Pairs per synthetic response (default: 10)")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Timing repetitions, best one is reported (default: 10)")
+    args = parser.parse_args()
+
+    recorded = load_failed_log(args.failed_log)
+    cached = load_cached_responses(args.cache_dir)
+    print(f"Loaded {len(recorded)} responses from {args.failed_log}, {len(cached)} from {args.cache_dir}")
+    corpus = recorded + cached + synthetic_responses(args.n_synthetic, args.samples_per_scenario)
+    if not corpus:
+        print("❌ Error: empty corpus")
+        return 1
+
+    run(corpus, args.samples_per_scenario, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Dataset storage helpers for DeepSea Communication Orientation Auditor.
+
+Every script in the generation → split → train → test chain reads and writes
+datasets through these functions, so a dataset can be stored either as CSV
+(the default) or as Parquet. The format is chosen by file extension.
+
+Parquet avoids re-parsing quoted multi-line `text` fields, supports column
+projection (read only `text` and `label` for training), and stores the
+low-cardinality `label_name` / `setting` / `difficulty` columns
+dictionary-encoded, which shrinks large corpora on disk and in memory.
+
+Installation (Parquet only):
+    pip install pyarrow
+"""
+
+import os
+import csv
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+FORMATS = ("csv", "parquet")
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+CATEGORICAL_COLUMNS = ("label_name", "setting", "difficulty")
+
+
+def detect_format(path: str) -> str:
+    """Return 'csv' or 'parquet' based on the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in FORMAT_EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Unsupported dataset extension '{ext}' (expected .csv or .parquet)")
+
+
+def with_format(path: str, fmt: str) -> str:
+    """Swap the extension of `path` for the given format (e.g. train.csv → train.parquet)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown dataset format: {fmt} (expected one of {FORMATS})")
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet storage needs pyarrow. Install with: pip install pyarrow")
+
+
+def read_dataset(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Load a dataset, optionally reading only `columns`.
+
+    For Parquet only the requested columns are read from disk; dictionary-encoded
+    columns come back as pandas `category` dtype.
+    """
+    if detect_format(path) == "parquet":
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=list(columns) if columns else None)
+    return pd.read_csv(path, usecols=list(columns) if columns else None)
+
+
+def iter_dataset_chunks(path: str, chunk_size: int,
+                        columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield a dataset as DataFrames of at most `chunk_size` rows."""
+    if detect_format(path) == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=list(columns) if columns else None):
+            yield batch.to_pandas()
+        return
+
+    with pd.read_csv(path, usecols=list(columns) if columns else None, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def encode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the low-cardinality metadata columns to `category` dtype."""
+    present = [c for c in CATEGORICAL_COLUMNS if c in df.columns]
+    if not present:
+        return df
+    return df.astype({c: "category" for c in present})
+
+
+def write_dataset(df: pd.DataFrame, path: str):
+    """Write a DataFrame as CSV or Parquet (dictionary-encoded metadata columns)."""
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    if detect_format(path) == "parquet":
+        _require_pyarrow()
+        encode_categoricals(df).to_parquet(path, index=False, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+
+
+def write_rows(rows: Iterable[Dict], path: str, fieldnames: List[str]):
+    """
+    Write generator output (a list of row dicts) as CSV or Parquet.
+    CSV goes through csv.DictWriter exactly as the generators always did.
+    """
+    if detect_format(path) == "parquet":
+        write_dataset(pd.DataFrame(list(rows), columns=fieldnames), path)
+        return
+
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow(r)
+
+
+class CsvAppender:
+    """
+    Append-only CSV writer for long-running generators.
+
+    Every `append` call is flushed and fsynced before it returns, so a crash
+    loses at most the batch being written. Passing `truncate_to` (a byte offset
+    returned by an earlier `append`) first cuts off anything written after that
+    point, e.g. a half-written batch from an interrupted run.
+
+    Args:
+        path: CSV file to create or extend
+        fieldnames: Column order (the header is written if the file is empty)
+        truncate_to: Resume from this byte offset of an existing file
+    """
+
+    def __init__(self, path: str, fieldnames: List[str], truncate_to: Optional[int] = None):
+        out_dir = os.path.dirname(path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        if truncate_to is None or not os.path.exists(path):
+            open(path, "w").close()
+        else:
+            os.truncate(path, truncate_to)
+
+        self.path = path
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+            self._sync()
+
+    def _sync(self) -> int:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def append(self, rows: Iterable[Dict]) -> int:
+        """Write `rows` durably and return the file size afterwards."""
+        for r in rows:
+            self._writer.writerow(r)
+        return self._sync()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_to_parquet(csv_path: str, parquet_path: str, chunk_size: int = 100_000):
+    """Convert a CSV dataset to Parquet chunk by chunk (constant memory)."""
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in iter_dataset_chunks(csv_path, chunk_size):
+            table = pa.Table.from_pandas(encode_categoricals(chunk), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_path, table.schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:  # Header-only CSV
+        write_dataset(read_dataset(csv_path), parquet_path)
@@ -0,0 +1,162 @@
+"""
+Structured log of failed LLM generations.
+
+FailureSink writes one JSON object per failed scenario (timestamp, scenario_id,
+error class, message, raw response) to a JSONL file. Records are buffered and
+written in batches. When the file would grow past its size budget, it is
+rotated to `<path>.1` (gzip-compressed to `<path>.1.gz` by default) and older
+files shift up, keeping at most `backups` of them, so big runs can't fill the
+disk. iter_failures reads the current file and its rotations back in order.
+
+Usage:
+    with FailureSink("data/failed_generations.jsonl") as sink:
+        sink.write(scenario_id, error_msg, raw_response)
+    for record in iter_failures("data/failed_generations.jsonl"):
+        ...
+"""
+
+import os
+import gzip
+import json
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from generation_metrics import failure_category
+
+FAILURE_LOG_PATH = "data/failed_generations.jsonl"
+DEFAULT_MAX_BYTES = 50 * 1024 ** 2  # 50 MB per file
+DEFAULT_BACKUPS = 5
+DEFAULT_BUFFER_RECORDS = 32
+
+
+def rotated_paths(path: str, backups: int = DEFAULT_BACKUPS) -> List[str]:
+    """Existing rotated files of `path`, oldest first (compressed or not)."""
+    found = []
+    for i in range(backups, 0, -1):
+        for candidate in (f"{path}.{i}.gz", f"{path}.{i}"):
+            if os.path.exists(candidate):
+                found.append(candidate)
+    return found
+
+
+class FailureSink:
+    """
+    Buffered, size-rotated JSONL writer for failed generations.
+
+    Args:
+        path: Current log file
+        max_bytes: Rotate before the file would exceed this size
+        backups: Rotated files to keep (older ones are deleted)
+        compress: Gzip rotated files
+        buffer_records: Records held in memory before they are written
+    """
+
+    def __init__(self, path: str = FAILURE_LOG_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backups: int = DEFAULT_BACKUPS, compress: bool = True,
+                 buffer_records: int = DEFAULT_BUFFER_RECORDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.buffer_records = buffer_records
+        self.count = 0
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def write(self, scenario_id: str, error: str, raw_response: Optional[str] = None,
+              error_class: Optional[str] = None, **extra):
+        """
+        Record one failed scenario.
+
+        Args:
+            scenario_id: Scenario that failed
+            error: Error message
+            raw_response: Raw response text from the API, if any
+            error_class: Failure class (default: derived from `error`, see failure_category)
+            **extra: Additional fields to store (e.g. attempts, batch size)
+        """
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "scenario_id": scenario_id,
+            "error_class": error_class or failure_category(error),
+            "error": error,
+            **extra,
+            "raw_response": raw_response,
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) >= self.buffer_records:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        lines = [line.encode("utf-8") for line in self._buffer]
+        self._buffer = []
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        f = open(self.path, "ab")
+        try:
+            for line in lines:
+                # Rotate between records, never inside one
+                if size and size + len(line) > self.max_bytes:
+                    f.close()
+                    self._rotate()
+                    f = open(self.path, "ab")
+                    size = 0
+                f.write(line)
+                size += len(line)
+        finally:
+            f.close()
+
+    def _rotate(self):
+        suffix = ".gz" if self.compress else ""
+        # Drop the oldest file, then shift <path>.i -> <path>.i+1
+        for old in (f"{self.path}.{self.backups}.gz", f"{self.path}.{self.backups}"):
+            if os.path.exists(old):
+                os.remove(old)
+        for i in range(self.backups - 1, 0, -1):
+            for ext in (".gz", ""):
+                src = f"{self.path}.{i}{ext}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}{ext}")
+        if self.backups < 1:
+            os.remove(self.path)
+            return
+        target = f"{self.path}.1{suffix}"
+        if self.compress:
+            with open(self.path, "rb") as src, gzip.open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, target)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> "FailureSink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_failures(path: str = FAILURE_LOG_PATH, backups: int = DEFAULT_BACKUPS) -> Iterator[Dict]:
+    """Failure records from `path` and its rotations, oldest first. Torn lines are skipped."""
+    for file_path in rotated_paths(path, backups) + ([path] if os.path.exists(path) else []):
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
@@ -0,0 +1,112 @@
+"""
+Summarize the LLM generator's failure log.
+
+Aggregates data/failed_generations.jsonl (and its rotated, possibly gzipped
+files) by error class and by scenario. Scenarios that a later run completed
+can be excluded by passing that run's manifest. The remaining scenarios can
+be written out as a scenarios file, so a retry campaign regenerates only them:
+
+    python src/failure_report.py --manifest data/deepsea_conversations_llm_v1.manifest.jsonl \\
+        --write_scenarios data/retry_scenarios.json
+    python src/generate_data_llm.py --scenarios_path data/retry_scenarios.json --n_scenarios <N> \\
+        --output data/retry.csv
+
+Usage:
+    python src/failure_report.py
+    python src/failure_report.py --error_class pair_count --top 50
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import Counter
+from typing import Dict, List, Set
+
+from failure_log import DEFAULT_BACKUPS, FAILURE_LOG_PATH, iter_failures
+
+
+def completed_scenarios(manifest_path: str) -> Set[str]:
+    """scenario_ids recorded as done in a generate_data_llm manifest."""
+    done = set()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "scenario_id" in entry:
+                done.add(entry["scenario_id"])
+    return done
+
+
+def aggregate(records: List[Dict]) -> Dict:
+    by_class = Counter(record.get("error_class", "other") for record in records)
+    by_scenario = Counter(record["scenario_id"] for record in records)
+    classes_per_scenario: Dict[str, Counter] = {}
+    for record in records:
+        classes_per_scenario.setdefault(record["scenario_id"], Counter())[record.get("error_class", "other")] += 1
+    return {"by_class": by_class, "by_scenario": by_scenario, "classes_per_scenario": classes_per_scenario}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate failed LLM generations by error class and scenario")
+    parser.add_argument("--failure_log", type=str, default=FAILURE_LOG_PATH,
+                        help=f"Failure log written by generate_data_llm.py (default: {FAILURE_LOG_PATH})")
+    parser.add_argument("--backups", type=int, default=DEFAULT_BACKUPS,
+                        help=f"Rotated files to read (default: {DEFAULT_BACKUPS})")
+    parser.add_argument("--manifest", type=str, default=None,
+                        help="Skip scenarios completed according to this generation manifest")
+    parser.add_argument("--error_class", type=str, action="append", default=None,
+                        help="Only count these error classes (repeatable)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Scenarios to list, most failures first (default: 20)")
+    parser.add_argument("--scenarios_path", type=str, default="data/scenarios.json",
+                        help="Scenario definitions for --write_scenarios (default: data/scenarios.json)")
+    parser.add_argument("--write_scenarios", type=str, default=None,
+                        help="Write the failed scenarios to this JSON file, for a targeted re-run")
+    args = parser.parse_args()
+
+    records = list(iter_failures(args.failure_log, args.backups))
+    if not records:
+        print(f"No failures recorded in {args.failure_log}")
+        return 0
+
+    if args.error_class:
+        records = [r for r in records if r.get("error_class") in args.error_class]
+    if args.manifest:
+        done = completed_scenarios(args.manifest)
+        n_before = len(records)
+        records = [r for r in records if r["scenario_id"] not in done]
+        print(f"Skipped {n_before - len(records)} failures of scenarios completed in {args.manifest}")
+
+    stats = aggregate(records)
+    print(f"{len(records)} failures across {len(stats['by_scenario'])} scenarios\n")
+
+    print("By error class:")
+    for error_class, count in stats["by_class"].most_common():
+        print(f"  {error_class:<22} {count:6d}  ({count / len(records):.0%})")
+
+    print(f"\nScenarios with the most failures (top {args.top}):")
+    for scenario_id, count in stats["by_scenario"].most_common(args.top):
+        classes = ", ".join(f"{c}={n}" for c, n in stats["classes_per_scenario"][scenario_id].most_common())
+        print(f"  {scenario_id:<16} {count:4d}  {classes}")
+
+    if args.write_scenarios:
+        with open(args.scenarios_path, "r", encoding="utf-8") as f:
+            scenarios = json.load(f)
+        failed_ids = set(stats["by_scenario"])
+        selected = [scenario for scenario in scenarios if scenario["scenario_id"] in failed_ids]
+        if os.path.dirname(args.write_scenarios):
+            os.makedirs(os.path.dirname(args.write_scenarios), exist_ok=True)
+        with open(args.write_scenarios, "w", encoding="utf-8") as f:
+            json.dump(selected, f, indent=2, ensure_ascii=False)
+        missing = len(failed_ids) - len(selected)
+        print(f"\n✓ Wrote {len(selected)} scenarios to {args.write_scenarios}"
+              + (f" (⚠️  {missing} not found in {args.scenarios_path})" if missing else ""))
+        print(f"   Re-run with: --scenarios_path {args.write_scenarios} --n_scenarios {len(selected)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
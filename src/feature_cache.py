@@ -0,0 +1,163 @@
+"""
+On-disk cache of vectorized feature matrices for DeepSea Communication Orientation Auditor.
+
+train.py, test.py and audit_dataset.py all tokenize the same CSVs on every run.
+FeatureCache stores the resulting sparse TF-IDF matrices (`scipy.sparse.save_npz`)
+keyed by a content hash of the input file plus the vectorizer's parameters (and
+fitted state, for `transform`), so repeated experiments on unchanged data skip
+tokenization entirely. When the cache grows past its size budget, the least
+recently used entries are evicted.
+
+Usage:
+    cache = FeatureCache()
+    vectorizer, X_train = cache.fit_transform(vectorizer, texts, TRAIN_PATH)
+    X_val = cache.transform(vectorizer, val_texts, VAL_PATH)
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+import joblib
+import scipy.sparse as sp
+
+FEATURE_CACHE_DIR = os.path.join("cache", "features")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+# (abs path, size, mtime) -> content hash, so a file is hashed once per process
+_file_hashes: Dict[Tuple[str, int, float], str] = {}
+
+
+def file_content_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file's bytes (memoized per process by path/size/mtime)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+    if memo_key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+class FeatureCache:
+    """
+    LRU-evicted directory of `<key>.npz` feature matrices, with the fitted
+    vectorizer stored next to matrices produced by `fit_transform`.
+
+    Args:
+        cache_dir: Directory holding cache entries
+        max_bytes: Size budget; least recently used entries are evicted beyond it
+        enabled: If False, every call computes directly and nothing is stored
+    """
+
+    def __init__(self, cache_dir: str = FEATURE_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, data_path: str, op: str, vectorizer, tag: str = "") -> str:
+        """
+        Key = hash(file content, operation, vectorizer, tag).
+        `joblib.hash` covers the vectorizer's parameters and, once fitted,
+        its learned vocabulary/idf, so a refit model never reuses stale features.
+        """
+        payload = json.dumps({
+            "data": file_content_hash(data_path),
+            "op": op,
+            "vectorizer": joblib.hash(vectorizer),
+            "tag": tag,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return base + ".npz", base + ".vectorizer.joblib"
+
+    def _touch(self, *paths: str):
+        for path in paths:
+            if os.path.exists(path):
+                os.utime(path)
+
+    def fit_transform(self, vectorizer, texts: Iterable[str], data_path: str,
+                      tag: str = "") -> Tuple[object, sp.csr_matrix]:
+        """
+        Cached `vectorizer.fit_transform(texts)` where `texts` were read from `data_path`.
+
+        Args:
+            tag: Distinguishes different text selections from the same file
+                (e.g. a subset or reordering)
+
+        Returns:
+            (fitted vectorizer, feature matrix)
+        """
+        if not self.enabled:
+            return vectorizer, vectorizer.fit_transform(texts)
+
+        matrix_path, vectorizer_path = self._paths(self.make_key(data_path, "fit_transform", vectorizer, tag))
+        if os.path.exists(matrix_path) and os.path.exists(vectorizer_path):
+            self.hits += 1
+            self._touch(matrix_path, vectorizer_path)
+            return joblib.load(vectorizer_path), sp.load_npz(matrix_path)
+
+        self.misses += 1
+        X = vectorizer.fit_transform(texts)
+        joblib.dump(vectorizer, vectorizer_path)
+        sp.save_npz(matrix_path, sp.csr_matrix(X), compressed=False)
+        self.evict()
+        return vectorizer, X
+
+    def transform(self, vectorizer, texts: Iterable[str], data_path: str,
+                  tag: str = "") -> sp.csr_matrix:
+        """Cached `vectorizer.transform(texts)` for an already-fitted vectorizer."""
+        if not self.enabled:
+            return vectorizer.transform(texts)
+
+        matrix_path, _ = self._paths(self.make_key(data_path, "transform", vectorizer, tag))
+        if os.path.exists(matrix_path):
+            self.hits += 1
+            self._touch(matrix_path)
+            return sp.load_npz(matrix_path)
+
+        self.misses += 1
+        X = vectorizer.transform(texts)
+        sp.save_npz(matrix_path, sp.csr_matrix(X), compressed=False)
+        self.evict()
+        return X
+
+    def size_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.is_file())
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+        total = sum(entry.stat().st_size for entry in entries)
+        if total <= max_bytes:
+            return
+
+        # Group the matrix and its vectorizer so they are evicted together
+        groups: Dict[str, list] = {}
+        for entry in entries:
+            groups.setdefault(entry.name.split(".", 1)[0], []).append(entry)
+        by_last_use = sorted(groups.values(), key=lambda files: max(f.stat().st_mtime for f in files))
+
+        for files in by_last_use:
+            if total <= max_bytes:
+                break
+            for f in files:
+                total -= f.stat().st_size
+                os.remove(f.path)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Feature cache disabled"
+        return (f"Feature cache: {self.hits} hits, {self.misses} misses "
+                f"({self.size_bytes() / 1024 ** 2:.1f} MB in {self.cache_dir})")
@@ -3,6 +3,21 @@ LLM-based synthetic data generator for DeepSea Communication Orientation Auditor
 
 Generates paired conversations (same scenario, two styles) using Google Gemini API.
 Each API call produces both task-oriented and emotionally-dependent versions.
+With --backend stub, a local simulated LLM (llm_backends.StubBackend) is used
+instead, for offline benchmarking of throughput, retries and validation.
+
+Calls run concurrently (--concurrency in-flight requests) under a requests-per-
+minute / tokens-per-minute limiter (--rpm / --tpm); rows are still written in
+scenario order, so a given seed always produces the same file layout.
+
+Validated rows are appended to the output as each scenario finishes, and a
+manifest next to it records the completed scenario_ids. After a crash or
+Ctrl-C, re-running with --resume skips those scenarios instead of paying for
+them again.
+
+Raw responses are cached on disk by (model, prompt) hash, so re-running with
+the same seed and scenarios costs no API calls (--no_cache / --refresh to
+bypass).
 
 Installation:
     pip install google-generativeai
@@ -13,24 +28,34 @@ Environment:
 """
 
 import os
-import csv
 import json
 import uuid
 import random
 import time
+import asyncio
 import argparse
 import re
-from typing import Dict, Optional, List, Tuple
-from datetime import datetime
-
-# Try to import Google Gemini API
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    print("Warning: google-generativeai not installed.")
-    print("Install with: pip install google-generativeai")
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Optional, List, Tuple
+
+from llm_backends import BACKENDS, REPAIR_MARKER, GeminiBackend, LLMBackend, create_backend
+from llm_cache import DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES, LLM_CACHE_DIR, ResponseCache
+from dataset_io import CsvAppender, csv_to_parquet, detect_format, iter_dataset_chunks
+from rate_limiter import RateLimiter, estimate_tokens
+from generation_metrics import GenerationMetrics
+from near_dedup import NearDuplicateIndex
+from failure_log import DEFAULT_MAX_BYTES as DEFAULT_FAILURE_LOG_MAX_BYTES, FAILURE_LOG_PATH, FailureSink
+from retry_policy import FATAL, PARSE_FAILURE, ParseFailure, RetryPolicy, classify_error
+
+# call_fn(prompt) -> (parsed_json_dict, raw_response_text), e.g. call_backend with the backend bound
+CallFn = Callable[[str], Tuple[Optional[Dict], Optional[str]]]
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RPM = 120  # Same pacing as the old fixed 0.5s delay between calls
+EST_TOKENS_PER_SAMPLE = 150  # 6-10 short chat lines, used to pre-charge the TPM bucket
+DEFAULT_BATCH_RETRIES = 2
+FIELDNAMES = ["id", "scenario_id", "setting", "difficulty", "label", "label_name", "text"]
 
 # Built-in neutral scenarios (fallback if JSON file doesn't exist)
 BUILTIN_SCENARIOS = [
@@ -197,15 +222,8 @@ def generate_large_scenario_set(output_path: str = "data/scenarios.json", n_scen
     return scenarios
 
 
-def create_prompt(scenario: Dict, samples_per_scenario: int = 2, hard_negative_ratio: float = 0.3) -> str:
-    """
-    Create the prompt for Gemini API.
-    
-    Args:
-        scenario: Scenario dictionary
-        samples_per_scenario: Number of samples to generate (must be even, split equally between labels)
-        hard_negative_ratio: Proportion of samples that should be hard negatives (ambiguous/challenging)
-    """
+def _label_counts(samples_per_scenario: int, hard_negative_ratio: float) -> Tuple[int, int, int, int, int, int]:
+    """(num_task, num_emotional, num_hard_task, num_hard_emotional, num_easy_task, num_easy_emotional)"""
     num_task = samples_per_scenario // 2
     num_emotional = samples_per_scenario // 2
     
@@ -214,14 +232,15 @@ def create_prompt(scenario: Dict, samples_per_scenario: int = 2, hard_negative_r
     num_hard_emotional = max(1, int(num_emotional * hard_negative_ratio))
     num_easy_task = num_task - num_hard_task
     num_easy_emotional = num_emotional - num_hard_emotional
-    
-    return f"""You are generating paired chat conversations for a communication style classification dataset.
+    return num_task, num_emotional, num_hard_task, num_hard_emotional, num_easy_task, num_easy_emotional
 
-SCENARIO: {scenario['description']}
-SETTING: {scenario['setting']}
-DIFFICULTY: {scenario['difficulty']}
 
-Generate {samples_per_scenario} versions of the same conversation (6-10 lines each, alternating between A: and B:).
+def _style_instructions(samples_per_scenario: int, hard_negative_ratio: float) -> str:
+    """Labeling and style instructions shared by single- and multi-scenario prompts."""
+    (num_task, num_emotional, num_hard_task, num_hard_emotional,
+     num_easy_task, num_easy_emotional) = _label_counts(samples_per_scenario, hard_negative_ratio)
+    
+    return f"""Generate {samples_per_scenario} versions of the same conversation (6-10 lines each, alternating between A: and B:).
 - {num_task} versions should be task_oriented (label 0)
 - {num_emotional} versions should be emotionally_dependent (label 1)
 
@@ -257,7 +276,28 @@ CRITICAL CONSTRAINTS:
   A: [message]
   ...
 - Vary the wording and structure across different versions of the same label
-- HARD NEGATIVES should be genuinely ambiguous - a human might struggle to classify them
+- HARD NEGATIVES should be genuinely ambiguous - a human might struggle to classify them"""
+
+
+def create_prompt(scenario: Dict, samples_per_scenario: int = 2, hard_negative_ratio: float = 0.3) -> str:
+    """
+    Create the prompt for Gemini API.
+    
+    Args:
+        scenario: Scenario dictionary
+        samples_per_scenario: Number of samples to generate (must be even, split equally between labels)
+        hard_negative_ratio: Proportion of samples that should be hard negatives (ambiguous/challenging)
+    """
+    (num_task, num_emotional, num_hard_task, num_hard_emotional,
+     num_easy_task, num_easy_emotional) = _label_counts(samples_per_scenario, hard_negative_ratio)
+    
+    return f"""You are generating paired chat conversations for a communication style classification dataset.
+
+SCENARIO: {scenario['description']}
+SETTING: {scenario['setting']}
+DIFFICULTY: {scenario['difficulty']}
+
+{_style_instructions(samples_per_scenario, hard_negative_ratio)}
 
 Output ONLY valid JSON with this exact schema:
 {{
@@ -277,64 +317,167 @@ The pairs array must contain exactly {samples_per_scenario} items: {num_task} wi
 Return ONLY the JSON, no markdown, no explanation."""
 
 
-def extract_json_from_text(text: str) -> Optional[Dict]:
+def create_batch_prompt(scenarios: List[Dict], samples_per_scenario: int = 2, hard_negative_ratio: float = 0.3) -> str:
     """
-    Extract the first valid JSON object from text.
-    Finds first '{' and last '}' and attempts to parse.
+    Create one prompt covering several scenarios (a single scenario uses create_prompt).
+    The response is a {"scenarios": [...]} object with one create_prompt-style
+    entry per scenario, which split_batch_response maps back to scenario_ids.
     
     Args:
-        text: Raw response text that may contain JSON
-    
-    Returns:
-        Parsed JSON dict or None if extraction fails
+        scenarios: Scenario dictionaries to pack into the prompt
+        samples_per_scenario: Number of samples per scenario (must be even, split equally between labels)
+        hard_negative_ratio: Proportion of samples that should be hard negatives (ambiguous/challenging)
     """
-    # Try to find JSON in markdown code blocks first
-    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # Find first { and last }
-    first_brace = text.find('{')
-    if first_brace == -1:
-        return None
+    if len(scenarios) == 1:
+        return create_prompt(scenarios[0], samples_per_scenario, hard_negative_ratio)
     
-    last_brace = text.rfind('}')
-    if last_brace == -1 or last_brace <= first_brace:
-        return None
+    num_task, num_emotional, *_ = _label_counts(samples_per_scenario, hard_negative_ratio)
+    scenario_list = "\n".join(
+        f"{i}. SCENARIO: {s['description']} | SETTING: {s['setting']} | DIFFICULTY: {s['difficulty']}"
+        for i, s in enumerate(scenarios, 1)
+    )
+    entries = ",\n".join(
+        f'    {{"scenario_id": "{s["scenario_id"]}", "setting": "{s["setting"]}", "difficulty": "{s["difficulty"]}", '
+        f'"pairs": [{{"label": 0, "label_name": "task_oriented", "text": "A: ...\\nB: ..."}}, ...]}}'
+        for s in scenarios
+    )
     
-    json_str = text[first_brace:last_brace + 1]
+    return f"""You are generating paired chat conversations for a communication style classification dataset.
+
+Handle each of the following {len(scenarios)} scenarios independently:
+{scenario_list}
+
+For EACH scenario:
+{_style_instructions(samples_per_scenario, hard_negative_ratio)}
+
+Output ONLY valid JSON with this exact schema:
+{{
+  "scenarios": [
+{entries}
+  ]
+}}
+
+The scenarios array must contain exactly {len(scenarios)} entries, in the order listed above, with the scenario_id, setting and difficulty shown.
+Each pairs array must contain exactly {samples_per_scenario} items: {num_task} with label 0 and {num_emotional} with label 1.
+
+Return ONLY the JSON, no markdown, no explanation."""
+
+
+def create_repair_prompt(prompt: str, raw_response: str) -> str:
+    """
+    Ask the model to turn its own unparseable output into valid JSON, instead
+    of paying for a full regeneration. Reuses the output-format part of `prompt`.
+    """
+    schema_start = prompt.find("Output ONLY valid JSON")
+    schema = prompt[schema_start:] if schema_start != -1 else prompt
+    return f"""Your previous response could not be parsed as JSON. It may be cut off, wrapped in prose or markdown, or contain a syntax error.
+
+Rewrite it as ONE valid JSON object. Keep every conversation exactly as written; if the response was cut off, complete only what is missing.
+
+{schema}
+
+{REPAIR_MARKER}
+{raw_response}"""
+
+
+def split_batch_response(data: Dict, scenarios: List[Dict]) -> Dict[str, Dict]:
+    """
+    Map scenario_id -> that scenario's part of a (multi-scenario) response.
+    Scenarios missing from the response are simply absent from the result.
+    """
+    if len(scenarios) == 1:
+        return {scenarios[0]["scenario_id"]: data}
     
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
-        return None
+    wanted = {s["scenario_id"] for s in scenarios}
+    entries = data.get("scenarios") if isinstance(data, dict) else None
+    by_id = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict) and entry.get("scenario_id") in wanted:
+            by_id.setdefault(entry["scenario_id"], entry)
+    return by_id
+
+
+_JSON_DECODER = json.JSONDecoder()
+# One token per match: a complete or unterminated string, or a bracket
+_JSON_STRUCTURE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"?|[{}\[\]]', re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+MAX_REPAIR_ATTEMPTS = 8
 
 
-def log_failed_generation(scenario_id: str, raw_response: str, error: str):
+def _scan_object(text: str, start: int) -> Tuple[Optional[int], List[Tuple[int, str]]]:
     """
-    Log failed generation to a file.
+    Walk the brackets of the object starting at text[start] == '{' in one
+    regex pass (strings are skipped whole, so braces inside them don't count).
     
-    Args:
-        scenario_id: ID of the scenario that failed
-        raw_response: Raw response text from API
-        error: Error message
+    Returns:
+        (end index just past the matching '}', or None if the text ends first,
+         [(position just past a closed container, brackets still open there)])
+    """
+    stack = []
+    cut_points = []
+    for match in _JSON_STRUCTURE.finditer(text, start):
+        token = match.group()
+        if token in _CLOSERS:
+            stack.append(token)
+        elif token in "}]":
+            if not stack or _CLOSERS[stack[-1]] != token:
+                return match.end(), cut_points  # Mismatched bracket: not repairable JSON
+            stack.pop()
+            if not stack:
+                return match.end(), cut_points
+            cut_points.append((match.end(), "".join(stack)))
+    return None, cut_points
+
+
+def _repair_truncated(text: str, start: int, cut_points: List[Tuple[int, str]]) -> Optional[Dict]:
+    """Close a cut-off object after its last complete nested value, dropping the partial tail."""
+    for end, open_brackets in reversed(cut_points[-MAX_REPAIR_ATTEMPTS:]):
+        candidate = text[start:end] + "".join(_CLOSERS[b] for b in reversed(open_brackets))
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def extract_json_from_text(text: str, repair_truncated: bool = False) -> Optional[Dict]:
     """
-    log_path = "data/failed_generations.log"
-    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    Extract the first valid JSON object from text.
+    
+    Parses directly from the first '{' with the C JSON decoder, which stops at
+    the end of the object, so leading prose, markdown fences and trailing text
+    cost nothing extra. Only if that fails is the text scanned (once) for the
+    object's extent, to skip a non-JSON '{...}' and try the next candidate, or to
+    recover a truncated response.
     
-    timestamp = datetime.now().isoformat()
-    log_entry = f"\n{'='*60}\n"
-    log_entry += f"Timestamp: {timestamp}\n"
-    log_entry += f"Scenario ID: {scenario_id}\n"
-    log_entry += f"Error: {error}\n"
-    log_entry += f"Raw Response:\n{raw_response}\n"
-    log_entry += f"{'='*60}\n"
+    Args:
+        text: Raw response text that may contain JSON
+        repair_truncated: If the output was cut off, return the object closed
+            after its last complete nested value (e.g. the complete scenarios
+            of a batched response) instead of None
     
-    with open(log_path, 'a', encoding='utf-8') as f:
-        f.write(log_entry)
+    Returns:
+        Parsed JSON dict or None if extraction fails
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError as e:
+            # Ran off the end of the text: truncated, and nothing later can parse either
+            truncated = e.msg.startswith("Unterminated string") or not text[e.pos:].strip()
+            if truncated and not repair_truncated:
+                return None
+        
+        end, cut_points = _scan_object(text, start)
+        if end is None:
+            return _repair_truncated(text, start, cut_points) if repair_truncated else None
+        start = text.find('{', end)
+    return None
 
 
 def validate_response(data: Dict, scenario: Dict, samples_per_scenario: int = 2) -> Tuple[bool, Optional[str]]:
@@ -370,10 +513,25 @@ def validate_response(data: Dict, scenario: Dict, samples_per_scenario: int = 2)
     if len(data["pairs"]) != samples_per_scenario:
         return False, f"pairs must have exactly {samples_per_scenario} items, got {len(data['pairs'])}"
     
+    # One pass over the pairs: count labels and remember the first per-pair problem.
+    # Label counts are reported before per-pair problems, as they are the likelier cause.
+    label_0_count = label_1_count = 0
+    other_labels = False
+    pair_error = None
+    for pair in data["pairs"]:
+        if not isinstance(pair, dict):
+            return False, "each item in pairs must be an object"
+        label = pair.get("label")
+        if label == 0:
+            label_0_count += 1
+        elif label == 1:
+            label_1_count += 1
+        else:
+            other_labels = True
+        if pair_error is None:
+            pair_error = _check_pair(pair, label)
+    
     # Check labels - must have equal number of 0s and 1s
-    labels = [pair.get("label") for pair in data["pairs"]]
-    label_0_count = labels.count(0)
-    label_1_count = labels.count(1)
     expected_per_label = samples_per_scenario // 2
     
     if label_0_count != expected_per_label:
@@ -381,118 +539,374 @@ def validate_response(data: Dict, scenario: Dict, samples_per_scenario: int = 2)
     if label_1_count != expected_per_label:
         return False, f"Expected {expected_per_label} samples with label 1, got {label_1_count}"
     
-    if set(labels) != {0, 1}:
-        return False, f"pairs must only contain labels 0 and 1, got {set(labels)}"
-    
-    # Validate each pair
-    for pair in data["pairs"]:
-        label = pair.get("label")
-        label_name = pair.get("label_name")
-        text = pair.get("text", "")
-        
-        # Check label_name matches label
-        if label == 0 and label_name != "task_oriented":
-            return False, f"label 0 must have label_name 'task_oriented', got '{label_name}'"
-        if label == 1 and label_name != "emotionally_dependent":
-            return False, f"label 1 must have label_name 'emotionally_dependent', got '{label_name}'"
-        
-        # Check text format
-        if not isinstance(text, str) or not text.strip():
-            return False, f"text must be a non-empty string for label {label}"
-        
-        # Check line count (6-10 lines)
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        if len(lines) < 6 or len(lines) > 10:
-            return False, f"text for label {label} must have 6-10 lines, got {len(lines)}"
-        
-        # Check alternating A: and B: labels (at least 3 lines each)
-        a_lines = [line for line in lines if line.startswith('A:')]
-        b_lines = [line for line in lines if line.startswith('B:')]
-        
-        if len(a_lines) < 3:
-            return False, f"text for label {label} must have at least 3 lines starting with 'A:'"
-        if len(b_lines) < 3:
-            return False, f"text for label {label} must have at least 3 lines starting with 'B:'"
+    if other_labels or not label_0_count or not label_1_count:
+        labels = {pair.get("label") for pair in data["pairs"]}
+        return False, f"pairs must only contain labels 0 and 1, got {labels}"
     
+    if pair_error is not None:
+        return False, pair_error
     return True, None
 
 
-def call_gemini_api(prompt: str, api_key: str, model_name: str = "gemini-pro", max_retries: int = 3) -> Tuple[Optional[Dict], Optional[str]]:
+def _check_pair(pair: Dict, label) -> Optional[str]:
+    """Validate one pair's label_name and conversation text in a single pass over its lines."""
+    label_name = pair.get("label_name")
+    text = pair.get("text", "")
+    
+    # Check label_name matches label
+    if label == 0 and label_name != "task_oriented":
+        return f"label 0 must have label_name 'task_oriented', got '{label_name}'"
+    if label == 1 and label_name != "emotionally_dependent":
+        return f"label 1 must have label_name 'emotionally_dependent', got '{label_name}'"
+    
+    # Check text format
+    if not isinstance(text, str) or not text.strip():
+        return f"text must be a non-empty string for label {label}"
+    
+    # Count non-empty lines and A:/B: turns together
+    n_lines = n_a = n_b = 0
+    for line in text.split('\n'):
+        line = line.lstrip()
+        if not line:
+            continue
+        n_lines += 1
+        if line.startswith('A:'):
+            n_a += 1
+        elif line.startswith('B:'):
+            n_b += 1
+    
+    # Check line count (6-10 lines)
+    if n_lines < 6 or n_lines > 10:
+        return f"text for label {label} must have 6-10 lines, got {n_lines}"
+    
+    # Check alternating A: and B: labels (at least 3 lines each)
+    if n_a < 3:
+        return f"text for label {label} must have at least 3 lines starting with 'A:'"
+    if n_b < 3:
+        return f"text for label {label} must have at least 3 lines starting with 'B:'"
+    return None
+
+
+def call_backend(backend: LLMBackend, prompt: str, max_retries: int = 3,
+                 repair_truncated: bool = False,
+                 policy: Optional[RetryPolicy] = None,
+                 metrics: Optional[GenerationMetrics] = None) -> Tuple[Optional[Dict], Optional[str]]:
     """
-    Call Google Gemini API with retry logic and backoff.
+    Call an LLM backend, retrying according to the kind of failure.
+    
+    Fatal errors (bad key, invalid request, safety block) are not retried.
+    Rate limits and transient errors back off with decorrelated jitter,
+    honoring retry-after hints. A response that isn't valid JSON is sent
+    back once with a repair prompt (cheaper than regenerating everything);
+    if the repair fails too, the original prompt is retried.
     
     Args:
+        backend: Backend to send the prompt to (Gemini, stub, ...)
         prompt: The prompt to send to the model
-        api_key: Google Gemini API key
-        model_name: Model name (default: "gemini-pro")
-        max_retries: Maximum number of retry attempts
+        max_retries: Maximum number of attempts (ignored if `policy` is given)
+        repair_truncated: Keep the complete part of a cut-off response instead of retrying
+        policy: Retry policy (default: RetryPolicy(max_attempts=max_retries))
+        metrics: Optional telemetry (request latency, tokens, extraction time, retries)
     
     Returns:
         (parsed_json_dict, raw_response_text) or (None, raw_response_text) if all retries fail
     """
-    if not GEMINI_AVAILABLE:
-        raise ImportError("google-generativeai package not installed. Install with: pip install google-generativeai")
-    
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(model_name)
-    
+    policy = policy or RetryPolicy(max_attempts=max_retries)
     raw_response = None
+    delay = 0.0
+    repairing = False
+    error_class = None
     
-    for attempt in range(max_retries):
+    for attempt in range(policy.max_attempts):
+        request = create_repair_prompt(prompt, raw_response) if repairing else prompt
+        request_start = time.perf_counter()
+        response = None
         try:
-            response = model.generate_content(prompt)
-            raw_response = response.text.strip()
+            response = backend.generate(request)
+            raw_response = response
+            if metrics is not None:
+                metrics.record_attempt(time.perf_counter() - request_start,
+                                       estimate_tokens(request), estimate_tokens(response))
             
             # Extract JSON from response
-            data = extract_json_from_text(raw_response)
+            extract_start = time.perf_counter()
+            data = extract_json_from_text(raw_response, repair_truncated)
+            if metrics is not None:
+                metrics.observe("extract", time.perf_counter() - extract_start)
             
             if data is None:
-                raise ValueError("Could not extract valid JSON from response")
+                raise ParseFailure("Could not extract valid JSON from response", raw_response)
             
+            if metrics is not None:
+                metrics.record_call(attempt + 1, ok=True)
             return data, raw_response
             
         except Exception as e:
-            error_msg = str(e)
-            wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
+            error_class = classify_error(e)
+            if metrics is not None:
+                if response is None:
+                    # The request itself failed; a parse failure was already recorded as a request
+                    metrics.record_attempt(time.perf_counter() - request_start, estimate_tokens(request), 0)
+                metrics.count_error(error_class)
+            # Repair the last unparseable output, but don't repair a failed repair
+            repairing = error_class == PARSE_FAILURE and not repairing
             
-            if attempt < max_retries - 1:
-                print(f"  Attempt {attempt + 1}/{max_retries}: Error - {error_msg}")
-                print(f"  Retrying in {wait_time}s...")
-                time.sleep(wait_time)
+            if policy.should_retry(error_class, attempt):
+                delay = policy.next_delay(error_class, delay, e)
+                action = "re-asking with a repair prompt" if repairing else f"retrying in {delay:.1f}s"
+                print(f"  Attempt {attempt + 1}/{policy.max_attempts}: {error_class} - {e} ({action})")
+                time.sleep(delay)
+            elif error_class == FATAL:
+                print(f"  Not retrying ({error_class}): {e}")
+                break
             else:
-                print(f"  Failed after {max_retries} attempts: {error_msg}")
-                return None, raw_response
+                print(f"  Failed after {policy.max_attempts} attempts: {e}")
+                break
     
+    if metrics is not None:
+        metrics.record_call(attempt + 1, ok=False, error_class=error_class)
     return None, raw_response
 
 
+def call_gemini_api(prompt: str, api_key: str, model_name: str = "gemini-pro", max_retries: int = 3) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Call Google Gemini API with retry logic and backoff.
+    
+    Args:
+        prompt: The prompt to send to the model
+        api_key: Google Gemini API key
+        model_name: Model name (default: "gemini-pro")
+        max_retries: Maximum number of retry attempts
+    
+    Returns:
+        (parsed_json_dict, raw_response_text) or (None, raw_response_text) if all retries fail
+    """
+    return call_backend(GeminiBackend(api_key, model_name), prompt, max_retries)
+
+
+async def generate_responses(prompts: List[str], call_fn: CallFn, concurrency: int = DEFAULT_CONCURRENCY,
+                             limiter: Optional[RateLimiter] = None, expected_output_tokens: int = 0,
+                             cache: Optional[ResponseCache] = None, model_name: str = "",
+                             read_cache: bool = True, repair_truncated: bool = False,
+                             metrics: Optional[GenerationMetrics] = None) -> AsyncIterator[Tuple[Optional[Dict], Optional[str]]]:
+    """
+    Run `call_fn` over `prompts` with up to `concurrency` calls in flight.
+    
+    Prompts found in `cache` are answered from disk without touching the
+    limiter or the API. Every other call first takes one request and its
+    estimated tokens from `limiter`, and responses that parse are cached
+    (callers delete entries whose response then fails validation).
+    Results are yielded in prompt order as soon as they (and every earlier
+    prompt) are done, so output order never depends on network timing.
+    
+    Args:
+        prompts: Prompts to send, one per scenario
+        call_fn: Blocking call returning (parsed_json_dict, raw_response_text)
+        concurrency: Maximum number of calls in flight
+        limiter: Optional RPM/TPM limiter shared by all calls
+        expected_output_tokens: Response size estimate charged to the TPM bucket up front
+        cache: Optional response cache
+        model_name: Model the prompts are sent to (part of the cache key)
+        read_cache: If False, always call the backend (fresh responses are still cached)
+        repair_truncated: Parse cached responses like call_fn parses fresh ones (a cut-off
+            batched response was cached after repair made it parse)
+        metrics: Optional telemetry; cache hits and their read time are recorded here
+    
+    Yields:
+        (parsed_json_dict, raw_response_text) for each prompt, in order
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    # call_fn blocks (HTTP client + retry sleeps), so each in-flight call gets its own thread
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    
+    async def run_one(prompt: str):
+        if cache is not None and read_cache:
+            read_start = time.perf_counter()
+            cached = await loop.run_in_executor(executor, cache.get, model_name, prompt)
+            if cached is not None:
+                if metrics is not None:
+                    metrics.record_cache_hit(time.perf_counter() - read_start)
+                return extract_json_from_text(cached, repair_truncated), cached
+        
+        async with slots:
+            estimated = estimate_tokens(prompt) + expected_output_tokens
+            if limiter is not None:
+                await limiter.acquire(estimated)
+            data, raw_response = await loop.run_in_executor(executor, call_fn, prompt)
+            if limiter is not None:
+                limiter.record_usage(estimated, estimate_tokens(prompt) + estimate_tokens(raw_response or ""))
+            if cache is not None and data is not None:
+                await loop.run_in_executor(executor, cache.put, model_name, prompt, raw_response)
+            return data, raw_response
+    
+    with executor:
+        tasks = [asyncio.ensure_future(run_one(prompt)) for prompt in prompts]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def response_to_rows(response_data: Dict) -> List[Dict]:
+    """Flatten a validated response into dataset rows."""
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "scenario_id": response_data["scenario_id"],
+            "setting": response_data["setting"],
+            "difficulty": response_data["difficulty"],
+            "label": pair["label"],
+            "label_name": pair["label_name"],
+            "text": pair["text"]
+        }
+        for pair in response_data["pairs"]
+    ]
+
+
+def manifest_path_for(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + ".manifest.jsonl"
+
+
+def metrics_path_for(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + ".metrics.jsonl"
+
+
+def staging_path_for(output_path: str) -> str:
+    """Rows are streamed to CSV; Parquet outputs are converted from this file at the end."""
+    if detect_format(output_path) == "csv":
+        return output_path
+    return os.path.splitext(output_path)[0] + ".partial.csv"
+
+
+def restore_staging(output_path: str, staging_path: str) -> int:
+    """
+    Re-create the streamed CSV from a finished Parquet output, so resuming
+    (e.g. to retry failed scenarios) extends it instead of starting over.
+    Returns the size of the restored file.
+    """
+    with CsvAppender(staging_path, FIELDNAMES) as appender:
+        size = os.path.getsize(staging_path)
+        for chunk in iter_dataset_chunks(output_path, 10_000, columns=FIELDNAMES):
+            size = appender.append(chunk.astype(object).to_dict("records"))
+    return size
+
+
+class GenerationManifest:
+    """
+    Append-only JSONL record of a generation run.
+    
+    The first line holds the run configuration; each further line marks one
+    scenario as complete, with the size of the data file after its rows were
+    written. On resume the data file is truncated back to the last recorded
+    size, which drops rows from a scenario that was only partly written.
+    
+    Args:
+        path: Manifest location (see manifest_path_for)
+        config: Settings that must match for a run to be resumed
+        resume: Load an existing manifest instead of starting a new one
+    """
+    
+    def __init__(self, path: str, config: Dict, resume: bool = False):
+        self.path = path
+        self.completed: Dict[str, int] = {}  # scenario_id -> rows written
+        self.data_offset: Optional[int] = None
+        
+        if resume and os.path.exists(path):
+            self._load(config)
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"config": config})
+    
+    def _load(self, config: Dict):
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        saved_config = json.loads(lines[0])["config"] if lines else None
+        if saved_config != config:
+            raise ValueError(f"{self.path} was written with different settings ({saved_config}); "
+                             f"re-run with the same options or without --resume")
+        
+        valid_lines = lines[:1]
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # Torn final line from a crash mid-write
+            self.completed[entry["scenario_id"]] = entry["rows"]
+            self.data_offset = entry["offset"]
+            valid_lines.append(line)
+        
+        # Drop a torn tail so new entries start on a fresh line
+        if len(valid_lines) < len(lines):
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write("\n".join(valid_lines) + "\n")
+    
+    def _write(self, entry: Dict):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def record(self, scenario_id: str, n_rows: int, offset: int):
+        """Mark `scenario_id` done once its rows are durable up to byte `offset`."""
+        self.completed[scenario_id] = n_rows
+        self.data_offset = offset
+        self._write({"scenario_id": scenario_id, "rows": n_rows, "offset": offset})
+    
+    @property
+    def total_rows(self) -> int:
+        return sum(self.completed.values())
+    
+    def close(self):
+        self._file.close()
+
+
 def generate_dataset(n_scenarios: int, seed: int = 42, output_path: str = "data/deepsea_conversations_llm_v1.csv", 
                     scenarios_path: str = "data/scenarios.json", model_name: str = "gemini-pro",
-                    samples_per_scenario: int = 2, hard_negative_ratio: float = 0.3):
+                    samples_per_scenario: int = 2, hard_negative_ratio: float = 0.3,
+                    concurrency: int = DEFAULT_CONCURRENCY, rpm: Optional[float] = DEFAULT_RPM,
+                    tpm: Optional[float] = None, backend: Optional[LLMBackend] = None, resume: bool = False,
+                    cache: Optional[ResponseCache] = None, batch_size: int = 1,
+                    batch_retries: int = DEFAULT_BATCH_RETRIES, retry_policy: Optional[RetryPolicy] = None,
+                    metrics_path: Optional[str] = None, failure_log: Optional[FailureSink] = None,
+                    near_dup_threshold: float = 0.0):
     """
-    Generate dataset using Google Gemini API.
+    Generate dataset using Google Gemini API (or another LLM backend).
     
     Args:
         n_scenarios: Number of scenarios to process
         seed: Random seed for scenario selection
-        output_path: Path to save CSV file
+        output_path: Path to save the dataset (.csv or .parquet)
         scenarios_path: Path to scenarios JSON file
         model_name: Gemini model name (default: "gemini-pro")
         samples_per_scenario: Number of samples per scenario (must be even, default: 2)
         hard_negative_ratio: Proportion of samples that should be hard negatives (0.0-1.0, default: 0.3)
+        concurrency: Maximum number of API calls in flight
+        rpm: Requests-per-minute limit (None or 0 = unlimited)
+        tpm: Estimated tokens-per-minute limit (None or 0 = unlimited)
+        backend: LLM backend to use (default: Gemini with GEMINI_API_KEY and `model_name`)
+        resume: Continue an interrupted run, skipping scenarios listed in its manifest
+        cache: Response cache (default: ResponseCache() in cache/llm)
+        batch_size: Scenarios packed into each request (1 = one prompt per scenario)
+        batch_retries: Extra rounds for scenarios that were missing or invalid in a
+            batched response; each round halves the batch size (batch_size > 1 only)
+        retry_policy: Per-call retry policy (default: RetryPolicy(), 3 attempts)
+        metrics_path: JSONL telemetry file (default: <output>.metrics.jsonl next to the output)
+        failure_log: Where failed scenarios and their raw responses go (default: FailureSink())
+        near_dup_threshold: Drop samples whose MinHash similarity to an earlier sample
+            reaches this value (0 = keep all)
     """
     if samples_per_scenario % 2 != 0:
         raise ValueError(f"samples_per_scenario must be even, got {samples_per_scenario}")
-    if not GEMINI_AVAILABLE:
-        raise ImportError("google-generativeai package not installed. Install with: pip install google-generativeai")
-    
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "GEMINI_API_KEY environment variable not set.\n"
-            "Get your API key from: https://makersuite.google.com/app/apikey\n"
-            "Then set it with: export GEMINI_API_KEY='your-key-here'"
-        )
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    
+    if backend is None:
+        backend = GeminiBackend.from_env(model_name)
     
     # Load scenarios (auto-generate if needed)
     # Ensure we have at least n_scenarios available
@@ -530,67 +944,165 @@ def generate_dataset(n_scenarios: int, seed: int = 42, output_path: str = "data/
     # Create output directory if needed
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    rows = []
+    config = {
+        "n_scenarios": n_scenarios,
+        "seed": seed,
+        "scenarios_path": scenarios_path,
+        "model_name": backend.model_id,
+        "samples_per_scenario": samples_per_scenario,
+        "hard_negative_ratio": hard_negative_ratio,
+    }
+    manifest = GenerationManifest(manifest_path_for(output_path), config, resume)
+    metrics_path = metrics_path or metrics_path_for(output_path)
+    metrics = GenerationMetrics(metrics_path, {**config, "batch_size": batch_size, "concurrency": concurrency},
+                                append=resume)
+    # A cut-off batched response still holds complete scenarios; the rest are retried
+    repair_truncated = batch_size > 1
+    call_fn = partial(call_backend, backend, repair_truncated=repair_truncated,
+                      policy=retry_policy or RetryPolicy(seed=seed), metrics=metrics)
+    staging_path = staging_path_for(output_path)
+    data_offset = manifest.data_offset if resume else None
+    if data_offset is not None and not os.path.exists(staging_path) and os.path.exists(output_path):
+        data_offset = restore_staging(output_path, staging_path)
+    appender = CsvAppender(staging_path, FIELDNAMES, truncate_to=data_offset)
+    near_dups = NearDuplicateIndex(near_dup_threshold) if near_dup_threshold > 0 else None
+    near_dup_count = 0
+    if near_dups is not None and data_offset:
+        # Samples of the interrupted run count as seen
+        for chunk in iter_dataset_chunks(staging_path, 10_000, columns=["text"]):
+            for text in chunk["text"].astype(str):
+                near_dups.add(text)
+    
+    if manifest.completed:
+        print(f"Resuming: {len(manifest.completed)} scenarios ({manifest.total_rows} samples) already done")
+    pending = [scenario for scenario in selected_scenarios if scenario['scenario_id'] not in manifest.completed]
     failed_count = 0
     
-    print(f"Generating {len(selected_scenarios)} scenarios with {samples_per_scenario} samples each...")
+    print(f"Generating {len(pending)} scenarios with {samples_per_scenario} samples each...")
+    print(f"Backend: {backend.model_id}" + (f", {batch_size} scenarios per request" if batch_size > 1 else ""))
+    print(f"Concurrency: {concurrency} in flight, limits: {rpm or 'unlimited'} RPM / {tpm or 'unlimited'} TPM")
     print(f"Output: {output_path}\n")
     
-    for i, scenario in enumerate(selected_scenarios, 1):
-        print(f"[{i}/{len(selected_scenarios)}] Processing {scenario['scenario_id']}...")
-        
-        prompt = create_prompt(scenario, samples_per_scenario, hard_negative_ratio)
-        response_data, raw_response = call_gemini_api(prompt, api_key, model_name=model_name)
-        
-        if response_data is None:
-            print(f"  ⚠️  Skipping {scenario['scenario_id']} due to API error")
-            if raw_response:
-                log_failed_generation(scenario['scenario_id'], raw_response, "API call failed")
-            failed_count += 1
-            continue
-        
-        # Validate response
-        is_valid, error_msg = validate_response(response_data, scenario, samples_per_scenario)
-        
-        if not is_valid:
-            print(f"  ⚠️  Validation failed: {error_msg}")
-            if raw_response:
-                log_failed_generation(scenario['scenario_id'], raw_response, f"Validation error: {error_msg}")
-            failed_count += 1
-            continue
-        
-        # Extract pairs
-        for pair in response_data["pairs"]:
-            row = {
-                "id": str(uuid.uuid4()),
-                "scenario_id": response_data["scenario_id"],
-                "setting": response_data["setting"],
-                "difficulty": response_data["difficulty"],
-                "label": pair["label"],
-                "label_name": pair["label_name"],
-                "text": pair["text"]
-            }
-            rows.append(row)
-        
-        label_0_count = sum(1 for p in response_data["pairs"] if p["label"] == 0)
-        label_1_count = sum(1 for p in response_data["pairs"] if p["label"] == 1)
-        print(f"  ✓ Generated {samples_per_scenario} samples ({label_0_count} label 0, {label_1_count} label 1)")
+    limiter = RateLimiter(rpm, tpm)
+    failure_log = failure_log if failure_log is not None else FailureSink()
+    cache = cache if cache is not None else ResponseCache()
+    start = time.perf_counter()
+    n_calls = 0
+    
+    async def collect():
+        nonlocal failed_count, n_calls, near_dup_count
+        n_done = 0
+        remaining = pending
+        n_rounds = 1 + (batch_retries if batch_size > 1 else 0)
         
-        # Small delay to avoid rate limiting
-        time.sleep(0.5)
-    
-    # Write to CSV
-    fieldnames = ["id", "scenario_id", "setting", "difficulty", "label", "label_name", "text"]
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-    
-    total_scenarios_success = len(rows) // samples_per_scenario
-    print(f"\n✓ Generated {len(rows)} samples ({total_scenarios_success} scenarios × {samples_per_scenario} samples each)")
+        for round_idx in range(n_rounds):
+            if not remaining:
+                break
+            final_round = round_idx == n_rounds - 1
+            # Retry rounds use smaller batches so one bad scenario can't sink many others
+            size = max(1, batch_size >> round_idx)
+            batches = [remaining[j:j + size] for j in range(0, len(remaining), size)]
+            if round_idx:
+                print(f"\nRetrying {len(remaining)} failed scenarios in batches of {size}...")
+            
+            prompts = [create_batch_prompt(batch, samples_per_scenario, hard_negative_ratio) for batch in batches]
+            n_calls += len(prompts)
+            responses = generate_responses(prompts, call_fn, concurrency, limiter,
+                                           expected_output_tokens=size * samples_per_scenario * EST_TOKENS_PER_SAMPLE,
+                                           cache=cache, model_name=backend.model_id, read_cache=round_idx == 0,
+                                           repair_truncated=repair_truncated, metrics=metrics)
+            failed = []
+            batch_idx = 0
+            async for response_data, raw_response in responses:
+                batch = batches[batch_idx]
+                prompt = prompts[batch_idx]
+                batch_idx += 1
+                batch_failed = False
+                entries = split_batch_response(response_data, batch) if response_data is not None else {}
+                
+                for scenario in batch:
+                    scenario_id = scenario['scenario_id']
+                    if response_data is None:
+                        error_msg = "API call failed"
+                    elif scenario_id not in entries:
+                        error_msg = "Validation error: scenario missing from batched response"
+                    else:
+                        # Validate response
+                        with metrics.timer("validate"):
+                            is_valid, error_msg = validate_response(entries[scenario_id], scenario, samples_per_scenario)
+                        error_msg = None if is_valid else f"Validation error: {error_msg}"
+                    batch_failed = batch_failed or error_msg is not None
+                    
+                    if error_msg is not None and not final_round:
+                        print(f"  ↻ {scenario_id}: {error_msg} (will retry)")
+                        failed.append(scenario)
+                        continue
+                    
+                    n_done += 1
+                    print(f"[{n_done}/{len(pending)}] {scenario_id}")
+                    if error_msg is not None:
+                        if response_data is None:
+                            print(f"  ⚠️  Skipping {scenario_id} due to API error")
+                        else:
+                            print(f"  ⚠️  {error_msg}")
+                        failure_log.write(scenario_id, error_msg, raw_response, batch_size=len(batch))
+                        metrics.record_scenario(scenario_id, error_msg=error_msg)
+                        failed_count += 1
+                        continue
+                    
+                    # Append pairs, then mark the scenario done once they are on disk
+                    pairs = entries[scenario_id]["pairs"]
+                    rows = response_to_rows(entries[scenario_id])
+                    if near_dups is not None:
+                        n_generated = len(rows)
+                        rows = [row for row in rows if near_dups.add(row["text"])]
+                        near_dup_count += n_generated - len(rows)
+                    manifest.record(scenario_id, len(rows), appender.append(rows))
+                    metrics.record_scenario(scenario_id, len(rows))
+                    
+                    label_0_count = sum(1 for p in pairs if p["label"] == 0)
+                    label_1_count = sum(1 for p in pairs if p["label"] == 1)
+                    print(f"  ✓ Generated {samples_per_scenario} samples ({label_0_count} label 0, {label_1_count} label 1)")
+                    if len(rows) < len(pairs):
+                        print(f"  ≈ Dropped {len(pairs) - len(rows)} near-duplicate samples")
+                
+                if batch_failed and response_data is not None:
+                    # Don't let --resume replay an answer that failed validation
+                    cache.delete(backend.model_id, prompt)
+            
+            remaining = failed
+    
+    try:
+        asyncio.run(collect())
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted: {len(manifest.completed)} scenarios saved to {staging_path}")
+        print("   Re-run with --resume to continue")
+        raise
+    finally:
+        appender.close()
+        manifest.close()
+        metrics.close()
+        failure_log.close()
+    elapsed = time.perf_counter() - start
+    
+    # Parquet outputs are written once the streamed CSV is complete
+    if staging_path != output_path:
+        csv_to_parquet(staging_path, output_path)
+        os.remove(staging_path)
+    
+    print(f"\n✓ Generated {manifest.total_rows} samples ({len(manifest.completed)} scenarios × {samples_per_scenario} samples each)")
     if failed_count > 0:
-        print(f"⚠️  Failed to generate {failed_count} scenarios (see data/failed_generations.log)")
+        print(f"⚠️  Failed to generate {failed_count} scenarios (see {failure_log.path})")
+        print("   Re-run with --resume to retry only those scenarios")
+        print(f"   Breakdown by error class: python src/failure_report.py --failure_log {failure_log.path}")
     print(f"✓ Saved to {output_path}")
+    if near_dups is not None:
+        print(f"≈ Dropped {near_dup_count} near-duplicate samples (similarity >= {near_dup_threshold})")
+    print(cache.summary())
+    print(f"⏱  {elapsed:.1f}s for {len(pending)} scenarios in {n_calls} requests "
+          f"({len(pending) / max(elapsed, 1e-9) * 60:.1f} scenarios/min)")
+    print(metrics.format_summary())
+    print(f"✓ Metrics written to {metrics_path}")
 
 
 def main():
@@ -602,6 +1114,22 @@ Examples:
   # Generate 10 scenarios with default settings
   python src/generate_data_llm.py --n_scenarios 10
   
+  # Generate 500 scenarios with 8 calls in flight, within a 300 RPM / 1M TPM quota
+  python src/generate_data_llm.py --n_scenarios 500 --concurrency 8 --rpm 300 --tpm 1000000
+  
+  # Continue an interrupted run (same options), skipping completed scenarios
+  python src/generate_data_llm.py --n_scenarios 500 --resume
+  
+  # Re-send every prompt instead of reusing cached responses
+  python src/generate_data_llm.py --n_scenarios 50 --refresh
+  
+  # Benchmark the pipeline offline against the simulated backend (no API key needed)
+  python src/generate_data_llm.py --n_scenarios 200 --backend stub --stub_latency_ms 800 \\
+      --stub_error_rate 0.05 --stub_malformed_rate 0.1 --concurrency 16 --rpm 0 --no_cache
+  
+  # Pack 5 scenarios into each request (about 5x fewer round trips)
+  python src/generate_data_llm.py --n_scenarios 500 --batch_size 5
+  
   # Generate 50 scenarios from custom scenarios file
   python src/generate_data_llm.py --n_scenarios 50 --scenarios_path data/my_scenarios.json
   
@@ -614,7 +1142,7 @@ Examples:
     parser.add_argument("--seed", type=int, default=42, 
                        help="Random seed (default: 42)")
     parser.add_argument("--output", type=str, default="data/deepsea_conversations_llm_v1.csv", 
-                       help="Output CSV path (default: data/deepsea_conversations_llm_v1.csv)")
+                       help="Output path, .csv or .parquet (default: data/deepsea_conversations_llm_v1.csv)")
     parser.add_argument("--scenarios_path", type=str, default="data/scenarios.json",
                        help="Path to scenarios JSON file (default: data/scenarios.json)")
     parser.add_argument("--model", type=str, default="models/gemini-2.5-flash",
@@ -625,6 +1153,50 @@ Examples:
     parser.add_argument("--hard_negative_ratio", type=float, default=0.6,
                        help="Proportion of samples that should be hard negatives (ambiguous/challenging). "
                             "Range: 0.0-1.0, default: 0.3 (30%% of samples will be hard negatives)")
+    parser.add_argument("--backend", choices=BACKENDS, default="gemini",
+                       help="LLM backend: gemini, or stub for a local simulated LLM (default: gemini)")
+    parser.add_argument("--stub_latency_ms", type=float, default=500.0,
+                       help="Stub backend: mean response latency in ms (default: 500)")
+    parser.add_argument("--stub_error_rate", type=float, default=0.0,
+                       help="Stub backend: probability a call fails (default: 0.0)")
+    parser.add_argument("--stub_malformed_rate", type=float, default=0.0,
+                       help="Stub backend: probability a response is truncated or invalid (default: 0.0)")
+    parser.add_argument("--batch_size", type=int, default=1,
+                       help="Scenarios per request; failed scenarios of a batch are retried on their own (default: 1)")
+    parser.add_argument("--batch_retries", type=int, default=DEFAULT_BATCH_RETRIES,
+                       help=f"Retry rounds for scenarios that failed inside a batch (default: {DEFAULT_BATCH_RETRIES})")
+    parser.add_argument("--max_retries", type=int, default=3,
+                       help="Attempts per API call, including the first (default: 3)")
+    parser.add_argument("--retry_base_delay", type=float, default=1.0,
+                       help="Smallest backoff delay in seconds (default: 1.0)")
+    parser.add_argument("--retry_max_delay", type=float, default=60.0,
+                       help="Largest backoff delay in seconds (default: 60)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                       help=f"Maximum API calls in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM,
+                       help=f"Requests-per-minute limit, 0 = unlimited (default: {DEFAULT_RPM})")
+    parser.add_argument("--tpm", type=float, default=0,
+                       help="Estimated tokens-per-minute limit, 0 = unlimited (default: 0)")
+    parser.add_argument("--metrics_path", type=str, default=None,
+                       help="JSONL telemetry file (default: <output>.metrics.jsonl)")
+    parser.add_argument("--failure_log", type=str, default=FAILURE_LOG_PATH,
+                       help=f"JSONL log of failed scenarios and raw responses (default: {FAILURE_LOG_PATH})")
+    parser.add_argument("--failure_log_max_mb", type=float, default=DEFAULT_FAILURE_LOG_MAX_BYTES / 1024 ** 2,
+                       help=f"Rotate the failure log past this size (default: {DEFAULT_FAILURE_LOG_MAX_BYTES // 1024 ** 2})")
+    parser.add_argument("--no_failure_log_compression", action="store_true",
+                       help="Keep rotated failure logs uncompressed")
+    parser.add_argument("--near_dup_threshold", type=float, default=0.0,
+                       help="Drop samples nearly identical to earlier ones at this MinHash similarity, e.g. 0.9 (default: 0 = off)")
+    parser.add_argument("--resume", action="store_true",
+                       help="Continue an interrupted run, skipping scenarios already in the output's manifest")
+    parser.add_argument("--no_cache", "--no-cache", action="store_true",
+                       help="Neither read nor write the LLM response cache")
+    parser.add_argument("--refresh", action="store_true",
+                       help="Ignore cached responses and overwrite them with fresh ones")
+    parser.add_argument("--cache_dir", type=str, default=LLM_CACHE_DIR,
+                       help=f"Response cache directory (default: {LLM_CACHE_DIR})")
+    parser.add_argument("--cache_max_mb", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 2,
+                       help=f"Response cache size budget in MB (default: {DEFAULT_CACHE_MAX_BYTES // 1024 ** 2})")
     
     args = parser.parse_args()
     
@@ -636,9 +1208,24 @@ Examples:
         print("❌ Error: --hard_negative_ratio must be between 0.0 and 1.0")
         return 1
     
+    if args.concurrency < 1 or args.batch_size < 1 or args.max_retries < 1:
+        print("❌ Error: --concurrency, --batch_size and --max_retries must be at least 1")
+        return 1
+    
     try:
+        cache = ResponseCache(args.cache_dir, int(args.cache_max_mb * 1024 ** 2),
+                              enabled=not args.no_cache, refresh=args.refresh)
+        failure_log = FailureSink(args.failure_log, int(args.failure_log_max_mb * 1024 ** 2),
+                                  compress=not args.no_failure_log_compression)
+        retry_policy = RetryPolicy(args.max_retries, args.retry_base_delay, args.retry_max_delay, seed=args.seed)
+        backend = create_backend(args.backend, args.model, args.stub_latency_ms,
+                                 args.stub_error_rate, args.stub_malformed_rate, args.seed)
         generate_dataset(args.n_scenarios, args.seed, args.output, args.scenarios_path, 
-                        args.model, args.samples_per_scenario, args.hard_negative_ratio)
+                        args.model, args.samples_per_scenario, args.hard_negative_ratio,
+                        args.concurrency, args.rpm, args.tpm, backend=backend, resume=args.resume, cache=cache,
+                        batch_size=args.batch_size, batch_retries=args.batch_retries,
+                        retry_policy=retry_policy, metrics_path=args.metrics_path, failure_log=failure_log,
+                        near_dup_threshold=args.near_dup_threshold)
     except Exception as e:
         print(f"\n❌ Error: {e}")
         return 1
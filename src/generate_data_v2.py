@@ -1,8 +1,15 @@
 import os
-import csv
 import random
 import uuid
-import re
+import time
+import argparse
+import multiprocessing
+
+from dataset_io import FORMATS, CsvAppender, csv_to_parquet, detect_format, iter_dataset_chunks, with_format, write_rows
+from hash_dedup import DEDUP_MODES, DedupSet, count_duplicates
+from near_dedup import NearDuplicateIndex
+from replacement_rules import ReplacementRules
+from template_yield import MAX_ATTEMPTS, TemplateYieldTracker, fit_heaps, simulate_run
 
 random.seed(42)
 
@@ -258,7 +265,7 @@ B: {prioritization} {subtle_boundary}"""
 ]
 
 
-def add_platonic_hard_negative_noise(text):
+def add_platonic_hard_negative_noise(text, rng=random):
     """
     Add surface-level 'hot' cues (emojis, greetings, mild warmth) to platonic samples
     while keeping task/idea focus and boundaries intact.
@@ -268,36 +275,36 @@ def add_platonic_hard_negative_noise(text):
     
     # Add a warm greeting to the first line (if it starts with "A:")
     if lines and lines[0].startswith('A:'):
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             # Replace "A: Hey" or "A: I'm" with a warm greeting
             first_line = lines[0]
             if 'Hey' in first_line:
-                greeting = random.choice(platonic_hot_cues)
+                greeting = rng.choice(platonic_hot_cues)
                 first_line = first_line.replace('Hey', greeting, 1)
             elif first_line.startswith('A: I'):
                 # Insert greeting at the beginning
-                greeting = random.choice(platonic_hot_cues)
+                greeting = rng.choice(platonic_hot_cues)
                 first_line = f"A: {greeting} {first_line[3:].lstrip()}"
             lines[0] = first_line
     
     # Occasionally add mild warmth phrases while maintaining boundaries
-    if random.random() < 0.4:
+    if rng.random() < 0.4:
         # Find a good place to insert warmth (usually after a helpful response)
         for i, line in enumerate(lines):
             if line.startswith('A:') and ('Thanks' in line or 'appreciate' in line.lower()):
-                if random.random() < 0.5:
-                    warmth = random.choice(platonic_warmth_phrases)
+                if rng.random() < 0.5:
+                    warmth = rng.choice(platonic_warmth_phrases)
                     # Add warmth but keep it professional
                     lines[i] = f"{line} {warmth}"
                     break
     
     # Add emojis to some lines (but keep the content professional)
     for i, line in enumerate(lines):
-        if random.random() < 0.3 and line.strip():
+        if rng.random() < 0.3 and line.strip():
             # Add a friendly emoji at the end of some lines
             emojis = ['😊', '☺️', '👍', '💙', '😄']
             if not any(emoji in line for emoji in ['☺️', '💕', '☀️', '😊', '😄', '💙', '👍']):
-                lines[i] = f"{line} {random.choice(emojis)}"
+                lines[i] = f"{line} {rng.choice(emojis)}"
     
     return '\n'.join(lines)
 
@@ -367,37 +374,35 @@ punctuation_variations = {
     "!": ["!", ".", "!", "!!"],
 }
 
-def add_paraphrasing_variation(text, prob=0.4):
+# Prepared once, applied with one lowercase pass per text (see replacement_rules.py)
+paraphrasing_rules = ReplacementRules(paraphrasing_replacements)
+word_substitution_rules = ReplacementRules(word_substitutions)
+
+def add_paraphrasing_variation(text, prob=0.4, rng=random):
     """Add paraphrasing to break template patterns"""
-    if random.random() > prob:
+    if rng.random() > prob:
         return text
     
-    lines = text.split('\n')
-    result_lines = []
+    # Only phrases occurring somewhere in the text need to be checked per line
+    lowered = text.lower()
+    paraphrase_candidates = paraphrasing_rules.present(lowered)
+    word_candidates = word_substitution_rules.present(lowered)
+    if not paraphrase_candidates and not word_candidates:
+        return text
     
-    for line in lines:
-        # Apply paraphrasing replacements
-        for original, variations in paraphrasing_replacements.items():
-            if original.lower() in line.lower() and random.random() < 0.3:
-                replacement = random.choice(variations)
-                # Case-insensitive replacement, preserving original case
-                pattern = re.compile(re.escape(original), re.IGNORECASE)
-                line = pattern.sub(lambda m: replacement if m.group().islower() else replacement.capitalize(), line, count=1)
-        
-        # Apply word substitutions
-        for original, variations in word_substitutions.items():
-            if original.lower() in line.lower() and random.random() < 0.2:
-                replacement = random.choice(variations)
-                pattern = re.compile(re.escape(original), re.IGNORECASE)
-                line = pattern.sub(lambda m: replacement if m.group().islower() else replacement.capitalize(), line, count=1)
-        
-        result_lines.append(line)
+    result_lines = []
+    for line in text.split('\n'):
+        # Apply paraphrasing replacements, then word substitutions
+        paraphrased = paraphrasing_rules.apply(line, 0.3, rng, paraphrase_candidates)
+        # A paraphrase can introduce a substitutable word, so re-check all of them then
+        candidates = word_candidates if paraphrased is line else None
+        result_lines.append(word_substitution_rules.apply(paraphrased, 0.2, rng, candidates))
     
     return '\n'.join(result_lines)
 
-def add_sentence_structure_variation(text, prob=0.3):
+def add_sentence_structure_variation(text, prob=0.3, rng=random):
     """Vary sentence structure to break patterns"""
-    if random.random() > prob:
+    if rng.random() > prob:
         return text
     
     lines = text.split('\n')
@@ -405,8 +410,8 @@ def add_sentence_structure_variation(text, prob=0.3):
     
     for line in lines:
         # Sometimes add optional phrases at the start
-        if line.strip() and random.random() < 0.2:
-            optional = random.choice(optional_phrases)
+        if line.strip() and rng.random() < 0.2:
+            optional = rng.choice(optional_phrases)
             if optional and line.startswith('A:') or line.startswith('B:'):
                 # Add after the speaker label
                 parts = line.split(':', 1)
@@ -414,19 +419,19 @@ def add_sentence_structure_variation(text, prob=0.3):
                     line = f"{parts[0]}: {optional}{parts[1].lstrip()}"
         
         # Vary punctuation (subtle)
-        if random.random() < 0.15:
+        if rng.random() < 0.15:
             for punct, variations in punctuation_variations.items():
                 if line.endswith(punct):
-                    line = line[:-1] + random.choice(variations)
+                    line = line[:-1] + rng.choice(variations)
                     break
         
         result_lines.append(line)
     
     return '\n'.join(result_lines)
 
-def add_length_variation(text, prob=0.3):
+def add_length_variation(text, prob=0.3, rng=random):
     """Add optional phrases to vary text length"""
-    if random.random() > prob:
+    if rng.random() > prob:
         return text
     
     lines = text.split('\n')
@@ -450,8 +455,8 @@ def add_length_variation(text, prob=0.3):
     
     for line in lines:
         # Sometimes add short phrases at the end
-        if line.strip() and not line.strip().endswith(('?', '!', '.')) and random.random() < 0.2:
-            addition = random.choice(optional_additions)
+        if line.strip() and not line.strip().endswith(('?', '!', '.')) and rng.random() < 0.2:
+            addition = rng.choice(optional_additions)
             if addition:
                 line = line.rstrip() + addition
         
@@ -459,19 +464,19 @@ def add_length_variation(text, prob=0.3):
     
     return '\n'.join(result_lines)
 
-def add_template_breaking_noise(text, prob=0.5):
+def add_template_breaking_noise(text, prob=0.5, rng=random):
     """
     Add noise/paraphrasing to break template patterns.
     This ensures templates don't perfectly predict labels.
     """
     # Apply multiple variation techniques
-    text = add_paraphrasing_variation(text, prob=prob)
-    text = add_sentence_structure_variation(text, prob=prob * 0.8)
-    text = add_length_variation(text, prob=prob * 0.6)
+    text = add_paraphrasing_variation(text, prob=prob, rng=rng)
+    text = add_sentence_structure_variation(text, prob=prob * 0.8, rng=rng)
+    text = add_length_variation(text, prob=prob * 0.6, rng=rng)
     
     return text
 
-def soften_explicit_cues(text, prob=0.5):
+def soften_explicit_cues(text, prob=0.5, rng=random):
     """
     Partially weaken explicit lexical cues related to secrecy and boundaries
     with probabilistic softening (40-60% probability per sample).
@@ -479,11 +484,11 @@ def soften_explicit_cues(text, prob=0.5):
     Uses indirect or ambiguous wording when softening, but doesn't remove
     all explicit signals. Leaves some samples unchanged to preserve dataset diversity.
     """
-    if random.random() > prob:
+    if rng.random() > prob:
         return text  # Don't soften this sample
     
     # List of explicit cues and their softer alternatives (ordered longest to shortest)
-    # Using list of tuples to ensure random.choice() is called at runtime, not definition time
+    # Using list of tuples to ensure rng.choice() is called at runtime, not definition time
     softening_replacements = [
         # Long phrases first (most specific) - order matters to avoid partial replacements
         ("I didn't tell my partner we talk this much", [
@@ -585,16 +590,16 @@ def soften_explicit_cues(text, prob=0.5):
         
         if explicit_phrase in result:
             # 60-80% chance to replace when found (varied to add randomness)
-            replace_prob = random.uniform(0.6, 0.8)
-            if random.random() < replace_prob:
-                replacement = random.choice(alternatives)  # Choose randomly at runtime
+            replace_prob = rng.uniform(0.6, 0.8)
+            if rng.random() < replace_prob:
+                replacement = rng.choice(alternatives)  # Choose randomly at runtime
                 result = result.replace(explicit_phrase, replacement, 1)  # Replace only first occurrence
                 replacements_made += 1
     
     return result
 
 
-def add_emotional_hard_negative_noise(text):
+def add_emotional_hard_negative_noise(text, rng=random):
     """
     Remove obvious hot markers (emojis, romantic phrases) from emotional-affair samples
     but retain dependency, priority, and secrecy markers.
@@ -622,7 +627,7 @@ def add_emotional_hard_negative_noise(text):
     for i, line in enumerate(result_lines):
         for romantic, replacement in romantic_replacements.items():
             if romantic in line:
-                if random.random() < 0.6:  # 60% chance to replace
+                if rng.random() < 0.6:  # 60% chance to replace
                     result_lines[i] = line.replace(romantic, replacement)
     
     # Remove overly affectionate greetings but keep the dependency
@@ -634,29 +639,38 @@ def add_emotional_hard_negative_noise(text):
     return '\n'.join(result_lines)
 
 
-def make_platonic_example():
+def pick_template(template_list, prefix, rng=random, template_id=None, offset=0):
+    """
+    Draw one of `template_list`, or take the forced `template_id`.
+    
+    Returns:
+        (template, template_id), the id being f"{prefix}_{index + offset}"
+    """
+    if template_id is None:
+        template = rng.choice(template_list)
+        # Get the index within the template list
+        return template, f"{prefix}_{template_list.index(template) + offset}"
+    return template_list[int(template_id.rsplit('_', 1)[1]) - offset], template_id
+
+
+def make_platonic_example(rng=random, template_id=None):
     # Sometimes use shared topics, sometimes use class-specific topics
-    if random.random() < 0.4:  # 40% chance to use shared topic
-        topic = random.choice(shared_topics)
+    # (a forced template_id, e.g. from adaptive sampling, decides instead of the draw)
+    use_shared = rng.random() < 0.4 if template_id is None else template_id.startswith("p_shared")
+    if use_shared:  # 40% chance to use shared topic
+        topic = rng.choice(shared_topics)
         # When using shared topics, prefer the shared templates (last 2)
-        shared_template_list = platonic_templates[-2:]
-        template = random.choice(shared_template_list)
-        # Get the index within the shared templates (0 or 1)
-        shared_index = shared_template_list.index(template)
-        template_id = f"p_shared_{shared_index}"
+        template, template_id = pick_template(platonic_templates[-2:], "p_shared", rng, template_id)
     else:
-        topic = random.choice(platonic_topics)
-        core_template_list = platonic_templates[:-2]  # Use original templates
-        template = random.choice(core_template_list)
-        # Get the index within the core templates
-        core_index = core_template_list.index(template)
-        template_id = f"p_core_{core_index}"
+        topic = rng.choice(platonic_topics)
+        # Use original templates
+        template, template_id = pick_template(platonic_templates[:-2], "p_core", rng, template_id)
     
-    tone = random.choice(platonic_tones)
+    tone = rng.choice(platonic_tones)
     
     # Occasionally inject an explicit boundary sentence
-    if random.random() < 0.4:
-        boundary_line = random.choice(platonic_boundaries)
+    if rng.random() < 0.4:
+        boundary_line = rng.choice(platonic_boundaries)
         # Potential improvement of the dataset
         # It doesn't have to be 'A' to say the boundary sentence
         template += f"\nA: {boundary_line}"
@@ -666,11 +680,11 @@ def make_platonic_example():
     
     # Inject benign secrecy into platonic samples, especially shared-topic ones
     # This makes "privacy/secrecy" not a clear label-1 beacon
-    if template_id.startswith("p_shared") or random.random() < 0.3:
+    if template_id.startswith("p_shared") or rng.random() < 0.3:
         # Add benign secrecy phrase to one of the lines
         lines = text.split('\n')
         if lines:
-            benign_secrecy = random.choice(benign_secrecy_phrases)
+            benign_secrecy = rng.choice(benign_secrecy_phrases)
             # Add it to a B: line (the helper's response)
             for i, line in enumerate(lines):
                 if line.startswith('B:'):
@@ -680,32 +694,34 @@ def make_platonic_example():
     
     # Add template-breaking noise to prevent perfect label prediction
     # This adds paraphrasing, structure variation, and length variation
-    text = add_template_breaking_noise(text, prob=0.6)
+    text = add_template_breaking_noise(text, prob=0.6, rng=rng)
     
     # Apply hard negative noise to ~30% of platonic samples
-    is_hard = random.random() < HARD_NEGATIVE_PROB
+    is_hard = rng.random() < HARD_NEGATIVE_PROB
     if is_hard:
-        text = add_platonic_hard_negative_noise(text)
+        text = add_platonic_hard_negative_noise(text, rng=rng)
     
     return text.strip(), is_hard, template_id
 
 
-def make_emotional_example():
+def make_emotional_example(rng=random, template_id=None):
     # Sometimes use shared topics, sometimes use emotional scenarios
-    if random.random() < 0.4:  # 40% chance to use shared topic
-        topic = random.choice(shared_topics)
+    # (a forced template_id, e.g. from adaptive sampling, decides instead of the draws)
+    use_shared = rng.random() < 0.4 if template_id is None else template_id.startswith("e_shared")
+    if use_shared:  # 40% chance to use shared topic
+        topic = rng.choice(shared_topics)
         # When using shared topics, choose between original shared templates (indices 5-6) 
         # and subtle shared templates (indices 7-8)
-        use_subtle = random.random() < 0.5  # 50% chance to use subtle templates
+        if template_id is None:
+            use_subtle = rng.random() < 0.5  # 50% chance to use subtle templates
+        else:
+            use_subtle = int(template_id.rsplit('_', 1)[1]) >= 2
         if use_subtle:
-            # Use subtle templates (last 2)
-            shared_template_list = emotional_templates[-2:]
-            template = random.choice(shared_template_list)
-            shared_index = shared_template_list.index(template)
-            template_id = f"e_shared_{shared_index + 2}"  # Offset by 2 to distinguish from original shared
-            subtle_dep = random.choice(subtle_dependency)
-            subtle_bound = random.choice(subtle_boundary_erosion)
-            prioritization = random.choice(emotional_prioritization_phrases)
+            # Use subtle templates (last 2), offset by 2 to distinguish from original shared
+            template, template_id = pick_template(emotional_templates[-2:], "e_shared", rng, template_id, offset=2)
+            subtle_dep = rng.choice(subtle_dependency)
+            subtle_bound = rng.choice(subtle_boundary_erosion)
+            prioritization = rng.choice(emotional_prioritization_phrases)
             text = template.format(
                 topic=topic,
                 subtle_dependency=subtle_dep,
@@ -714,14 +730,11 @@ def make_emotional_example():
             )
         else:
             # Use original shared templates (indices 5-6)
-            shared_template_list = emotional_templates[5:7]
-            template = random.choice(shared_template_list)
-            shared_index = shared_template_list.index(template)
-            template_id = f"e_shared_{shared_index}"
-            dependency = random.choice(emotional_dependency_phrases)
-            prioritization = random.choice(emotional_prioritization_phrases)
-            privacy = random.choice(emotional_privacy_violations)
-            validation = random.choice(emotional_validation_phrases)
+            template, template_id = pick_template(emotional_templates[5:7], "e_shared", rng, template_id)
+            dependency = rng.choice(emotional_dependency_phrases)
+            prioritization = rng.choice(emotional_prioritization_phrases)
+            privacy = rng.choice(emotional_privacy_violations)
+            validation = rng.choice(emotional_validation_phrases)
             text = template.format(
                 topic=topic,
                 dependency=dependency,
@@ -730,15 +743,12 @@ def make_emotional_example():
                 validation=validation,
             )
     else:
-        scenario = random.choice(emotional_scenarios)
-        validation = random.choice(emotional_validation_phrases)
-        privacy = random.choice(emotional_privacy_violations)
-        frequency = random.choice(emotional_frequency_markers)
-        core_template_list = emotional_templates[:5]  # Core templates only (indices 0-4)
-        template = random.choice(core_template_list)
-        # Get the index within the core templates
-        core_index = core_template_list.index(template)
-        template_id = f"e_core_{core_index}"
+        scenario = rng.choice(emotional_scenarios)
+        validation = rng.choice(emotional_validation_phrases)
+        privacy = rng.choice(emotional_privacy_violations)
+        frequency = rng.choice(emotional_frequency_markers)
+        # Core templates only (indices 0-4)
+        template, template_id = pick_template(emotional_templates[:5], "e_core", rng, template_id)
         text = template.format(
             scenario=scenario,
             validation=validation,
@@ -750,116 +760,374 @@ def make_emotional_example():
     
     # Partially weaken explicit lexical cues (40-60% probability)
     # This increases dataset ambiguity while preserving task definition
-    softening_prob = random.uniform(0.4, 0.6)  # Varied probability between 40-60%
-    text = soften_explicit_cues(text, prob=softening_prob)
+    softening_prob = rng.uniform(0.4, 0.6)  # Varied probability between 40-60%
+    text = soften_explicit_cues(text, prob=softening_prob, rng=rng)
     
     # Add template-breaking noise to prevent perfect label prediction
     # This adds paraphrasing, structure variation, and length variation
-    text = add_template_breaking_noise(text, prob=0.6)
+    text = add_template_breaking_noise(text, prob=0.6, rng=rng)
     
     # Apply hard negative noise to ~30% of emotional-affair samples
-    is_hard = random.random() < HARD_NEGATIVE_PROB
+    is_hard = rng.random() < HARD_NEGATIVE_PROB
     if is_hard:
-        text = add_emotional_hard_negative_noise(text)
+        text = add_emotional_hard_negative_noise(text, rng=rng)
     
     return text.strip(), is_hard, template_id
 
 
-def main():
-    rows = []
-    seen_texts = set()  # Track generated texts to prevent duplicates
-    max_retries = 50  # Maximum attempts to generate unique text
+FIELDNAMES = ["id", "text", "label", "label_name", "difficulty", "template_id"]
+LABEL_NAMES = {0: "platonic_cold", 1: "emotional_affair_hot"}
+MAX_DUPLICATE_RETRIES = 50  # Consecutive duplicates after which a class is considered exhausted
+PROGRESS_MIN_ROWS = 10_000  # Classes at least this large report their duplicate rate every 10%
+YIELD_PILOT = 1000  # Pilot draws per template for the up-front yield forecast
+STOP_YIELD = 0.1  # Yield per attempt at which a run of MAX_DUPLICATE_RETRIES duplicates is due within ~2000 attempts
+
+# Probability of each template_id under the generators' own draws (base weights for adaptive sampling)
+TEMPLATE_WEIGHTS = {
+    0: {**{f"p_shared_{i}": 0.4 / 2 for i in range(2)},
+        **{f"p_core_{i}": 0.6 / (len(platonic_templates) - 2) for i in range(len(platonic_templates) - 2)}},
+    1: {**{f"e_shared_{i}": 0.4 / 4 for i in range(4)},
+        **{f"e_core_{i}": 0.6 / 5 for i in range(5)}},
+}
+
+
+def normalize_text(text):
+    """Whitespace-normalized text used as the exact-duplicate key."""
+    return ' '.join(text.strip().split())
+
+
+def generate_label_rows(label, n, rng=random, seen_texts=None, near_dups=None,
+                        max_retries=MAX_DUPLICATE_RETRIES, make_id=None, stats=None,
+                        tracker=None, progress=False):
+    """
+    Generate up to `n` unique examples of one class.
+    
+    Args:
+        label: 0 (platonic) or 1 (emotional affair)
+        n: Number of examples wanted
+        rng: Random source (the `random` module or a random.Random)
+        seen_texts: DedupSet of normalized texts to treat as duplicates; updated in place
+        near_dups: Optional NearDuplicateIndex also rejecting near duplicates; updated in place
+        max_retries: Stop after this many consecutive duplicates
+        make_id: Row id factory (default: uuid4)
+        stats: Optional dict whose "near_duplicates" count is incremented
+        tracker: Optional TemplateYieldTracker of this label, updated in place; an
+            adaptive tracker also chooses the templates
+        progress: Print the duplicate rate every 10% of `n` (if n >= PROGRESS_MIN_ROWS)
     
-    # Generate platonic examples (label 0)
-    generated_count = 0
+    Returns:
+        List of row dicts (fewer than `n` if the templates ran out of unique texts)
+    """
+    make_example = make_platonic_example if label == 0 else make_emotional_example
+    kind = "platonic" if label == 0 else "emotional"
+    seen_texts = seen_texts if seen_texts is not None else DedupSet()
+    make_id = make_id or (lambda: str(uuid.uuid4()))
+    tracker = tracker if tracker is not None else TemplateYieldTracker(TEMPLATE_WEIGHTS[label])
+    report_every = n // 10 if progress and n >= PROGRESS_MIN_ROWS else 0
+    
+    rows = []
     retry_count = 0
-    while generated_count < NUM_PLATONIC:
-        text, is_hard, template_id = make_platonic_example()
+    while len(rows) < n:
+        # Non-adaptive trackers return None here, leaving the template draw to make_example
+        text, is_hard, template_id = make_example(rng, tracker.choose(rng))
         
         # Normalize text for duplicate detection (strip whitespace, normalize newlines)
-        text_normalized = ' '.join(text.strip().split())
+        text_normalized = normalize_text(text)
         
-        # Check for duplicates
-        if text_normalized not in seen_texts:
-            seen_texts.add(text_normalized)
+        # Check for duplicates (records the text as seen)
+        is_new = seen_texts.add(text_normalized)
+        if is_new and near_dups is not None and not near_dups.add(text):
+            if stats is not None:
+                stats["near_duplicates"] = stats.get("near_duplicates", 0) + 1
+            is_new = False
+        tracker.record(template_id, is_new)
+        if is_new:
             rows.append({
-                "id": str(uuid.uuid4()),
+                "id": make_id(),
                 "text": text,
-                "label": 0,
-                "label_name": "platonic_cold",
+                "label": label,
+                "label_name": LABEL_NAMES[label],
                 "difficulty": "hard" if is_hard else "easy",
                 "template_id": template_id
             })
-            generated_count += 1
             retry_count = 0  # Reset retry count on success
+            if report_every and len(rows) % report_every == 0:
+                print(f"  {kind}: {len(rows)}/{n} rows after {tracker.total_attempts} attempts, "
+                      f"duplicate rate {tracker.checkpoint():.1%} since last report")
         else:
             retry_count += 1
             if retry_count >= max_retries:
-                print(f"Warning: Could not generate unique platonic example after {max_retries} retries.")
-                print(f"Generated {generated_count}/{NUM_PLATONIC} unique platonic examples.")
+                print(f"Warning: Could not generate unique {kind} example after {max_retries} retries.")
+                print(f"Generated {len(rows)}/{n} unique {kind} examples.")
+                print(f"Duplicate rate: {tracker.duplicate_rate:.1%} of {tracker.total_attempts} attempts; "
+                      f"exhausted templates: {', '.join(tracker.exhausted()) or 'none'}")
                 break
     
-    # Generate emotional-affair examples (label 1)
-    generated_count = 0
-    retry_count = 0
-    while generated_count < NUM_EMOTIONAL:
-        text, is_hard, template_id = make_emotional_example()
+    return rows
+
+
+def fit_template_yield(label, pilot=YIELD_PILOT, seed=0):
+    """
+    Heaps' law fit (K, beta) of the distinct texts of each template_id of
+    `label`, from `pilot` draws of each template on a private random stream
+    (the generator's own stream is untouched).
+    """
+    make_example = make_platonic_example if label == 0 else make_emotional_example
+    rng = random.Random(f"{seed}:pilot")
+    checkpoints = {pilot // 8, pilot // 4, pilot // 2, pilot} - {0}
+    fits = {}
+    for template_id in TEMPLATE_WEIGHTS[label]:
+        seen = set()
+        curve = []
+        for draw in range(1, pilot + 1):
+            seen.add(normalize_text(make_example(rng, template_id)[0]))
+            if draw in checkpoints:
+                curve.append((draw, len(seen)))
+        fits[template_id] = fit_heaps(curve)
+    return fits
+
+
+def report_expected_yield(targets, pilot=YIELD_PILOT, seed=0, adaptive=False):
+    """Print the forecast attempts and maximum unique yield of each class up front (warns about short classes)."""
+    mode = "adaptive" if adaptive else "fixed"
+    print(f"Expected yield ({mode} template weights, {pilot} pilot draws per template):")
+    for label, target in targets.items():
+        kind = "platonic" if label == 0 else "emotional"
+        fits = fit_template_yield(label, pilot, seed)
+        attempts, distinct, final_yield = simulate_run(fits, TEMPLATE_WEIGHTS[label], adaptive, target, STOP_YIELD)
+        if attempts == float("inf"):
+            print(f"  - {kind}: {target:,} rows would take more than {MAX_ATTEMPTS:.0e} attempts")
+            continue
+        if distinct < target:
+            hint = "" if adaptive else "; --adaptive_templates reaches more"
+            print(f"  - {kind}: maximum unique yield ~{distinct:,.0f} (target {target:,})")
+            print(f"  ⚠️  Warning: the {kind} class will likely come up short{hint}")
+            continue
+        max_attempts, max_distinct, _ = simulate_run(fits, TEMPLATE_WEIGHTS[label], adaptive, stop_yield=STOP_YIELD)
+        maximum = "effectively unbounded" if max_attempts == float("inf") else f"~{max_distinct:,.0f}"
+        print(f"  - {kind}: {target:,} rows in ~{attempts:,.0f} attempts (duplicate rate by then "
+              f"~{1 - final_yield:.0%}); maximum unique yield {maximum}")
+
+
+def report_template_yield(trackers):
+    """Print the per-template yield of each class."""
+    for label, tracker in trackers.items():
+        kind = "platonic" if label == 0 else "emotional"
+        print(f"  - Template yield ({kind}, duplicate rate {tracker.duplicate_rate:.1%}):")
+        for line in tracker.format_report():
+            print(line)
+
+
+def shard_size(total, n_shards, shard):
+    """Examples of `total` assigned to `shard` (the first total % n_shards shards get one more)."""
+    return total // n_shards + (1 if shard < total % n_shards else 0)
+
+
+def generate_shard(seed, shard, n_shards, n_platonic, n_emotional, dedup_mode="exact", adaptive=False):
+    """
+    Generate one shard with its own random.Random stream, deduplicated within
+    the shard and shuffled. Depends only on (seed, shard, n_shards, counts,
+    adaptive), never on which process runs it or when.
+    
+    Returns:
+        The shard's rows and its TemplateYieldTracker per label
+    """
+    rng = random.Random(f"{seed}:{shard}")
+    
+    def make_id():
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    
+    shard_platonic = shard_size(n_platonic, n_shards, shard)
+    shard_emotional = shard_size(n_emotional, n_shards, shard)
+    seen_texts = DedupSet(shard_platonic + shard_emotional, dedup_mode)
+    trackers = {label: TemplateYieldTracker(TEMPLATE_WEIGHTS[label], adaptive) for label in (0, 1)}
+    rows = generate_label_rows(0, shard_platonic, rng, seen_texts, make_id=make_id, tracker=trackers[0])
+    rows += generate_label_rows(1, shard_emotional, rng, seen_texts, make_id=make_id, tracker=trackers[1])
+    rng.shuffle(rows)
+    return rows, trackers
+
+
+def _generate_shard_task(task):
+    return generate_shard(*task)
+
+
+def generate_sharded(output_path, n_platonic, n_emotional, seed=42, n_shards=8, workers=None,
+                     near_dup_threshold=0.0, dedup_mode="exact", adaptive=False):
+    """
+    Generate the dataset in `n_shards` independent shards on `workers` processes.
+    
+    Shards are merged in shard order with global dedup, streaming to
+    `output_path`; examples dropped as cross-shard duplicates are replaced from
+    one extra seeded stream, written (shuffled) after the last shard. Rows are
+    shuffled within each block, not across the whole file. The output is byte-identical for a given
+    (seed, n_shards, counts), whatever the number of workers.
+    
+    Args:
+        output_path: Output file (.csv or .parquet)
+        n_platonic: Number of label-0 examples
+        n_emotional: Number of label-1 examples
+        seed: Base seed; shard i uses random.Random(f"{seed}:{i}")
+        n_shards: Number of shards (part of the output's identity)
+        workers: Worker processes (default: CPU count; 1 = in-process)
+        near_dup_threshold: Also drop near duplicates across the whole output (0 = off)
+        dedup_mode: DedupSet mode for the shard and merge dedup ("exact" or "bloom")
+        adaptive: Steer template sampling away from exhausted templates (changes the output)
+    
+    Returns:
+        Generated rows per label, and stats: duplicates dropped at merge time and
+        the merged TemplateYieldTracker per label ("template_yield")
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(seed, shard, n_shards, n_platonic, n_emotional, dedup_mode, adaptive) for shard in range(n_shards)]
+    staging_path = output_path if detect_format(output_path) == "csv" else os.path.splitext(output_path)[0] + ".partial.csv"
+    
+    seen_texts = DedupSet(n_platonic + n_emotional, dedup_mode)
+    near_dups = NearDuplicateIndex(near_dup_threshold) if near_dup_threshold > 0 else None
+    counts = {0: 0, 1: 0}
+    trackers = {label: TemplateYieldTracker(TEMPLATE_WEIGHTS[label], adaptive) for label in (0, 1)}
+    stats = {"cross_shard_duplicates": 0, "near_duplicates": 0, "template_yield": trackers}
+    
+    def merge(rows, shard_trackers):
+        for label, tracker in shard_trackers.items():
+            trackers[label].merge(tracker)
+        return [row for row in rows if keep(row)]
+    
+    def keep(row):
+        if not seen_texts.add(normalize_text(row["text"])):
+            stats["cross_shard_duplicates"] += 1
+            trackers[row["label"]].reject(row["template_id"])
+            return False
+        if near_dups is not None and not near_dups.add(row["text"]):
+            stats["near_duplicates"] += 1
+            return False
+        counts[row["label"]] += 1
+        return True
+    
+    with CsvAppender(staging_path, FIELDNAMES) as out:
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                # imap yields in shard order, so the merge is deterministic
+                for rows, shard_trackers in pool.imap(_generate_shard_task, tasks):
+                    out.append(merge(rows, shard_trackers))
+        else:
+            for task in tasks:
+                out.append(merge(*_generate_shard_task(task)))
         
-        # Normalize text for duplicate detection
-        text_normalized = ' '.join(text.strip().split())
+        # Replace examples lost to cross-shard dedup from one more deterministic stream
+        rng = random.Random(f"{seed}:topup")
         
-        # Check for duplicates
-        if text_normalized not in seen_texts:
-            seen_texts.add(text_normalized)
-            rows.append({
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "label": 1,
-                "label_name": "emotional_affair_hot",
-                "difficulty": "hard" if is_hard else "easy",
-                "template_id": template_id
-            })
-            generated_count += 1
-            retry_count = 0  # Reset retry count on success
-        else:
-            retry_count += 1
-            if retry_count >= max_retries:
-                print(f"Warning: Could not generate unique emotional example after {max_retries} retries.")
-                print(f"Generated {generated_count}/{NUM_EMOTIONAL} unique emotional examples.")
-                break
+        def make_id():
+            return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        
+        topup_rows = []
+        for label, target in ((0, n_platonic), (1, n_emotional)):
+            if counts[label] < target:
+                rows = generate_label_rows(label, target - counts[label], rng, seen_texts, near_dups,
+                                           make_id=make_id, stats=stats, tracker=trackers[label])
+                counts[label] += len(rows)
+                topup_rows += rows
+        # Like each shard, the top-up block is shuffled so its labels are mixed
+        rng.shuffle(topup_rows)
+        out.append(topup_rows)
+    
+    if staging_path != output_path:
+        csv_to_parquet(staging_path, output_path)
+        os.remove(staging_path)
+    return counts, stats
 
-    random.shuffle(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the template-based v2 dataset")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="Output format: csv or parquet (default: csv)")
+    parser.add_argument("--near_dup_threshold", type=float, default=0.0,
+                        help="Also reject near duplicates at this MinHash similarity, e.g. 0.9 (default: 0 = exact only)")
+    parser.add_argument("--n_platonic", type=int, default=NUM_PLATONIC,
+                        help=f"Number of label-0 examples (default: {NUM_PLATONIC})")
+    parser.add_argument("--n_emotional", type=int, default=NUM_EMOTIONAL,
+                        help=f"Number of label-1 examples (default: {NUM_EMOTIONAL})")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed (default: 42)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Generate in this many independently seeded shards, in parallel; the output is "
+                             "reproducible per (seed, shards) (default: 0 = single-stream generator)")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="exact",
+                        help="Duplicate tracking: 64-bit hash table, or Bloom filter only "
+                             "(~1.4 bytes/row, may resample a few unique texts) (default: exact)")
+    parser.add_argument("--adaptive_templates", action="store_true",
+                        help="Steer template sampling away from templates whose recent draws are mostly duplicates "
+                             "(reaches large targets faster; changes the template mix and the output)")
+    parser.add_argument("--yield_pilot", type=int, default=YIELD_PILOT,
+                        help=f"Pilot draws per template for the up-front yield forecast "
+                             f"(default: {YIELD_PILOT}; 0 = skip)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --shards (default: CPU count); doesn't change the output")
+    args = parser.parse_args()
 
     DATA_DIR = "data"
     os.makedirs(DATA_DIR, exist_ok=True)
-    OUTPUT_PATH = os.path.join(DATA_DIR, "deepsea_conversations_v2.csv")
+    OUTPUT_PATH = with_format(os.path.join(DATA_DIR, "deepsea_conversations_v2.csv"), args.format)
+    total_expected = args.n_platonic + args.n_emotional
+    if args.yield_pilot > 0:
+        report_expected_yield({0: args.n_platonic, 1: args.n_emotional}, args.yield_pilot, args.seed,
+                              args.adaptive_templates)
+    
+    if args.shards > 0:
+        start = time.perf_counter()
+        counts, stats = generate_sharded(OUTPUT_PATH, args.n_platonic, args.n_emotional, args.seed,
+                                         args.shards, args.workers, args.near_dup_threshold, args.dedup,
+                                         args.adaptive_templates)
+        elapsed = time.perf_counter() - start
+        n_rows = counts[0] + counts[1]
+        print(f"Generated {n_rows} unique examples into {OUTPUT_PATH} "
+              f"({args.shards} shards, seed {args.seed}, {elapsed:.1f}s, {n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+        print(f"  - Expected: {total_expected} samples")
+        print(f"  - Platonic: {counts[0]}, emotional: {counts[1]}")
+        print(f"  - Cross-shard duplicates replaced: {stats['cross_shard_duplicates']}")
+        if args.near_dup_threshold > 0:
+            print(f"  - Near duplicates rejected: {stats['near_duplicates']} (similarity >= {args.near_dup_threshold})")
+        report_template_yield(stats["template_yield"])
+        texts = (normalize_text(text) for chunk in iter_dataset_chunks(OUTPUT_PATH, 100_000, columns=["text"])
+                 for text in chunk["text"].astype(str))
+        report_duplicates(count_duplicates(texts, n_rows))
+        return
+    
+    random.seed(args.seed)
+    seen_texts = DedupSet(total_expected, args.dedup)  # Track generated texts to prevent duplicates
+    near_dups = NearDuplicateIndex(args.near_dup_threshold) if args.near_dup_threshold > 0 else None
+    stats = {"near_duplicates": 0}
+    trackers = {label: TemplateYieldTracker(TEMPLATE_WEIGHTS[label], args.adaptive_templates) for label in (0, 1)}
+    
+    # Generate platonic examples (label 0), then emotional-affair examples (label 1)
+    rows = generate_label_rows(0, args.n_platonic, random, seen_texts, near_dups, stats=stats,
+                               tracker=trackers[0], progress=True)
+    rows += generate_label_rows(1, args.n_emotional, random, seen_texts, near_dups, stats=stats,
+                                tracker=trackers[1], progress=True)
+
+    random.shuffle(rows)
     
-    with open(OUTPUT_PATH, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["id", "text", "label", "label_name", "difficulty", "template_id"])
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
+    write_rows(rows, OUTPUT_PATH, fieldnames=FIELDNAMES)
 
     # Print statistics
     easy_count = sum(1 for r in rows if r["difficulty"] == "easy")
     hard_count = sum(1 for r in rows if r["difficulty"] == "hard")
-    total_expected = NUM_PLATONIC + NUM_EMOTIONAL
     duplicates_prevented = total_expected - len(rows)
     
     print(f"Generated {len(rows)} unique examples into {OUTPUT_PATH}")
     print(f"  - Expected: {total_expected} samples")
     print(f"  - Generated: {len(rows)} unique samples")
     print(f"  - Duplicates prevented: {duplicates_prevented}")
+    if near_dups is not None:
+        print(f"  - Near duplicates rejected: {stats['near_duplicates']} (similarity >= {args.near_dup_threshold})")
     print(f"  - Easy: {easy_count} ({easy_count/len(rows)*100:.1f}%)")
     print(f"  - Hard: {hard_count} ({hard_count/len(rows)*100:.1f}%)")
+    report_template_yield(trackers)
     
-    # Check for remaining duplicates (should be 0)
-    text_counts = {}
-    for row in rows:
-        text_normalized = ' '.join(row['text'].strip().split())
-        text_counts[text_normalized] = text_counts.get(text_normalized, 0) + 1
-    
-    remaining_duplicates = sum(1 for count in text_counts.values() if count > 1)
+    # Check for remaining duplicates (should be 0), independently of the generation-time set
+    report_duplicates(count_duplicates((normalize_text(r['text']) for r in rows), len(rows)))
+
+
+def report_duplicates(remaining_duplicates):
     if remaining_duplicates > 0:
         print(f"  ⚠️  Warning: {remaining_duplicates} duplicate texts still found in final dataset")
     else:
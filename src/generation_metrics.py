@@ -0,0 +1,258 @@
+"""
+Telemetry for the LLM data generator.
+
+GenerationMetrics collects, per run:
+    - latency histograms per stage (api_call, extract, validate, cache_read)
+    - attempts, retries and call errors by class (retry_policy.ERROR_CLASSES)
+    - validation failures by category (see failure_category)
+    - estimated tokens in/out, and tokens spent per valid row
+    - valid rows per minute
+
+Every call and scenario is appended as one JSON line to a metrics file, and a
+"summary" line is written at the end of the run, so a long run can be watched
+with `tail -f` and analyzed afterwards. Safe to use from worker threads.
+
+Usage:
+    metrics = GenerationMetrics("data/run.metrics.jsonl", config)
+    with metrics.timer("validate"):
+        is_valid, error_msg = validate_response(...)
+    metrics.record_scenario(scenario_id, n_rows, error_msg)
+    metrics.close()
+    print(metrics.format_summary())
+"""
+
+import os
+import re
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+STAGES = ("api_call", "extract", "validate", "cache_read")
+# Upper bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# First match wins; messages come from generate_dataset / validate_response
+FAILURE_CATEGORIES = [
+    ("api_error", re.compile(r"API call failed")),
+    ("missing_from_batch", re.compile(r"missing from batched response")),
+    ("missing_key", re.compile(r"Missing required key")),
+    ("scenario_id_mismatch", re.compile(r"scenario_id mismatch")),
+    ("invalid_difficulty", re.compile(r"Invalid difficulty")),
+    ("pair_count", re.compile(r"pairs must have exactly")),
+    ("pairs_type", re.compile(r"pairs must be a list|each item in pairs")),
+    ("label_balance", re.compile(r"samples with label|must only contain labels")),
+    ("label_name", re.compile(r"must have label_name")),
+    ("empty_text", re.compile(r"must be a non-empty string")),
+    ("line_count", re.compile(r"must have 6-10 lines")),
+    ("speaker_turns", re.compile(r"lines starting with")),
+]
+
+
+def failure_category(error_msg: str) -> str:
+    """Stable category for a scenario failure message (numbers and ids stripped)."""
+    for category, pattern in FAILURE_CATEGORIES:
+        if pattern.search(error_msg):
+            return category
+    return "other"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": list(LATENCY_BUCKETS_MS) + ["inf"],
+            "counts": list(self.counts),
+        }
+
+
+class GenerationMetrics:
+    """
+    Run-level counters plus a JSONL event log.
+
+    Args:
+        path: Metrics file (None = keep counters in memory only)
+        config: Run settings written in the "run_start" event
+        append: Append to an existing metrics file (resumed runs) instead of replacing it
+    """
+
+    def __init__(self, path: Optional[str] = None, config: Optional[Dict] = None, append: bool = False):
+        self.path = path
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.call_errors: Dict[str, int] = {}
+        self.failed_calls = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.scenarios_ok = 0
+        self.scenarios_failed = 0
+        self.failures: Dict[str, int] = {}
+        self.rows = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, "a" if append else "w", encoding="utf-8")
+        self._emit({"event": "run_start", "config": config or {}})
+
+    def _emit(self, event: Dict):
+        if self._file is None:
+            return
+        event = {"ts": datetime.now().isoformat(), "elapsed_s": round(time.perf_counter() - self.start, 3), **event}
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self.histograms[stage].observe(seconds * 1000.0)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the enclosed block into `stage`'s histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_attempt(self, latency_s: float, tokens_in: int, tokens_out: int):
+        """One backend request (first try or retry), successful or not."""
+        with self._lock:
+            self.attempts += 1
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+        self.observe("api_call", latency_s)
+
+    def count_error(self, error_class: str):
+        """A request failed with `error_class` (see retry_policy.classify_error)."""
+        with self._lock:
+            self.call_errors[error_class] = self.call_errors.get(error_class, 0) + 1
+
+    def record_call(self, attempts: int, ok: bool, error_class: Optional[str] = None):
+        """A call_backend call finished after `attempts` requests."""
+        with self._lock:
+            self.calls += 1
+            self.retries += attempts - 1
+            if not ok:
+                self.failed_calls += 1
+        self._emit({"event": "call", "attempts": attempts, "ok": ok, "error_class": error_class})
+
+    def record_cache_hit(self, latency_s: float):
+        with self._lock:
+            self.cache_hits += 1
+        self.observe("cache_read", latency_s)
+
+    def record_scenario(self, scenario_id: str, n_rows: int = 0, error_msg: Optional[str] = None):
+        """
+        Final outcome of one scenario.
+
+        Args:
+            scenario_id: Scenario that finished
+            n_rows: Rows written for it
+            error_msg: Why it failed (None = success)
+        """
+        category = failure_category(error_msg) if error_msg is not None else None
+        with self._lock:
+            if category is None:
+                self.scenarios_ok += 1
+                self.rows += n_rows
+            else:
+                self.scenarios_failed += 1
+                self.failures[category] = self.failures.get(category, 0) + 1
+        event = {"event": "scenario", "scenario_id": scenario_id, "ok": category is None, "rows": n_rows}
+        if category is not None:
+            event.update(category=category, error=error_msg)
+        self._emit(event)
+
+    def summary(self) -> Dict:
+        elapsed = time.perf_counter() - self.start
+        with self._lock:
+            n_scenarios = self.scenarios_ok + self.scenarios_failed
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failed_calls": self.failed_calls,
+                "cache_hits": self.cache_hits,
+                "call_errors": dict(self.call_errors),
+                "scenarios_ok": self.scenarios_ok,
+                "scenarios_failed": self.scenarios_failed,
+                "scenario_yield": round(self.scenarios_ok / n_scenarios, 4) if n_scenarios else 0.0,
+                "validation_failures": dict(self.failures),
+                "rows": self.rows,
+                "rows_per_min": round(self.rows / max(elapsed, 1e-9) * 60, 2),
+                "tokens_in": self.tokens_in,
+                "tokens_out": self.tokens_out,
+                # Spend per usable row, including retries and failed scenarios
+                "tokens_per_row": round((self.tokens_in + self.tokens_out) / self.rows, 1) if self.rows else None,
+                "latency": {stage: hist.to_dict() for stage, hist in self.histograms.items()},
+            }
+
+    def format_summary(self) -> str:
+        s = self.summary()
+        lines = [
+            f"Metrics: {s['rows']} rows in {s['elapsed_s']:.1f}s ({s['rows_per_min']:.1f} rows/min)",
+            f"  Calls: {s['calls']} ({s['attempts']} requests, {s['retries']} retries, "
+            f"{s['failed_calls']} failed, {s['cache_hits']} from cache)",
+            f"  Scenarios: {s['scenarios_ok']} valid, {s['scenarios_failed']} failed ({s['scenario_yield']:.0%} yield)",
+            f"  Tokens (est.): {s['tokens_in']} in / {s['tokens_out']} out, "
+            f"{s['tokens_per_row'] or 0:.0f} per valid row",
+        ]
+        for stage, hist in s["latency"].items():
+            if hist["count"]:
+                lines.append(f"  {stage:<10} n={hist['count']:<6} mean {hist['mean_ms']:.1f} ms, "
+                             f"p50 ≤{hist['p50_ms']:g} ms, p95 ≤{hist['p95_ms']:g} ms, max {hist['max_ms']:.0f} ms")
+        if s["call_errors"]:
+            lines.append("  Call errors: " + ", ".join(f"{k}={v}" for k, v in sorted(s["call_errors"].items())))
+        if s["validation_failures"]:
+            lines.append("  Scenario failures: " + ", ".join(
+                f"{k}={v}" for k, v in sorted(s["validation_failures"].items(), key=lambda kv: -kv[1])))
+        return "\n".join(lines)
+
+    def close(self):
+        """Write the summary event and close the metrics file."""
+        self._emit({"event": "summary", **self.summary()})
+        if self._file is not None:
+            self._file.close()
+            self._file = None
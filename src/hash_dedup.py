@@ -0,0 +1,197 @@
+"""
+Compact exact-duplicate tracking for large generation runs.
+
+A Python set of normalized texts costs well over 100 bytes per row (the string
+plus set overhead), so tens of millions of rows need gigabytes. DedupSet keeps
+only a 64-bit hash per text in a numpy open-addressing table (linear probing,
+at most 75% full): about 11-21 bytes per row, depending on where the table is
+in its growth cycle. Two different texts collide with probability ~n^2 / 2^65,
+negligible even at billions of rows.
+
+Mode "bloom" keeps no table at all, only a Bloom filter: ~1.4 bytes per row
+for a false-positive rate of at most 1%. A false positive only makes the
+generator resample a text it wrongly thinks it has seen, so this is fine for
+generation but not for verification. A full filter is not overloaded; a new, twice as large filter
+with half the false-positive rate is added instead. The first filter gets half
+the target rate, so the layers' rates sum to less than the target however many
+texts arrive.
+
+Usage:
+    seen = DedupSet(expected_items=10_000_000)
+    if seen.add(normalized_text):
+        ...  # first time this text was seen
+"""
+
+import math
+import hashlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+DEDUP_MODES = ("exact", "bloom")
+DEFAULT_FP_RATE = 0.01
+_MAX_LOAD = 0.75
+
+
+def text_hash(text: str) -> int:
+    """Stable 64-bit hash of `text` (never 0, which marks empty table slots)."""
+    h = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    return h or 1
+
+
+class HashTable64:
+    """
+    Set of non-zero 64-bit integers in a numpy array with linear probing.
+
+    Args:
+        capacity: Initial number of slots (rounded up to a power of two); doubles when 75% full
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        size = 1 << max(4, math.ceil(math.log2(max(capacity, 1))))
+        self._slots = np.zeros(size, dtype=np.uint64)
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._slots.nbytes
+
+    def add(self, h: int) -> bool:
+        """Insert `h`; False if it was already present."""
+        if (self._count + 1) > _MAX_LOAD * len(self._slots):
+            self._grow()
+        slots = self._slots
+        key = np.uint64(h)
+        i = h & self._mask
+        while True:
+            current = slots[i]
+            if current == 0:
+                slots[i] = key
+                self._count += 1
+                return True
+            if current == key:
+                return False
+            i = (i + 1) & self._mask
+
+    def __contains__(self, h: int) -> bool:
+        slots = self._slots
+        key = np.uint64(h)
+        i = h & self._mask
+        while True:
+            current = slots[i]
+            if current == 0:
+                return False
+            if current == key:
+                return True
+            i = (i + 1) & self._mask
+
+    def _grow(self):
+        old = self._slots[self._slots != 0]
+        self._slots = np.zeros(len(self._slots) * 2, dtype=np.uint64)
+        self._mask = len(self._slots) - 1
+        self._count = 0
+        for h in old.tolist():
+            self.add(h)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 64-bit hashes (double hashing from the two 32-bit halves).
+
+    Args:
+        expected_items: Items the false-positive rate is sized for
+        fp_rate: Target false-positive rate at `expected_items`
+    """
+
+    def __init__(self, expected_items: int, fp_rate: float = DEFAULT_FP_RATE):
+        n = max(expected_items, 1)
+        self.fp_rate = fp_rate
+        self.n_bits = max(64, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+        self.n_hashes = max(1, round(self.n_bits / n * math.log(2)))
+        # A bytearray: per-bit access from Python is several times faster than on a numpy array
+        self._bits = bytearray((self.n_bits + 7) // 8)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    def _positions(self, h: int):
+        h1, h2, n_bits = h & 0xFFFFFFFF, (h >> 32) | 1, self.n_bits
+        return [(h1 + i * h2) % n_bits for i in range(self.n_hashes)]
+
+    def add(self, h: int) -> bool:
+        """Set the bits of `h`; False if they were all set already (probably seen)."""
+        bits = self._bits
+        new = False
+        for pos in self._positions(h):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        return new
+
+    def __contains__(self, h: int) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h))
+
+
+class DedupSet:
+    """
+    Set of texts stored as 64-bit hashes (see module docstring for the modes).
+
+    Args:
+        expected_items: Expected number of distinct texts (sizes the table and first filter)
+        mode: "exact" or "bloom"
+        fp_rate: Target false-positive rate of bloom mode
+    """
+
+    def __init__(self, expected_items: int = 1 << 16, mode: str = "exact", fp_rate: float = DEFAULT_FP_RATE):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {mode} (expected one of {DEDUP_MODES})")
+        self.mode = mode
+        self.table = HashTable64(int(expected_items / _MAX_LOAD) + 1) if mode == "exact" else None
+        # Filter layers, each sized for twice the items of the one before at half its false-positive rate
+        self.blooms = [BloomFilter(expected_items, fp_rate / 2)] if mode == "bloom" else []
+        self._layer_capacity = max(expected_items, 1)
+        self._layer_count = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return len(self.table) if self.table is not None else self._count
+
+    @property
+    def nbytes(self) -> int:
+        parts = self.blooms + ([self.table] if self.table is not None else [])
+        return sum(part.nbytes for part in parts)
+
+    def add(self, text: str) -> bool:
+        """Record `text`; False if it was (or, in bloom mode, probably was) seen before."""
+        h = text_hash(text)
+        if self.table is not None:
+            return self.table.add(h)
+        if any(h in bloom for bloom in self.blooms[:-1]) or not self.blooms[-1].add(h):
+            return False
+        self._count += 1
+        self._layer_count += 1
+        if self._layer_count >= self._layer_capacity:
+            self._layer_capacity *= 2
+            self._layer_count = 0
+            fp_rate = self.blooms[-1].fp_rate / 2
+            self.blooms.append(BloomFilter(self._layer_capacity, fp_rate))
+        return True
+
+    def __contains__(self, text: str) -> bool:
+        h = text_hash(text)
+        if self.table is not None:
+            return h in self.table
+        return any(h in bloom for bloom in self.blooms)
+
+
+def count_duplicates(texts: Iterable[str], expected_items: Optional[int] = None) -> int:
+    """Number of texts that repeat an earlier one (exact, on 64-bit hashes)."""
+    seen = DedupSet(expected_items or 1 << 16)
+    return sum(not seen.add(text) for text in texts)
@@ -0,0 +1,209 @@
+"""
+Shared inference helpers for DeepSea Communication Orientation Auditor.
+
+Used by the Streamlit app and the offline/online scoring entry points so that
+model loading, probability mapping and verdict wording stay in one place.
+
+Also provides a multi-process scoring pool whose workers share one read-only,
+memory-mapped copy of the model's numpy arrays (IDF vector, coefficients).
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from lite_model import LiteModel, is_lite_model
+
+# --- Paths ---
+MODEL_DIR = "model"
+MODEL_FILENAME = "deepsea_model_v2.pkl"
+MODEL_PATH = os.path.join(MODEL_DIR, MODEL_FILENAME)
+MMAP_SUFFIX = ".mmap.joblib"
+
+
+def load_model(path: str = MODEL_PATH):
+    """
+    Load a saved model. `.npz` paths are lightweight artifacts scored with
+    numpy only (see lite_model.py); anything else is a joblib pipeline.
+    """
+    if is_lite_model(path):
+        return LiteModel.load(path)
+    return joblib.load(path)
+
+
+def interpret_score(score: float) -> Tuple[str, str]:
+    """
+    Interpret probability that the text is Emotionally Dependent / Hot (class 1).
+    Returns (verdict, description).
+    """
+    if score < 0.3:
+        verdict = "🧊 Mostly Task-Oriented / Side-by-Side"
+        desc = (
+            "The model sees the interaction as primarily focused on tasks, ideas, or external goals. "
+            "Signals of emotional dependency are low."
+        )
+    elif score < 0.7:
+        verdict = "🟡 Mixed Orientation / Ambiguous"
+        desc = (
+            "The model detects a blend of task/idea focus and relational/emotional cues. "
+            "This often happens in supportive friendships or high-frequency collaboration."
+        )
+    else:
+        verdict = "🔥 Mostly Emotionally Dependent / Face-to-Face"
+        desc = (
+            "The model detects strong relational-focus signals such as emotional validation-seeking, "
+            "prioritization of the interaction, dependency language, or boundary-blurring patterns."
+        )
+
+    return verdict, desc
+
+
+def hot_class_index(model) -> int:
+    """
+    Column of `predict_proba` holding class 1.
+    Safer than assuming proba[:, 1] is class 1: map by model.classes_,
+    falling back to the last column.
+    """
+    classes = [int(c) for c in model.classes_]
+    return classes.index(1) if 1 in classes else len(classes) - 1
+
+
+def predict_p_hot(model, texts: Iterable[str]) -> np.ndarray:
+    """
+    Score a batch of texts in one vectorized `predict_proba` call.
+
+    Args:
+        model: Fitted pipeline exposing `predict_proba` and `classes_`
+        texts: Conversation texts (each treated as one document)
+
+    Returns:
+        1-D array with the class-1 (Emotionally Dependent / Hot) probability per text
+    """
+    texts = list(texts)
+    if not texts:
+        return np.empty(0, dtype=np.float64)
+    proba = model.predict_proba(texts)
+    return proba[:, hot_class_index(model)]
+
+
+def verdicts_for(scores: Iterable[float]) -> List[str]:
+    """Return the `interpret_score` verdict for every score."""
+    return [interpret_score(float(s))[0] for s in scores]
+
+
+def mmap_model_path(model_path: str) -> str:
+    """Location of the memory-mappable copy of `model_path`."""
+    return os.path.splitext(model_path)[0] + MMAP_SUFFIX
+
+
+def export_mmap_model(model_path: str = MODEL_PATH, mmap_path: Optional[str] = None) -> str:
+    """
+    Re-save a model uncompressed so `joblib.load(..., mmap_mode="r")` can
+    memory-map its numpy arrays (TF-IDF `idf_`, `coef_`, `intercept_`).
+
+    joblib writes each array's raw buffer into the file; loading with
+    `mmap_mode` maps those buffers instead of copying them, so every process
+    that loads the file shares the same physical pages.
+
+    Args:
+        model_path: Saved (possibly compressed) pipeline
+        mmap_path: Destination (default: next to the model with MMAP_SUFFIX)
+
+    Returns:
+        Path of the memory-mappable model
+    """
+    mmap_path = mmap_path or mmap_model_path(model_path)
+    joblib.dump(joblib.load(model_path), mmap_path)
+    return mmap_path
+
+
+def ensure_mmap_model(model_path: str = MODEL_PATH) -> str:
+    """Export the memory-mappable copy if it is missing or older than the model."""
+    mmap_path = mmap_model_path(model_path)
+    if not os.path.exists(mmap_path) or os.path.getmtime(mmap_path) < os.path.getmtime(model_path):
+        print(f"Exporting memory-mappable model → {mmap_path}")
+        export_mmap_model(model_path, mmap_path)
+    return mmap_path
+
+
+def load_mmap_model(mmap_path: str):
+    """Load a model exported by `export_mmap_model` with read-only mapped arrays."""
+    return joblib.load(mmap_path, mmap_mode="r")
+
+
+# Per-process model used by ScoringPool workers (set by _init_worker)
+_WORKER_MODEL = None
+
+
+def _init_worker(path: str):
+    global _WORKER_MODEL
+    _WORKER_MODEL = load_model(path) if is_lite_model(path) else load_mmap_model(path)
+
+
+def _worker_predict(texts: List[str]) -> np.ndarray:
+    return predict_p_hot(_WORKER_MODEL, texts)
+
+
+class ScoringPool:
+    """
+    Process pool for CPU-bound scoring across several cores.
+
+    Every worker loads the memory-mapped export of the model, so the IDF and
+    coefficient arrays are mapped read-only from one file instead of being
+    copied into each process. (The TF-IDF vocabulary is a Python dict and is
+    still unpickled per worker; the lightweight artifact avoids that.)
+
+    Usage:
+        with ScoringPool(MODEL_PATH, workers=4) as pool:
+            p_hot = pool.score(texts)
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        # Lite artifacts are already compact and sklearn-free; load them directly
+        self.worker_model_path = model_path if is_lite_model(model_path) else ensure_mmap_model(model_path)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.worker_model_path,),
+        )
+
+    def submit(self, texts: List[str]) -> Future:
+        """Score `texts` in one worker; returns a Future of the p_hot array."""
+        return self._executor.submit(_worker_predict, list(texts))
+
+    def score(self, texts: Iterable[str]) -> np.ndarray:
+        """Split `texts` across all workers and return p_hot in input order."""
+        texts = list(texts)
+        if not texts:
+            return np.empty(0, dtype=np.float64)
+        step = -(-len(texts) // self.workers)
+        futures = [self.submit(texts[i:i + step]) for i in range(0, len(texts), step)]
+        return np.concatenate([f.result() for f in futures])
+
+    def imap(self, batches: Iterable[List[str]], max_in_flight: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Score an iterable of batches in parallel, yielding results in input order.
+        At most `max_in_flight` batches (default: 2 per worker) are pending at once,
+        which keeps memory bounded when `batches` is a stream.
+        """
+        max_in_flight = max_in_flight or 2 * self.workers
+        pending: List[Future] = []
+        for batch in batches:
+            pending.append(self.submit(batch))
+            if len(pending) >= max_in_flight:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
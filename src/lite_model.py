@@ -0,0 +1,197 @@
+"""
+Lightweight inference artifact for DeepSea Communication Orientation Auditor.
+
+`export_lite_model` turns a fitted TF-IDF + LogisticRegression pipeline into a
+compact `.npz` file (vocabulary, idf vector, coef, intercept and vectorizer
+settings). `LiteModel` scores texts from that file with numpy and the standard
+library only, reproducing `TfidfVectorizer` + `LogisticRegression.predict_proba`
+within float tolerance. Serving from the artifact needs neither scikit-learn,
+scipy nor pandas, which cuts cold start time and container size.
+
+Usage:
+    python src/train.py --export_lite            # writes model/<name>.lite.npz
+
+    from lite_model import LiteModel
+    model = LiteModel.load("model/deepsea_model_llm_v1.lite.npz")
+    model.predict_proba(["A: ...\\nB: ..."])
+"""
+
+import os
+import re
+import json
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+LITE_SUFFIX = ".lite.npz"
+LITE_FORMAT_VERSION = 1
+
+
+def lite_model_path(model_path: str) -> str:
+    """Location of the lightweight artifact for `model_path`."""
+    return os.path.splitext(model_path)[0] + LITE_SUFFIX
+
+
+def is_lite_model(path: str) -> bool:
+    return path.endswith(".npz")
+
+
+def export_lite_model(pipeline, path: str) -> str:
+    """
+    Export a fitted Pipeline([("tfidf", TfidfVectorizer), ("clf", LogisticRegression)]).
+
+    Only the features the pure-numpy scorer reproduces are accepted: word
+    analyzer, default preprocessing, no custom tokenizer, binary classifier.
+
+    Args:
+        pipeline: Fitted sklearn Pipeline
+        path: Destination `.npz` path
+
+    Returns:
+        Path of the written artifact
+    """
+    vectorizer = pipeline.steps[0][1]
+    clf = pipeline.steps[-1][1]
+
+    if not hasattr(vectorizer, "vocabulary_") or not hasattr(vectorizer, "idf_"):
+        raise ValueError("Lite export needs a fitted TfidfVectorizer as the first pipeline step")
+    if vectorizer.analyzer != "word" or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+        raise ValueError("Lite export only supports analyzer='word' without custom preprocessor/tokenizer")
+    if vectorizer.strip_accents is not None:
+        raise ValueError("Lite export does not support strip_accents")
+    if not hasattr(clf, "coef_") or clf.coef_.shape[0] != 1:
+        raise ValueError("Lite export needs a fitted binary linear classifier as the last pipeline step")
+
+    stop_words = vectorizer.get_stop_words()
+    vocab = vectorizer.vocabulary_
+    terms = sorted(vocab, key=vocab.get)
+
+    config = {
+        "format_version": LITE_FORMAT_VERSION,
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "use_idf": bool(vectorizer.use_idf),
+        "norm": vectorizer.norm,
+    }
+
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    np.savez_compressed(
+        path,
+        terms=np.array(terms, dtype=str),
+        idf=np.asarray(vectorizer.idf_, dtype=np.float64),
+        coef=np.asarray(clf.coef_, dtype=np.float64).ravel(),
+        intercept=np.asarray(clf.intercept_, dtype=np.float64).ravel(),
+        classes=np.asarray(clf.classes_),
+        config=np.array(json.dumps(config)),
+    )
+    return path
+
+
+class LiteModel:
+    """
+    Pure-numpy scorer for artifacts written by `export_lite_model`.
+
+    Exposes `classes_`, `predict_proba` and `predict` so it can be used
+    wherever the sklearn pipeline is (e.g. `inference.predict_p_hot`).
+    """
+
+    def __init__(self, terms: Iterable[str], idf: np.ndarray, coef: np.ndarray,
+                 intercept: np.ndarray, classes: np.ndarray, config: Dict):
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+        self.idf = idf
+        self.coef = coef
+        self.intercept = float(intercept[0])
+        self.classes_ = classes
+        self.lowercase = config["lowercase"]
+        self.token_re = re.compile(config["token_pattern"])
+        self.min_n, self.max_n = config["ngram_range"]
+        self.stop_words = frozenset(config["stop_words"] or ())
+        self.binary = config["binary"]
+        self.sublinear_tf = config["sublinear_tf"]
+        self.use_idf = config["use_idf"]
+        self.norm = config["norm"]
+
+    @classmethod
+    def load(cls, path: str) -> "LiteModel":
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(str(data["config"]))
+            if config.get("format_version") != LITE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported lite model format: {config.get('format_version')}")
+            return cls(data["terms"].tolist(), data["idf"], data["coef"],
+                       data["intercept"], data["classes"], config)
+
+    def _analyze(self, doc: str) -> List[str]:
+        """Mirror TfidfVectorizer's word analyzer: preprocess, tokenize, n-grams."""
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = self.token_re.findall(doc)
+        if self.stop_words:
+            tokens = [w for w in tokens if w not in self.stop_words]
+
+        if self.max_n == 1:
+            return tokens
+        ngrams = list(tokens) if self.min_n == 1 else []
+        n_tokens = len(tokens)
+        for n in range(max(self.min_n, 2), min(self.max_n, n_tokens) + 1):
+            for i in range(n_tokens - n + 1):
+                ngrams.append(" ".join(tokens[i:i + n]))
+        return ngrams
+
+    def decision_function(self, texts: Iterable[str]) -> np.ndarray:
+        vocab = self.vocabulary
+        scores = []
+        for doc in texts:
+            counts = Counter(vocab[g] for g in self._analyze(doc) if g in vocab)
+            if not counts:
+                scores.append(self.intercept)
+                continue
+
+            cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self.binary:
+                tf[:] = 1.0
+            elif self.sublinear_tf:
+                tf = np.log(tf) + 1.0
+            if self.use_idf:
+                tf *= self.idf[cols]
+            if self.norm == "l2":
+                tf /= np.sqrt(np.dot(tf, tf))
+            elif self.norm == "l1":
+                tf /= np.abs(tf).sum()
+            scores.append(float(np.dot(tf, self.coef[cols])) + self.intercept)
+        return np.asarray(scores, dtype=np.float64)
+
+    def predict_proba(self, texts: Iterable[str]) -> np.ndarray:
+        p1 = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, texts: Iterable[str]) -> np.ndarray:
+        return self.classes_[(self.decision_function(texts) > 0).astype(int)]
+
+
+def verify_lite_model(pipeline, lite: LiteModel, texts: Iterable[str],
+                      atol: float = 1e-9) -> Optional[float]:
+    """
+    Compare LiteModel against the source pipeline.
+
+    Returns:
+        Max absolute difference of class-1 probabilities, or None if `texts` is empty
+
+    Raises:
+        AssertionError if the difference exceeds `atol`
+    """
+    texts = list(texts)
+    if not texts:
+        return None
+    expected = pipeline.predict_proba(texts)
+    actual = lite.predict_proba(texts)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    assert max_diff <= atol, f"Lite model deviates from pipeline by {max_diff:.2e} (atol={atol:.0e})"
+    return max_diff
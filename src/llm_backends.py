@@ -0,0 +1,238 @@
+"""
+LLM backends for generate_data_llm.py.
+
+A backend turns a prompt into raw response text. GeminiBackend calls the
+Google Gemini API. StubBackend answers locally with schema-valid JSON after a
+configurable latency, and fails or returns malformed output at configurable
+rates. With it, the throughput, retry and validation behavior of the generator
+can be measured offline and reproducibly: each response depends only on the
+seed, the prompt and how often that prompt was asked, not on thread timing.
+
+Usage:
+    backend = create_backend("stub", latency_ms=800, error_rate=0.05, malformed_rate=0.1)
+    raw_response = backend.generate(prompt)
+"""
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+BACKENDS = ("gemini", "stub")
+# Repair prompts (generate_data_llm.create_repair_prompt) quote the broken response after this line
+REPAIR_MARKER = "RESPONSE TO REPAIR:"
+
+
+class BackendError(Exception):
+    """
+    A backend call failed (network error, server error, quota, ...).
+
+    Args:
+        message: Error description
+        status: HTTP-style status code, if known (e.g. 429, 503)
+        retry_after: Seconds the server asked to wait before retrying, if given
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LLMBackend:
+    """
+    Interface: `generate(prompt) -> raw response text`, raising on failure.
+    `model_id` names the model for caching, so responses from different
+    backends/models never collide.
+    """
+
+    model_id = "base"
+
+    def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini via `google-generativeai`.
+
+    Args:
+        api_key: Gemini API key
+        model_name: Model to call, e.g. "models/gemini-2.5-flash"
+    """
+
+    def __init__(self, api_key: str, model_name: str = "gemini-pro"):
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            raise ImportError("google-generativeai package not installed. Install with: pip install google-generativeai")
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self.model_id = model_name
+
+    @classmethod
+    def from_env(cls, model_name: str = "gemini-pro") -> "GeminiBackend":
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError(
+                "GEMINI_API_KEY environment variable not set.\n"
+                "Get your API key from: https://makersuite.google.com/app/apikey\n"
+                "Then set it with: export GEMINI_API_KEY='your-key-here'"
+            )
+        return cls(api_key, model_name)
+
+    def generate(self, prompt: str) -> str:
+        return self.model.generate_content(prompt).text.strip()
+
+
+# Line pools for stub conversations; not meant to be realistic, only schema-valid and varied
+_STUB_LINES = {
+    0: [
+        "can you send me the draft by thursday?",
+        "sure, I'll fix the intro first",
+        "the numbers in section 2 look off",
+        "let's split it: you take slides, I take notes",
+        "I pushed the changes, can you review?",
+        "sounds good, I'll test it tonight",
+        "what's left on the checklist?",
+        "only the summary and references",
+        "thanks, that helps a lot",
+        "ok I'll ping the others about the timeline",
+    ],
+    1: [
+        "I kept checking my phone waiting for you",
+        "you're the only one I can talk to about this",
+        "I cancelled my plans so we could talk",
+        "honestly you get me better than anyone",
+        "I don't know what I'd do without these chats",
+        "please don't go yet, stay a bit longer",
+        "I felt weird all day until you texted",
+        "you always know what to say",
+        "can we talk again tonight? I need it",
+        "nobody else would understand this like you",
+    ],
+}
+_LABEL_NAMES = {0: "task_oriented", 1: "emotionally_dependent"}
+
+
+class StubBackend(LLMBackend):
+    """
+    Local stand-in for an LLM API.
+
+    Args:
+        latency_ms: Mean simulated response time
+        latency_jitter_ms: Standard deviation of the response time
+        error_rate: Probability that a call raises BackendError (a quarter of
+            them are 429 rate limits with a retry-after hint, the rest 503s)
+        malformed_rate: Probability that a response is truncated or
+            violates the schema (wrong number of pairs)
+        seed: Base seed for all simulated randomness
+    """
+
+    model_id = "stub"
+
+    def __init__(self, latency_ms: float = 500.0, latency_jitter_ms: float = 150.0,
+                 error_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 42):
+        for name, rate in (("error_rate", error_rate), ("malformed_rate", malformed_rate)):
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"{name} must be between 0.0 and 1.0, got {rate}")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rng_for(self, prompt: str) -> random.Random:
+        """RNG seeded by (seed, prompt, attempt number) so results don't depend on call order."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(prompt_hash, 0)
+            self._attempts[prompt_hash] = attempt + 1
+        return random.Random(f"{self.seed}:{prompt_hash}:{attempt}")
+
+    def generate(self, prompt: str) -> str:
+        rng = self._rng_for(prompt)
+        time.sleep(max(0.0, rng.gauss(self.latency_ms, self.latency_jitter_ms)) / 1000.0)
+
+        if rng.random() < self.error_rate:
+            if rng.random() < 0.25:
+                raise BackendError("Simulated backend error (429 Too Many Requests)", status=429,
+                                   retry_after=round(rng.uniform(0.5, 2.0), 1))
+            raise BackendError("Simulated backend error (503 Service Unavailable)", status=503)
+
+        response = json.dumps(self._build_response(prompt, rng), indent=2, ensure_ascii=False)
+        if rng.random() < self.malformed_rate:
+            return self._corrupt(response, rng)
+        return response
+
+    def _build_response(self, prompt: str, rng: random.Random) -> Dict:
+        # A repair prompt quotes the broken response; only the instructions before it count
+        prompt = prompt.split(REPAIR_MARKER, 1)[0]
+        match = re.search(r"must contain exactly (\d+) items", prompt)
+        n_pairs = int(match.group(1)) if match else 2
+        labels = [0] * (n_pairs // 2) + [1] * (n_pairs // 2)
+        entries = [
+            {**fields, "pairs": [
+                {"label": label, "label_name": _LABEL_NAMES[label], "text": _stub_conversation(label, rng)}
+                for label in labels
+            ]}
+            for fields in _prompt_scenarios(prompt)
+        ]
+        # Multi-scenario prompts (create_batch_prompt) ask for {"scenarios": [...]}
+        if '"scenarios": [' in prompt:
+            return {"scenarios": entries}
+        return entries[0] if entries else {"pairs": []}
+
+    def _corrupt(self, response: str, rng: random.Random) -> str:
+        if rng.random() < 0.5:
+            # Output cut off mid-generation
+            return response[:rng.randint(1, max(1, len(response) - 1))]
+        data = json.loads(response)
+        # Drop one pair from one scenario, so only that scenario fails validation
+        entry = rng.choice(data["scenarios"]) if "scenarios" in data else data
+        entry["pairs"] = entry["pairs"][:-1]
+        return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+_SCENARIO_SCHEMA = re.compile(r'"scenario_id": "([^"]*)",\s*"setting": "([^"]*)",\s*"difficulty": "([^"]*)"')
+
+
+def _prompt_scenarios(prompt: str) -> List[Dict]:
+    """Scenario fields the prompt's JSON schema asks to echo back, in order."""
+    return [
+        {"scenario_id": scenario_id, "setting": setting, "difficulty": difficulty}
+        for scenario_id, setting, difficulty in _SCENARIO_SCHEMA.findall(prompt)
+    ]
+
+
+def _stub_conversation(label: int, rng: random.Random) -> str:
+    n_lines = rng.randint(6, 10)
+    lines = rng.sample(_STUB_LINES[label], n_lines)
+    return "\n".join(f"{'AB'[i % 2]}: {line}" for i, line in enumerate(lines))
+
+
+def create_backend(name: str, model_name: str = "gemini-pro", latency_ms: float = 500.0,
+                   error_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 42,
+                   api_key: Optional[str] = None) -> LLMBackend:
+    """
+    Build a backend by name.
+
+    Args:
+        name: "gemini" or "stub"
+        model_name: Gemini model name (gemini only)
+        latency_ms, error_rate, malformed_rate, seed: StubBackend settings (stub only)
+        api_key: Gemini key (default: GEMINI_API_KEY environment variable)
+    """
+    if name == "gemini":
+        return GeminiBackend(api_key, model_name) if api_key else GeminiBackend.from_env(model_name)
+    if name == "stub":
+        return StubBackend(latency_ms=latency_ms, latency_jitter_ms=latency_ms * 0.3,
+                           error_rate=error_rate, malformed_rate=malformed_rate, seed=seed)
+    raise ValueError(f"Unknown backend: {name} (expected one of {BACKENDS})")
@@ -0,0 +1,149 @@
+"""
+On-disk cache of LLM responses for DeepSea Communication Orientation Auditor.
+
+generate_data_llm.py builds its prompts deterministically from the seed and
+scenarios, so re-running it re-sends the same prompts. ResponseCache stores
+each raw response under a hash of (model_name, prompt); a hit skips the API call
+and the rate limiter entirely. This makes re-runs free while iterating on
+extraction, validation or the output schema. When the cache grows past its size
+budget, the least recently used entries are evicted.
+
+Usage:
+    cache = ResponseCache()
+    raw_response = cache.get(model_name, prompt)
+    if raw_response is None:
+        ...
+        cache.put(model_name, prompt, raw_response)
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Optional
+
+LLM_CACHE_DIR = os.path.join("cache", "llm")
+DEFAULT_MAX_BYTES = 1024 ** 3  # 1 GB
+
+
+class ResponseCache:
+    """
+    Content-addressed directory of `<key>.json` responses.
+    Safe to use from the generator's worker threads.
+
+    Args:
+        cache_dir: Directory holding cache entries
+        max_bytes: Size budget; least recently used entries are evicted beyond it
+        enabled: If False, nothing is read or stored
+        refresh: Ignore existing entries (but store fresh responses over them)
+    """
+
+    def __init__(self, cache_dir: str = LLM_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 enabled: bool = True, refresh: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._total_bytes = self.size_bytes()
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        payload = json.dumps([model_name, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        """Cached raw response for this prompt, or None."""
+        if not self.enabled:
+            return None
+        if self.refresh:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        path = self._path(self.make_key(model_name, prompt))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry["raw_response"]
+
+    def put(self, model_name: str, prompt: str, raw_response: str):
+        """Store a raw response (written atomically, then evict if over budget)."""
+        if not self.enabled:
+            return
+
+        key = self.make_key(model_name, prompt)
+        path = self._path(key)
+        entry = {
+            "model_name": model_name,
+            "created": datetime.now().isoformat(),
+            "raw_response": raw_response,
+        }
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        new_size = os.path.getsize(tmp_path)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += new_size - old_size
+            over_budget = self._total_bytes > self.max_bytes
+        if over_budget:
+            # Evict down to 90% so the next puts don't each trigger a directory scan
+            self.evict(int(self.max_bytes * 0.9))
+
+    def delete(self, model_name: str, prompt: str):
+        """Drop the entry for this prompt, e.g. when its response failed validation."""
+        if not self.enabled:
+            return
+        path = self._path(self.make_key(model_name, prompt))
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+
+    def size_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                   if entry.is_file() and entry.name.endswith(".json"))
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            entries = [entry for entry in os.scandir(self.cache_dir)
+                       if entry.is_file() and entry.name.endswith(".json")]
+            total = sum(entry.stat().st_size for entry in entries)
+            for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+                if total <= max_bytes:
+                    break
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+            self._total_bytes = total
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Response cache disabled"
+        mode = " (refresh)" if self.refresh else ""
+        return (f"Response cache{mode}: {self.hits} hits, {self.misses} misses "
+                f"({self._total_bytes / 1024 ** 2:.1f} MB in {self.cache_dir})")
@@ -0,0 +1,244 @@
+"""
+Near-duplicate detection for generated conversations (MinHash + LSH).
+
+Exact dedup on normalized text misses conversations that differ by a word or
+two (one swapped emoji, a paraphrased line), which template noise and LLMs
+both produce in bulk. NearDuplicateIndex estimates the Jaccard similarity of
+word-shingle sets with MinHash signatures and uses locality-sensitive hashing
+(signature bands as bucket keys), so each insert compares against a handful of
+candidates instead of every earlier row: the cost grows linearly with the
+number of rows, not quadratically.
+
+The index is streaming: `add(text)` inserts a text unless it is a near
+duplicate of something already inserted. Generators consult it as they go, and
+the script below runs it over existing datasets (e.g. train/val/test, in that
+order, to find rows leaking across splits).
+
+Usage:
+    python src/near_dedup.py data/train_v1.csv data/val_v1.csv data/test.csv
+    python src/near_dedup.py data/deepsea_conversations_v2.csv --threshold 0.9 \\
+        --output_dir data/dedup --report data/near_duplicates.csv
+"""
+
+import os
+import re
+import sys
+import zlib
+import argparse
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from dataset_io import CsvAppender, iter_dataset_chunks
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 3
+MAX_BUCKET_SIZE = 64  # Texts kept per LSH bucket; bounds memory and per-query work on degenerate data
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> List[str]:
+    """Lowercased word n-grams; texts shorter than `size` words form one shingle."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def _choose_bands(num_perm: int, threshold: float) -> int:
+    """
+    Number of LSH bands: the band layout whose S-curve midpoint, (1/b)^(1/r), is
+    the highest one at least 0.1 below `threshold`, so pairs at the threshold are
+    almost always candidates (recall) while dissimilar pairs rarely are.
+    """
+    layouts = [(b, (1.0 / b) ** (b / num_perm)) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(midpoint, b) for b, midpoint in layouts if midpoint <= threshold - 0.1]
+    return max(below)[1] if below else num_perm
+
+
+class NearDuplicateIndex:
+    """
+    Streaming MinHash/LSH index of texts.
+
+    Args:
+        threshold: Estimated Jaccard similarity at or above which texts are near duplicates
+        num_perm: MinHash signature length (more = more accurate, slower)
+        bands: LSH bands (must divide num_perm; default: chosen from threshold)
+        shingle_size: Words per shingle
+        seed: Seed of the MinHash permutations
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 bands: Optional[int] = None, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        bands = bands or _choose_bands(num_perm, threshold)
+        if num_perm % bands != 0:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Universal hashes h(x) = (a*x + b) mod p; x < 2^32 and a < p < 2^31 keep a*x + b within uint64
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+
+        self._buckets = [dict() for _ in range(bands)]
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self.keys: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_size)),
+                             dtype=np.uint64)
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        r = self.rows_per_band
+        return [hash(signature[i * r:(i + 1) * r].tobytes()) for i in range(self.bands)]
+
+    def query(self, text: str) -> Optional[Tuple[Any, float]]:
+        """(key, estimated similarity) of an indexed near duplicate of `text`, or None."""
+        return self._match(self.signature(text))[0]
+
+    def _match(self, signature: np.ndarray) -> Tuple[Optional[Tuple[Any, float]], List[int]]:
+        band_keys = self._band_keys(signature)
+        checked = set()
+        for band, band_key in enumerate(band_keys):
+            for candidate in self._buckets[band].get(band_key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.threshold:
+                    return (self.keys[candidate], similarity), band_keys
+        return None, band_keys
+
+    def add(self, text: str, key: Any = None) -> bool:
+        """
+        Insert `text` unless it is a near duplicate of an indexed text.
+
+        Args:
+            text: Text to insert
+            key: Identifier returned by query() for this text (default: insertion index)
+
+        Returns:
+            True if inserted, False if it was a near duplicate
+        """
+        return self.add_or_match(text, key) is None
+
+    def add_or_match(self, text: str, key: Any = None) -> Optional[Tuple[Any, float]]:
+        """Like add(), but returns the (key, similarity) of the match instead of False."""
+        signature = self.signature(text)
+        match, band_keys = self._match(signature)
+        if match is not None:
+            return match
+
+        idx = len(self.keys)
+        if idx == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[idx] = signature
+        self.keys.append(idx if key is None else key)
+        for band, band_key in enumerate(band_keys):
+            # Texts in a bucket didn't match each other, so each one is a separate candidate
+            bucket = self._buckets[band].setdefault(band_key, [])
+            if len(bucket) < MAX_BUCKET_SIZE:
+                bucket.append(idx)
+        return None
+
+
+def dedup_files(paths: List[str], threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                output_dir: Optional[str] = None, report_path: Optional[str] = None,
+                chunk_size: int = 50_000):
+    """
+    Stream `paths` in order through one index; a row is dropped if it nearly
+    duplicates any earlier row of any file.
+
+    Args:
+        paths: CSV/Parquet datasets with a `text` column
+        threshold: Similarity threshold (see NearDuplicateIndex)
+        num_perm: MinHash signature length
+        output_dir: If set, kept rows of each input are written to <output_dir>/<name>.csv
+        report_path: If set, one CSV row per near duplicate found (and what it matched)
+        chunk_size: Rows read at a time
+    """
+    index = NearDuplicateIndex(threshold, num_perm)
+    report = None
+    if report_path:
+        report = CsvAppender(report_path, ["file", "row", "duplicate_of_file", "duplicate_of_row", "similarity"])
+
+    print(f"Near-duplicate pass: threshold {threshold}, {num_perm} permutations in {index.bands} bands\n")
+    try:
+        for path in paths:
+            n_rows = n_dups = 0
+            cross_file = 0
+            writer = None
+            for chunk in iter_dataset_chunks(path, chunk_size):
+                if writer is None and output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                    out_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".csv")
+                    writer = CsvAppender(out_path, list(chunk.columns))
+                kept = []
+                found = []
+                for row_idx, text in enumerate(chunk["text"].astype(str), start=n_rows):
+                    match = index.add_or_match(text, key=(path, row_idx))
+                    if match is None:
+                        kept.append(row_idx - n_rows)
+                        continue
+                    (match_path, match_row), similarity = match
+                    n_dups += 1
+                    cross_file += match_path != path
+                    found.append({"file": path, "row": row_idx, "duplicate_of_file": match_path,
+                                  "duplicate_of_row": match_row, "similarity": round(similarity, 3)})
+                n_rows += len(chunk)
+                if writer is not None:
+                    writer.append(chunk.iloc[kept].to_dict("records"))
+                if report is not None and found:
+                    report.append(found)
+            if writer is not None:
+                writer.close()
+            print(f"{path}: {n_rows} rows, {n_dups} near duplicates "
+                  f"({n_dups / max(n_rows, 1):.1%}), {cross_file} of them match earlier files")
+    finally:
+        if report is not None:
+            report.close()
+
+    print(f"\n✓ {len(index)} distinct rows kept")
+    if output_dir:
+        print(f"✓ Deduplicated files written to {output_dir}")
+    if report_path:
+        print(f"✓ Near-duplicate report written to {report_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate conversations across datasets (MinHash/LSH)")
+    parser.add_argument("paths", nargs="+",
+                        help="CSV/Parquet files with a text column; later files are checked against earlier ones")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Estimated Jaccard similarity that counts as a duplicate (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--num_perm", type=int, default=DEFAULT_NUM_PERM,
+                        help=f"MinHash signature length (default: {DEFAULT_NUM_PERM})")
+    parser.add_argument("--output_dir", type=str, default=None,
+                        help="Write the kept rows of each input here")
+    parser.add_argument("--report", type=str, default=None,
+                        help="CSV listing every near duplicate and the row it matched")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"❌ Error: File not found: {path}")
+            return 1
+
+    dedup_files(args.paths, args.threshold, args.num_perm, args.output_dir, args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Async rate limiting for LLM API calls.
+
+Provider quotas are expressed as requests per minute (RPM) and tokens per
+minute (TPM). RateLimiter combines one token bucket for each, so concurrent
+generation tasks wait for quota instead of hammering the API and collecting
+429s. Buckets refill continuously, so calls are paced evenly rather than
+bursting at the start of every minute.
+
+Usage:
+    limiter = RateLimiter(rpm=60, tpm=100_000)
+    await limiter.acquire(estimate_tokens(prompt))
+"""
+
+import time
+import asyncio
+from typing import Optional
+
+CHARS_PER_TOKEN = 4  # Rough average for English text
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text` (no tokenizer dependency)."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum tokens held (the burst size)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("TokenBucket rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """
+        Wait until `amount` tokens are available and take them.
+        Requests larger than the capacity wait for a full bucket and then
+        borrow the rest, which later callers pay back by waiting longer.
+        """
+        needed = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.level >= needed:
+                self.level -= amount
+                return
+            await asyncio.sleep((needed - self.level) / self.rate)
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) tokens after the fact."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for one API key.
+    A limit of None or 0 disables that bucket.
+
+    Args:
+        rpm: Maximum requests per minute
+        tpm: Maximum (estimated) tokens per minute, prompt + response
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        # One second's worth of quota as burst keeps the request rate smooth
+        self.requests = TokenBucket(rpm / 60.0, max(1.0, rpm / 60.0)) if rpm else None
+        self.tokens = TokenBucket(tpm / 60.0, max(1.0, tpm / 60.0)) if tpm else None
+
+    async def acquire(self, tokens: int = 0):
+        """Wait for one request slot and `tokens` tokens of quota."""
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+    def record_usage(self, estimated: int, actual: int):
+        """Correct the token bucket once the real size of a call is known."""
+        if self.tokens is not None:
+            self.tokens.adjust(actual - estimated)
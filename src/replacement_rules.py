@@ -0,0 +1,102 @@
+"""
+Precompiled phrase-replacement rules for the template text augmentations.
+
+A rules dict maps a phrase to its variations ({"can you": ["could you", ...]}).
+Applying it naively means, for every line and every phrase, lowercasing the
+line twice, testing membership and building a regex substitution. ReplacementRules
+prepares everything once: lowercased phrases and their compiled patterns.
+A text is lowercased once. A C-level substring scan keeps only the phrases that
+occur anywhere in it, so most lines check two or three phrases instead of all of
+them, and a replacement is a slice instead of a regex substitution.
+
+(A single alternation regex over all phrases was measured too. In CPython it is
+slower than the substring scans, because `re` tries every alternative at every
+position.)
+
+Random draws happen in the same order as the per-phrase loop (one `random()` per
+phrase present in the line, in dict order, then one `choice()` if it fires), so
+with the same random state the output is the same as the loop's. The only
+exception is phrases whose occurrences overlap each other in the text, which
+no rule set in this repo has.
+
+Usage:
+    rules = ReplacementRules({"can you": ["could you", "would you mind"]})
+    candidates = rules.present(text.lower())
+    line = rules.apply(line, prob=0.3, rng=rng, candidates=candidates)
+"""
+
+import re
+import random
+from typing import Dict, List, Optional, Sequence
+
+
+class ReplacementRules:
+    """
+    Phrase -> variations rules, prepared once.
+
+    Args:
+        rules: Phrase to list of replacement variations (matched case-insensitively;
+            the replacement is capitalized unless the matched text is all lowercase)
+    """
+
+    def __init__(self, rules: Dict[str, List[str]]):
+        self.phrases = list(rules)
+        self.variations = [rules[phrase] for phrase in self.phrases]
+        self._lowered = [phrase.lower() for phrase in self.phrases]
+        # Only for text whose length changes when lowercased (rare non-ASCII case folds)
+        self._patterns = [re.compile(re.escape(phrase), re.IGNORECASE) for phrase in self.phrases]
+
+    def present(self, lowered_text: str) -> List[int]:
+        """Indices (in dict order) of the phrases occurring in an already lowercased text."""
+        return [i for i, phrase in enumerate(self._lowered) if phrase in lowered_text]
+
+    def apply(self, line: str, prob: float, rng=random, candidates: Optional[Sequence[int]] = None) -> str:
+        """
+        Replace the first occurrence of each phrase in `line` with probability `prob`.
+
+        Args:
+            line: Text to vary (one line; phrases never span lines)
+            prob: Chance that each phrase present is replaced
+            rng: Random source (the `random` module or a random.Random)
+            candidates: Phrase indices that can occur in `line`, from present() (default: all)
+
+        Returns:
+            The varied line (the same object if nothing was replaced)
+        """
+        lowered = line.lower()
+        if len(lowered) != len(line):
+            return self._apply_regex(line, prob, rng)
+        if candidates is None:
+            candidates = range(len(self.phrases))
+
+        edits = []
+        for i in candidates:
+            start = lowered.find(self._lowered[i])
+            if start != -1 and rng.random() < prob:
+                end = start + len(self._lowered[i])
+                replacement = rng.choice(self.variations[i])
+                if not line[start:end].islower():
+                    replacement = replacement.capitalize()
+                edits.append((start, end, replacement))
+        if not edits:
+            return line
+
+        edits.sort()
+        parts = []
+        pos = 0
+        for start, end, replacement in edits:
+            parts.append(line[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(line[pos:])
+        return "".join(parts)
+
+    def _apply_regex(self, line: str, prob: float, rng) -> str:
+        for i, pattern in enumerate(self._patterns):
+            match = pattern.search(line)
+            if match is not None and rng.random() < prob:
+                replacement = rng.choice(self.variations[i])
+                if not match.group().islower():
+                    replacement = replacement.capitalize()
+                line = line[:match.start()] + replacement + line[match.end():]
+        return line
@@ -0,0 +1,128 @@
+"""
+Retry policy for LLM API calls.
+
+Not every failure deserves the same retry. classify_error sorts exceptions into:
+    rate_limit     quota exceeded (HTTP 429): wait, honoring any retry-after hint
+    transient      network errors, timeouts, 5xx: back off and retry
+    parse_failure  the call succeeded but the output wasn't valid JSON: re-ask
+                   with a repair prompt right away instead of regenerating
+    fatal          bad key, invalid request, safety block: retrying can't help
+
+Backoff uses decorrelated jitter (each delay is drawn between the base delay
+and 3x the previous one, capped). Many concurrent workers failing at the same
+moment therefore spread out instead of retrying in lockstep.
+
+Usage:
+    policy = RetryPolicy(max_attempts=4)
+    error_class = classify_error(exc)
+    if policy.should_retry(error_class, attempt):
+        time.sleep(policy.next_delay(error_class, previous_delay, exc))
+"""
+
+import re
+import random
+from typing import Optional
+
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+PARSE_FAILURE = "parse_failure"
+FATAL = "fatal"
+ERROR_CLASSES = (RATE_LIMIT, TRANSIENT, PARSE_FAILURE, FATAL)
+
+RATE_LIMIT_STATUS = {429}
+TRANSIENT_STATUS = {408, 500, 502, 503, 504}
+FATAL_STATUS = {400, 401, 403, 404}
+FATAL_MESSAGE = re.compile(r"safety|blocked|api[ _]key|permission|unauthenticated|invalid argument", re.IGNORECASE)
+RATE_LIMIT_MESSAGE = re.compile(r"quota|rate.?limit|resource.?exhausted|too many requests", re.IGNORECASE)
+# "Please retry in 17.3s", "retry_delay { seconds: 17 }", "Retry-After: 17"
+RETRY_AFTER_MESSAGE = re.compile(r"retry(?:[ _-]?after|[ _]delay)?\D{0,20}?(\d+(?:\.\d+)?)\s*s?", re.IGNORECASE)
+
+
+class ParseFailure(ValueError):
+    """The backend answered, but no JSON object could be extracted from the response."""
+
+    def __init__(self, message: str, raw_response: Optional[str] = None):
+        super().__init__(message)
+        self.raw_response = raw_response
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    for attr in ("status", "code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def classify_error(exc: Exception) -> str:
+    """Sort an exception from a backend call into one of ERROR_CLASSES."""
+    if isinstance(exc, ParseFailure):
+        return PARSE_FAILURE
+
+    status = _status_code(exc)
+    if status in RATE_LIMIT_STATUS:
+        return RATE_LIMIT
+    if status in TRANSIENT_STATUS:
+        return TRANSIENT
+    if status in FATAL_STATUS:
+        return FATAL
+
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return TRANSIENT
+    message = f"{type(exc).__name__}: {exc}"
+    if RATE_LIMIT_MESSAGE.search(message):
+        return RATE_LIMIT
+    if FATAL_MESSAGE.search(message) or isinstance(exc, (ImportError, NotImplementedError)):
+        return FATAL
+    # Unknown errors are retried, as before this policy existed
+    return TRANSIENT
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Server-provided wait time, from a `retry_after` attribute or the error message."""
+    value = getattr(exc, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = RETRY_AFTER_MESSAGE.search(str(exc))
+    return float(match.group(1)) if match else None
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a failed call.
+
+    Args:
+        max_attempts: Total attempts per call, including the first
+        base_delay: Smallest backoff delay in seconds
+        max_delay: Largest backoff delay in seconds
+        seed: Seed for the jitter (None = nondeterministic)
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 seed: Optional[int] = None):
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = random.Random(seed)
+
+    def should_retry(self, error_class: str, attempt: int) -> bool:
+        """`attempt` is the 0-based index of the attempt that just failed."""
+        return error_class != FATAL and attempt + 1 < self.max_attempts
+
+    def next_delay(self, error_class: str, previous_delay: float, exc: Optional[Exception] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+        Parse failures are re-asked immediately; rate limits wait at least the
+        server's retry-after hint; everything else uses decorrelated jitter.
+        """
+        if error_class == PARSE_FAILURE:
+            return 0.0
+
+        jittered = min(self.max_delay, self._rng.uniform(self.base_delay, max(self.base_delay, previous_delay * 3)))
+        hint = retry_after_seconds(exc) if exc is not None and error_class == RATE_LIMIT else None
+        if hint is not None:
+            # Small jitter on top of the hint so workers sharing a quota don't return together
+            return min(self.max_delay, hint + self._rng.uniform(0, self.base_delay))
+        return jittered
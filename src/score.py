@@ -0,0 +1,177 @@
+"""
+Batch scoring CLI for DeepSea Communication Orientation Auditor.
+
+Loads the saved TF-IDF + LogisticRegression pipeline once and streams a CSV or
+JSONL file of conversations through it in fixed-size chunks, writing the
+class-1 probability (`p_hot`) and the `interpret_score` verdict for every row.
+Only one chunk is held in memory at a time, so memory stays bounded no matter
+how large the input file is.
+
+With --workers N > 1, chunks are scored in parallel by a process pool whose
+workers share one memory-mapped copy of the model arrays.
+
+Usage:
+    python src/score.py --input data/test.csv --output results/scores.csv
+    python src/score.py --input convos.jsonl --output scores.jsonl --chunk_size 50000
+    python src/score.py --input convos.csv --output scores.csv --workers 8
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inference import MODEL_PATH, ScoringPool, load_model, predict_p_hot, verdicts_for
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def detect_format(path: str) -> str:
+    """Return 'csv' or 'jsonl' based on the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file extension '{ext}' (expected .csv, .jsonl or .ndjson)")
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the input file as DataFrames of at most `chunk_size` rows."""
+    if detect_format(path) == "csv":
+        reader = pd.read_csv(path, chunksize=chunk_size)
+    else:
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def write_chunk(df: pd.DataFrame, path: str, first: bool):
+    """Write (or append) one scored chunk to the output file."""
+    mode = "w" if first else "a"
+    if detect_format(path) == "csv":
+        df.to_csv(path, mode=mode, header=first, index=False)
+    else:
+        with open(path, mode, encoding="utf-8") as f:
+            df.to_json(f, orient="records", lines=True, force_ascii=False)
+
+
+def chunk_texts(chunk: pd.DataFrame, text_column: str) -> List[str]:
+    if text_column not in chunk.columns:
+        raise ValueError(f"Column '{text_column}' not found in input")
+    return chunk[text_column].fillna("").astype(str).tolist()
+
+
+def scored_chunks(chunks: Iterator[pd.DataFrame], model_path: str, text_column: str,
+                  workers: int = 1) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Yield (chunk, p_hot) pairs in input order.
+
+    With `workers > 1` chunks are dispatched to a ScoringPool; only a bounded
+    number of chunks are in flight at once, so memory stays bounded.
+    """
+    if workers <= 1:
+        model = load_model(model_path)
+        for chunk in chunks:
+            yield chunk, predict_p_hot(model, chunk_texts(chunk, text_column))
+        return
+
+    pending = deque()
+
+    def batches():
+        for chunk in chunks:
+            texts = chunk_texts(chunk, text_column)
+            pending.append(chunk)
+            yield texts
+
+    with ScoringPool(model_path, workers=workers) as pool:
+        for p_hot in pool.imap(batches()):
+            yield pending.popleft(), p_hot
+
+
+def score_file(input_path: str, output_path: str, model_path: str = MODEL_PATH,
+               text_column: str = "text", chunk_size: int = DEFAULT_CHUNK_SIZE,
+               include_text: bool = False, workers: int = 1) -> int:
+    """
+    Score every row of `input_path` and write the results to `output_path`.
+
+    Args:
+        input_path: CSV or JSONL file with a text column
+        output_path: CSV or JSONL destination (format chosen by extension)
+        model_path: Saved pipeline to load
+        text_column: Name of the column holding the conversation text
+        chunk_size: Number of rows vectorized per `predict_proba` call
+        include_text: Copy the text column into the output as well
+        workers: Number of scoring processes (1 = score in this process)
+
+    Returns:
+        Number of rows scored
+    """
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    total_rows = 0
+    start = time.perf_counter()
+
+    chunks = iter_chunks(input_path, chunk_size)
+    for chunk_idx, (chunk, p_hot) in enumerate(scored_chunks(chunks, model_path, text_column, workers)):
+        out = chunk if include_text else chunk.drop(columns=[text_column])
+        out = out.assign(p_hot=p_hot, verdict=verdicts_for(p_hot))
+        write_chunk(out, output_path, first=chunk_idx == 0)
+
+        total_rows += len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"  Chunk {chunk_idx + 1}: {total_rows} rows scored ({total_rows / elapsed:,.0f} rows/sec)")
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0.0
+    print(f"\n✓ Scored {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    print(f"✓ Saved to {output_path}")
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-score a CSV/JSONL file of conversations")
+    parser.add_argument("--input", type=str, required=True,
+                        help="Input CSV or JSONL path")
+    parser.add_argument("--output", type=str, required=True,
+                        help="Output CSV or JSONL path (format chosen by extension)")
+    parser.add_argument("--model", type=str, default=MODEL_PATH,
+                        help=f"Model path (default: {MODEL_PATH})")
+    parser.add_argument("--text_column", type=str, default="text",
+                        help="Column holding the conversation text (default: text)")
+    parser.add_argument("--chunk_size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per vectorized predict_proba call (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--include_text", action="store_true",
+                        help="Copy the text column into the output")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Scoring processes sharing one memory-mapped model (default: 1)")
+
+    args = parser.parse_args()
+
+    if args.chunk_size <= 0:
+        print("❌ Error: --chunk_size must be positive")
+        return 1
+    if args.workers <= 0:
+        print("❌ Error: --workers must be positive")
+        return 1
+
+    try:
+        score_file(args.input, args.output, args.model, args.text_column,
+                   args.chunk_size, args.include_text, args.workers)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"\n❌ Error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
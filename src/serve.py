@@ -0,0 +1,238 @@
+"""
+HTTP scoring service for DeepSea Communication Orientation Auditor.
+
+Async FastAPI server that exposes the saved model to other services.
+Requests arriving within a short window are collected into one vectorized
+`predict_proba` call (micro-batching), so the TF-IDF transform and sparse
+matmul cost is shared across concurrent callers. With --workers N > 1, batches
+are scored by a process pool sharing one memory-mapped model, so up to N
+batches run in parallel.
+
+Installation:
+    pip install fastapi uvicorn
+
+Usage:
+    python src/serve.py --port 8000 --max_batch_size 256 --max_wait_ms 5
+    python src/serve.py --port 8000 --workers 4
+
+Endpoints:
+    POST /score        {"text": "A: ...\\nB: ..."}
+    POST /score_batch  {"texts": ["A: ...", "A: ..."]}
+    GET  /health
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+import uvicorn
+
+from inference import MODEL_PATH, ScoringPool, interpret_score, load_model, predict_p_hot
+
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class ScoreRequest(BaseModel):
+    text: str
+
+
+class ScoreBatchRequest(BaseModel):
+    texts: List[str]
+
+
+class ScoreResult(BaseModel):
+    p_hot: float
+    verdict: str
+    description: str
+
+
+class ScoreBatchResponse(BaseModel):
+    results: List[ScoreResult]
+
+
+class MicroBatcher:
+    """
+    Collect scoring requests for up to `max_wait_ms` (or until `max_batch_size`
+    texts are queued) and score them together in a single `predict_proba` call.
+
+    Scoring runs in a worker thread (or in a ScoringPool process when `pool` is
+    given) so the event loop keeps accepting requests while a batch is being
+    vectorized. With a pool, up to `pool.workers` batches are scored at once.
+    """
+
+    def __init__(self, model=None, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, pool: Optional[ScoringPool] = None):
+        if model is None and pool is None:
+            raise ValueError("MicroBatcher needs a model or a ScoringPool")
+        self.model = model
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.pool.workers if self.pool else 1)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, texts: List[str]) -> List[float]:
+        """Queue `texts` for the next batch and wait for their probabilities."""
+        if not texts:
+            return []
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _predict(self, texts: List[str]) -> List[float]:
+        if self.pool is not None:
+            scores = await asyncio.wrap_future(self.pool.submit(texts))
+        else:
+            scores = await asyncio.to_thread(predict_p_hot, self.model, texts)
+        return scores.tolist()
+
+    async def _collect(self) -> List[Tuple[List[str], asyncio.Future]]:
+        """Block for the first request, then gather more until the window closes."""
+        batch = [await self._queue.get()]
+        n_texts = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while n_texts < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_texts += len(item[0])
+        return batch
+
+    async def _score_batch(self, batch: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for item_texts, _ in batch for text in item_texts]
+        try:
+            scores = await self._predict(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        offset = 0
+        for item_texts, future in batch:
+            if not future.done():
+                future.set_result(scores[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+    async def _run(self):
+        tasks = set()
+        try:
+            while True:
+                # Wait for a free scoring slot first so requests keep queueing
+                # (and batches keep growing) while all slots are busy.
+                await self._slots.acquire()
+                batch = await self._collect()
+                task = asyncio.create_task(self._score_batch(batch))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def to_result(p_hot: float) -> ScoreResult:
+    verdict, desc = interpret_score(p_hot)
+    return ScoreResult(p_hot=p_hot, verdict=verdict, description=desc)
+
+
+def create_app(model_path: str = MODEL_PATH, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+               max_wait_ms: float = DEFAULT_MAX_WAIT_MS, workers: int = 1) -> FastAPI:
+    """
+    Build the FastAPI app. The model is loaded once at startup and shared by
+    every request through a single MicroBatcher. With `workers > 1` batches
+    are scored by a ScoringPool instead of in this process.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if workers > 1:
+            pool = ScoringPool(model_path, workers=workers)
+            batcher = MicroBatcher(None, max_batch_size, max_wait_ms, pool=pool)
+        else:
+            pool = None
+            batcher = MicroBatcher(load_model(model_path), max_batch_size, max_wait_ms)
+        await batcher.start()
+        app.state.batcher = batcher
+        yield
+        await batcher.stop()
+        if pool is not None:
+            pool.close()
+
+    app = FastAPI(title="DeepSea Communication Orientation Auditor", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "model_path": model_path}
+
+    @app.post("/score", response_model=ScoreResult)
+    async def score(request: ScoreRequest):
+        if not request.text.strip():
+            raise HTTPException(status_code=422, detail="text must be a non-empty string")
+        scores = await app.state.batcher.submit([request.text])
+        return to_result(scores[0])
+
+    @app.post("/score_batch", response_model=ScoreBatchResponse)
+    async def score_batch(request: ScoreBatchRequest):
+        scores = await app.state.batcher.submit(request.texts)
+        return ScoreBatchResponse(results=[to_result(s) for s in scores])
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the DeepSea model over HTTP with micro-batching")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="Port (default: 8000)")
+    parser.add_argument("--model", type=str, default=MODEL_PATH,
+                        help=f"Model path (default: {MODEL_PATH})")
+    parser.add_argument("--max_batch_size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f"Maximum texts per predict_proba call (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument("--max_wait_ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help=f"How long to wait for more requests before scoring a batch (default: {DEFAULT_MAX_WAIT_MS})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Scoring processes sharing one memory-mapped model (default: 1)")
+
+    args = parser.parse_args()
+
+    if args.max_batch_size <= 0 or args.max_wait_ms < 0 or args.workers <= 0:
+        print("❌ Error: --max_batch_size/--workers must be positive and --max_wait_ms non-negative")
+        return 1
+
+    app = create_app(args.model, args.max_batch_size, args.max_wait_ms, args.workers)
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,40 @@
 import os
-import pandas as pd
+import argparse
 from sklearn.model_selection import GroupShuffleSplit
 
+from dataset_io import FORMATS, read_dataset, with_format, write_dataset
+
 DATA_DIR = "data"
 DATA_PATH = os.path.join(DATA_DIR, "deepsea_conversations_llm_v1.csv")
 TRAIN_PATH = os.path.join(DATA_DIR, "train_llm_v1.csv") 
 VAL_PATH = os.path.join(DATA_DIR, "val_llm_v1.csv") 
 TEST_PATH = os.path.join(DATA_DIR, "test_llm_v1.csv")
 
+def get_group_column(df):
+    """Support both scenario_id (LLM dataset) and template_id (template dataset)"""
+    if "scenario_id" in df.columns:
+        return "scenario_id"
+    if "template_id" in df.columns:
+        return "template_id"
+    raise ValueError("Either 'scenario_id' or 'template_id' column is required for group-based splitting")
+
 def main():
-    df = pd.read_csv(DATA_PATH)
+    parser = argparse.ArgumentParser(description="Grouped train/val/test split")
+    parser.add_argument("--input", type=str, default=DATA_PATH,
+                        help=f"Dataset to split, .csv or .parquet (default: {DATA_PATH})")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="Format of the split files: csv or parquet (default: csv)")
+    args = parser.parse_args()
+
+    train_path = with_format(TRAIN_PATH, args.format)
+    val_path = with_format(VAL_PATH, args.format)
+    test_path = with_format(TEST_PATH, args.format)
+
+    df = read_dataset(args.input)
 
     assert "text" in df.columns and "label" in df.columns
     
-    # Support both scenario_id (LLM dataset) and template_id (template dataset)
-    if "scenario_id" in df.columns:
-        group_column = "scenario_id"
-    elif "template_id" in df.columns:
-        group_column = "template_id"
-    else:
-        raise ValueError("Either 'scenario_id' or 'template_id' column is required for group-based splitting")
+    group_column = get_group_column(df)
     
     print(f"Using '{group_column}' for grouped splitting")
 
@@ -45,9 +60,9 @@ def main():
         print(f"   Val: Class 0 = {val_class_balance.get(0, 0)*100:.1f}%, Class 1 = {val_class_balance.get(1, 0)*100:.1f}%")
         print(f"   Test: Class 0 = {test_class_balance.get(0, 0)*100:.1f}%, Class 1 = {test_class_balance.get(1, 0)*100:.1f}%")
 
-    train_df.to_csv(TRAIN_PATH, index=False)
-    val_df.to_csv(VAL_PATH, index=False)
-    test_df.to_csv(TEST_PATH, index=False)
+    write_dataset(train_df, train_path)
+    write_dataset(val_df, val_path)
+    write_dataset(test_df, test_path)
 
     # Get unique group IDs for each split
     train_group_ids = set(train_df[group_column].unique())
@@ -55,11 +70,11 @@ def main():
     test_group_ids = set(test_df[group_column].unique())
 
     # Print counts
-    print(f"Train samples: {len(train_df)} → {TRAIN_PATH}")
+    print(f"Train samples: {len(train_df)} → {train_path}")
     print(f"  Unique {group_column}s: {len(train_group_ids)}")
-    print(f"Validation samples: {len(val_df)} → {VAL_PATH}")
+    print(f"Validation samples: {len(val_df)} → {val_path}")
     print(f"  Unique {group_column}s: {len(val_group_ids)}")
-    print(f"Test samples: {len(test_df)} → {TEST_PATH}")
+    print(f"Test samples: {len(test_df)} → {test_path}")
     print(f"  Unique {group_column}s: {len(test_group_ids)}")
 
     # Verify no overlap in group IDs
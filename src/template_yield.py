@@ -0,0 +1,190 @@
+"""
+Rejection-sampling yield of the template generators.
+
+generate_data_v2 draws a template, fills it and rejects the text if it was
+seen before. Templates with few slots saturate long before others: once a
+template has produced most of its distinct texts, nearly every draw of it is a
+duplicate. Drawing templates with their fixed probabilities then wastes more
+and more attempts, until the generator gives up after MAX_DUPLICATE_RETRIES
+consecutive duplicates.
+
+TemplateYieldTracker counts attempts and unique texts per template_id and
+keeps a recent yield (exponential moving average of "was new") for each one.
+It reports the duplicate rate window by window. In adaptive mode it also picks
+the next template, weighting each template's base probability by its recent
+yield, so exhausted templates are rarely drawn.
+
+How far a template goes is estimated from a pilot sample. The noise stages
+make the text distribution long-tailed, so a "N equally likely texts" model
+badly underestimates it. Distinct texts instead follow Heaps' law,
+D(m) = K * m^beta after m draws, with a yield per draw of beta * D(m) / m
+that keeps falling. K and beta are fitted on the pilot's growth curve. A run is then
+simulated step by step to forecast the attempts a target needs and the
+expected maximum unique yield: the distinct texts by the time the yield per
+attempt falls to the point where the generator gives up.
+
+Usage:
+    tracker = TemplateYieldTracker({"p_core_0": 0.5, "p_core_1": 0.5}, adaptive=True)
+    template_id = tracker.choose(rng)
+    ...
+    tracker.record(template_id, is_new)
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_DECAY = 0.01  # EMA weight of each new attempt in a template's recent yield
+MIN_YIELD_WEIGHT = 0.01  # Floor on the yield factor, so no template is dropped entirely
+EXHAUSTED_YIELD = 0.05  # Recent yield below which a template is reported as exhausted
+MAX_ATTEMPTS = 1e12  # Yield estimates beyond this many attempts are reported as unbounded
+
+
+def fit_heaps(checkpoints: Sequence[Tuple[int, int]]) -> Tuple[float, float]:
+    """
+    Least-squares fit of D = K * m^beta in log-log space.
+
+    Args:
+        checkpoints: (draws, distinct texts so far) along one pilot sample
+
+    Returns:
+        (K, beta), beta clipped to [0, 1]
+    """
+    xs = [math.log(m) for m, _ in checkpoints]
+    ys = [math.log(max(d, 1)) for _, d in checkpoints]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - x_mean) ** 2 for x in xs)
+    beta = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / var if var else 1.0
+    beta = min(max(beta, 0.0), 1.0)
+    return math.exp(y_mean - beta * x_mean), beta
+
+
+def simulate_run(fits: Dict[str, Tuple[float, float]], weights: Dict[str, float], adaptive: bool = False,
+                 target: float = math.inf, stop_yield: float = 0.0) -> Tuple[float, float, float]:
+    """
+    Follow the expected course of a run under the Heaps' law fits until it has
+    `target` distinct texts or its yield per attempt falls to `stop_yield`.
+
+    Attempts grow in 1% steps. Each step's attempts are split like the
+    generator splits them: by the base weights, or in adaptive mode by base
+    weight times current yield (with the same floor as TemplateYieldTracker).
+
+    Args:
+        fits: template_id -> (K, beta) from fit_heaps()
+        weights: template_id -> base probability of drawing it
+        adaptive: Whether templates are weighted by their recent yield
+        target: Stop at this many distinct texts
+        stop_yield: Stop when the yield per attempt falls to this
+
+    Returns:
+        (attempts, distinct texts, yield per attempt) at the stop, attempts
+        being inf if neither condition is met within MAX_ATTEMPTS
+    """
+    templates = [t for t, w in weights.items() if w > 0]
+    draws = {t: 0.0 for t in templates}
+
+    def template_yield(t):
+        k, beta = fits[t]
+        return min(1.0, beta * k * draws[t] ** (beta - 1)) if draws[t] >= 1 else 1.0
+
+    attempts = 0.0
+    while attempts < MAX_ATTEMPTS:
+        yields = {t: template_yield(t) for t in templates}
+        shares = {t: weights[t] * (max(yields[t], MIN_YIELD_WEIGHT) if adaptive else 1.0) for t in templates}
+        total_share = sum(shares.values())
+        current_yield = sum(shares[t] * yields[t] for t in templates) / total_share
+        distinct = sum(fits[t][0] * draws[t] ** fits[t][1] for t in templates if draws[t] >= 1)
+        if distinct >= target or current_yield <= stop_yield:
+            return attempts, distinct, current_yield
+        step = max(1.0, attempts * 0.01)
+        for t in templates:
+            draws[t] += step * shares[t] / total_share
+        attempts += step
+    return math.inf, distinct, current_yield
+
+
+class TemplateYieldTracker:
+    """
+    Attempts, unique texts and recent yield per template_id of one class.
+
+    Args:
+        base_weights: template_id -> probability of the generator's own template draw
+        adaptive: If True, choose() weights templates by their recent yield
+        decay: EMA weight of each attempt in a template's recent yield
+    """
+
+    def __init__(self, base_weights: Dict[str, float], adaptive: bool = False, decay: float = DEFAULT_DECAY):
+        self.base_weights = dict(base_weights)
+        self.adaptive = adaptive
+        self.decay = decay
+        self.attempts = {t: 0 for t in base_weights}
+        self.unique = {t: 0 for t in base_weights}
+        self.recent_yield = {t: 1.0 for t in base_weights}
+        self.history: List[Tuple[int, int, float]] = []  # (attempts, unique, window duplicate rate)
+        self._window_attempts = 0
+        self._window_duplicates = 0
+
+    @property
+    def total_attempts(self) -> int:
+        return sum(self.attempts.values())
+
+    @property
+    def total_unique(self) -> int:
+        return sum(self.unique.values())
+
+    @property
+    def duplicate_rate(self) -> float:
+        return 1 - self.total_unique / max(self.total_attempts, 1)
+
+    def choose(self, rng=random) -> Optional[str]:
+        """Next template_id to draw, or None to let the generator draw its own (non-adaptive mode)."""
+        if not self.adaptive:
+            return None
+        ids = list(self.base_weights)
+        weights = [self.base_weights[t] * max(self.recent_yield[t], MIN_YIELD_WEIGHT) for t in ids]
+        return rng.choices(ids, weights)[0]
+
+    def record(self, template_id: str, is_new: bool):
+        """Count one attempt of `template_id` and whether its text was new."""
+        self.attempts[template_id] = self.attempts.get(template_id, 0) + 1
+        self.unique[template_id] = self.unique.get(template_id, 0) + is_new
+        recent = self.recent_yield.get(template_id, 1.0)
+        self.recent_yield[template_id] = recent + self.decay * (is_new - recent)
+        self._window_attempts += 1
+        self._window_duplicates += not is_new
+
+    def reject(self, template_id: str):
+        """Turn one recorded unique text of `template_id` into a duplicate (e.g. one found across shards)."""
+        self.unique[template_id] -= 1
+
+    def checkpoint(self) -> float:
+        """Close the current window: record and return its duplicate rate."""
+        rate = self._window_duplicates / max(self._window_attempts, 1)
+        self.history.append((self.total_attempts, self.total_unique, rate))
+        self._window_attempts = self._window_duplicates = 0
+        return rate
+
+    def exhausted(self) -> List[str]:
+        """Templates whose recent yield fell below EXHAUSTED_YIELD."""
+        return [t for t in self.attempts if self.attempts[t] and self.recent_yield[t] < EXHAUSTED_YIELD]
+
+    def merge(self, other: "TemplateYieldTracker"):
+        """Add the counts of `other` (e.g. another shard); recent yields are averaged by attempts."""
+        for t in other.attempts:
+            mine, theirs = self.attempts.get(t, 0), other.attempts[t]
+            if mine + theirs:
+                self.recent_yield[t] = (self.recent_yield.get(t, 1.0) * mine
+                                        + other.recent_yield[t] * theirs) / (mine + theirs)
+            self.attempts[t] = mine + theirs
+            self.unique[t] = self.unique.get(t, 0) + other.unique[t]
+
+    def format_report(self, indent: str = "    ") -> List[str]:
+        """One line per template: attempts, unique texts and overall yield."""
+        lines = []
+        for t in sorted(self.attempts):
+            if not self.attempts[t]:
+                continue
+            note = "  (exhausted)" if t in self.exhausted() else ""
+            lines.append(f"{indent}{t:<12} {self.unique[t]:>9}/{self.attempts[t]:<9} "
+                         f"yield {self.unique[t] / self.attempts[t]:6.1%}{note}")
+        return lines
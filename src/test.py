@@ -1,4 +1,5 @@
 import os
+import argparse
 import pandas as pd
 from sklearn.metrics import (
     classification_report, confusion_matrix, 
@@ -10,6 +11,10 @@ import joblib
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from dataset_io import FORMATS, read_dataset, with_format
+from feature_cache import FeatureCache
+from train import cached_features
+
 DATA_DIR = "data"
 MODEL_DIR = "model"
 RESULTS_DIR = "results"
@@ -19,8 +24,8 @@ MODEL_PATH = os.path.join(MODEL_DIR, "deepsea_model_llm_v1.pkl")
 # Create results directory if it doesn't exist
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
-def load_test():
-    test_df = pd.read_csv(TEST_PATH)
+def load_test(test_path=TEST_PATH):
+    test_df = read_dataset(test_path)
     return test_df
 
 def comprehensive_evaluation(y_true, y_pred, y_proba, test_df=None):
@@ -224,15 +229,29 @@ def comprehensive_evaluation(y_true, y_pred, y_proba, test_df=None):
     }
 
 def main():
-    test_df = load_test()
+    parser = argparse.ArgumentParser(description="Evaluate the trained model on the test split")
+    parser.add_argument("--no_cache", action="store_true",
+                        help="Re-vectorize the test set instead of using the feature cache")
+    parser.add_argument("--data_format", choices=FORMATS, default="csv",
+                        help="Read the test split as csv or parquet (default: csv)")
+    args = parser.parse_args()
+
+    test_path = with_format(TEST_PATH, args.data_format)
+    test_df = load_test(test_path)
     model = joblib.load(MODEL_PATH)
 
     X_test = test_df["text"].astype(str)
     y_test = test_df["label"].astype(int)
 
+    # Vectorize once (cached per test file + fitted vectorizer), then classify
+    cache = FeatureCache(enabled=not args.no_cache)
+    X_features = cached_features(model, X_test, test_path, cache)
+    clf = model.steps[-1][1]
+
     # Get predictions and probabilities
-    y_pred = model.predict(X_test)
-    y_proba = model.predict_proba(X_test)[:, 1]  # Probability of class 1
+    y_pred = clf.predict(X_features)
+    y_proba = clf.predict_proba(X_features)[:, 1]  # Probability of class 1
+    print(cache.summary())
     
     # Comprehensive evaluation
     comprehensive_evaluation(y_test, y_pred, y_proba, test_df)
@@ -1,41 +1,251 @@
+import io
 import os
+import time
+import argparse
+import numpy as np
 import pandas as pd
 from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report
+from sklearn.metrics import accuracy_score, classification_report, f1_score, roc_auc_score
 import joblib
 
+from dataset_io import FORMATS, read_dataset, with_format
+from feature_cache import FeatureCache
+from lite_model import LiteModel, export_lite_model, lite_model_path, verify_lite_model
+
 DATA_DIR = "data"
 MODEL_DIR = "model"
+RESULTS_DIR = "results"
 TRAIN_PATH = os.path.join(DATA_DIR, "train_llm_v1.csv")
 VAL_PATH = os.path.join(DATA_DIR, "val_llm_v1.csv")
 MODEL_PATH = os.path.join(MODEL_DIR, "deepsea_model_llm_v1.pkl")
+HASHING_MODEL_PATH = os.path.join(MODEL_DIR, "deepsea_model_llm_v1_hashing.pkl")
+COMPARISON_PATH = os.path.join(RESULTS_DIR, "vectorizer_comparison.csv")
+
+VECTORIZERS = ("tfidf", "hashing")
+DEFAULT_N_FEATURES = 2 ** 18
 
-def load_train_val():
-    train_df = pd.read_csv(TRAIN_PATH)
-    val_df = pd.read_csv(VAL_PATH)
+def load_train_val(train_path=TRAIN_PATH, val_path=VAL_PATH):
+    # Only text and label are needed; Parquet reads just those columns
+    train_df = read_dataset(train_path, columns=["text", "label"])
+    val_df = read_dataset(val_path, columns=["text", "label"])
     return train_df, val_df
 
-def build_pipeline():
+def build_hashing_vectorizer(n_features=DEFAULT_N_FEATURES):
+    """
+    Stateless word/bigram hasher matching the TF-IDF tokenization.
+    No vocabulary is stored, so its size doesn't grow with the corpus.
+    """
+    return HashingVectorizer(
+        ngram_range=(1, 2),
+        n_features=n_features,
+        alternate_sign=False,  # Keep counts non-negative so TF-IDF weighting applies
+        norm=None  # Normalization happens after IDF weighting
+    )
+
+def build_classifier(C=1.0):
+    return LogisticRegression(
+        max_iter=1000,
+        class_weight="balanced",
+        C=C,  # Explicit regularization (default is 1.0, but being explicit)
+        penalty='l2'  # L2 regularization to prevent overfitting
+    )
+
+def build_pipeline(vectorizer="tfidf", n_features=DEFAULT_N_FEATURES,
+                   max_features=3000, min_df=2, C=1.0, memory=None):
+    """
+    Args:
+        vectorizer: "tfidf" (vocabulary-based TfidfVectorizer) or
+            "hashing" (HashingVectorizer + TfidfTransformer, fixed model size)
+        n_features: Number of hash buckets for the hashing vectorizer
+        max_features, min_df: TfidfVectorizer vocabulary limits (the max_features
+            default was reduced from 5000 to prevent overfitting)
+        C: Inverse regularization strength of the LogisticRegression
+        memory: Optional joblib cache (path or Memory) for fitted transformers,
+            so refitting with a different C reuses the vectorized features
+    """
+    if vectorizer == "hashing":
+        return Pipeline([
+            ("hashing", build_hashing_vectorizer(n_features)),
+            ("tfidf", TfidfTransformer(sublinear_tf=True)),
+            ("clf", build_classifier(C))
+        ], memory=memory)
+    if vectorizer != "tfidf":
+        raise ValueError(f"Unknown vectorizer: {vectorizer} (expected one of {VECTORIZERS})")
+
     pipeline = Pipeline([
         ("tfidf", TfidfVectorizer(
             ngram_range=(1, 2),
-            min_df=2,
-            max_features=3000,  # Reduced from 5000 to prevent overfitting
+            min_df=min_df,
+            max_features=max_features,
             sublinear_tf=True
         )),
-        ("clf", LogisticRegression(
-            max_iter=1000,
-            class_weight="balanced",
-            C=1.0,  # Explicit regularization (default is 1.0, but being explicit)
-            penalty='l2'  # L2 regularization to prevent overfitting
-        ))
-    ])
+        ("clf", build_classifier(C))
+    ], memory=memory)
     return pipeline
 
+def model_path_for(vectorizer):
+    return HASHING_MODEL_PATH if vectorizer == "hashing" else MODEL_PATH
+
+def split_features(model):
+    """Split a pipeline into (feature pipeline, (name, classifier))."""
+    return Pipeline(model.steps[:-1]), model.steps[-1]
+
+def fit_cached(model, X_train, y_train, data_path, cache):
+    """
+    Fit `model`, taking the vectorized training features from `cache` when the
+    same file was already vectorized with the same settings.
+    Returns the fitted pipeline.
+    """
+    features, (name, clf) = split_features(model)
+    features, X_features = cache.fit_transform(features, X_train, data_path)
+    clf.fit(X_features, y_train)
+    return Pipeline(features.steps + [(name, clf)])
+
+def cached_features(model, X, data_path, cache):
+    """Vectorize `X` (read from `data_path`) with a fitted pipeline's feature steps."""
+    features, _ = split_features(model)
+    return cache.transform(features, X, data_path)
+
+def artifact_size(model):
+    """Size in bytes of `model` as joblib would write it."""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.getbuffer().nbytes
+
+def slim_model(model):
+    """
+    Drop state that is only needed during training from a fitted pipeline:
+    - `stop_words_` (every n-gram pruned by max_features/min_df; only stored
+      by older scikit-learn releases, and documented as safe to delete)
+    - `n_iter_` solver diagnostics
+    and store the vocabulary indices as plain ints instead of numpy scalars,
+    which pickle at several times the size.
+    """
+    for _, step in model.steps:
+        if hasattr(step, "stop_words_"):
+            del step.stop_words_
+        if hasattr(step, "n_iter_"):
+            del step.n_iter_
+        if getattr(step, "vocabulary_", None) is not None:
+            step.vocabulary_ = {term: int(idx) for term, idx in step.vocabulary_.items()}
+    return model
+
+def save_model(model, path, X_check, slim=True):
+    """
+    Save the model, slimming it first unless `slim` is False.
+    Prints the artifact size before/after and checks that slimming leaves
+    the predicted probabilities on `X_check` unchanged.
+    """
+    if slim:
+        size_before = artifact_size(model)
+        proba_before = model.predict_proba(X_check)
+        slim_model(model)
+        if not np.array_equal(proba_before, model.predict_proba(X_check)):
+            raise RuntimeError("Slimming changed model predictions; refusing to save")
+
+    joblib.dump(model, path)
+    print(f"\nModel saved → {path}")
+    if slim:
+        size_after = os.path.getsize(path)
+        print(f"  Slimmed: {size_before / 1024:.1f} KB → {size_after / 1024:.1f} KB "
+              f"({(1 - size_after / size_before) * 100:.0f}% smaller, predictions unchanged)")
+
+def slim_saved_model(path, X_check, output_path=None):
+    """Slim an already-saved model file (in place unless `output_path` is given)."""
+    model = joblib.load(path)
+    save_model(model, output_path or path, X_check)
+    return model
+
+def export_lite(model, X_val, model_path=MODEL_PATH, path=None):
+    """
+    Export the fitted pipeline as a sklearn-free artifact and check that it
+    reproduces the pipeline's probabilities on the validation set.
+    """
+    path = path or lite_model_path(model_path)
+    export_lite_model(model, path)
+    max_diff = verify_lite_model(model, LiteModel.load(path), X_val)
+
+    print(f"Lite model saved → {path}")
+    print(f"  Size: {os.path.getsize(path) / 1024:.1f} KB (pipeline pickle: {os.path.getsize(model_path) / 1024:.1f} KB)")
+    if max_diff is not None:
+        print(f"  ✓ Max |Δp| vs pipeline on validation: {max_diff:.2e}")
+    return path
+
+def comparison_model_path(vectorizer):
+    """Where compare_vectorizers saves a candidate model (kept apart from the served model)."""
+    return os.path.join(RESULTS_DIR, f"vectorizer_comparison_{vectorizer}.pkl")
+
+def compare_vectorizers(X_train, y_train, X_val, y_val, n_features=DEFAULT_N_FEATURES, promote=False):
+    """
+    Train the vocabulary-based and hashing pipelines on the same split and
+    record validation accuracy alongside artifact size and load time.
+    Models are saved under results/ unless `promote` is set, in which case
+    they replace the models at MODEL_PATH / HASHING_MODEL_PATH.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    rows = []
+    for vectorizer in VECTORIZERS:
+        model = build_pipeline(vectorizer, n_features)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        path = model_path_for(vectorizer) if promote else comparison_model_path(vectorizer)
+        joblib.dump(slim_model(model), path)
+        start = time.perf_counter()
+        joblib.load(path)
+        load_seconds = time.perf_counter() - start
+
+        y_pred = model.predict(X_val)
+        y_proba = model.predict_proba(X_val)[:, 1]
+        rows.append({
+            'vectorizer': vectorizer,
+            'n_features': n_features if vectorizer == "hashing" else len(model.named_steps["tfidf"].vocabulary_),
+            'accuracy': accuracy_score(y_val, y_pred),
+            'f1_score': f1_score(y_val, y_pred),
+            'roc_auc': roc_auc_score(y_val, y_proba),
+            'fit_seconds': fit_seconds,
+            'artifact_kb': os.path.getsize(path) / 1024,
+            'load_seconds': load_seconds,
+        })
+
+    comparison = pd.DataFrame(rows)
+    print("\nVectorizer comparison (validation):")
+    print(comparison.to_string(index=False))
+    comparison.to_csv(COMPARISON_PATH, index=False)
+    print(f"\nComparison saved to {COMPARISON_PATH}")
+    return comparison
+
 def main():
-    train_df, val_df = load_train_val()
+    parser = argparse.ArgumentParser(description="Train the TF-IDF + LogisticRegression model")
+    parser.add_argument("--vectorizer", choices=VECTORIZERS, default="tfidf",
+                        help="tfidf (stored vocabulary) or hashing (fixed-size, no vocabulary) (default: tfidf)")
+    parser.add_argument("--n_features", type=int, default=DEFAULT_N_FEATURES,
+                        help=f"Hash buckets for --vectorizer hashing (default: {DEFAULT_N_FEATURES})")
+    parser.add_argument("--compare_vectorizers", action="store_true",
+                        help=f"Train both vectorizers and write an accuracy/size comparison to {COMPARISON_PATH}")
+    parser.add_argument("--promote", action="store_true",
+                        help="With --compare_vectorizers, save the trained models over the production model paths")
+    parser.add_argument("--export_lite", action="store_true",
+                        help="Also export a sklearn-free .lite.npz artifact for serving (tfidf only)")
+    parser.add_argument("--no_slim", action="store_true",
+                        help="Save the model without stripping training-only state")
+    parser.add_argument("--data_format", choices=FORMATS, default="csv",
+                        help="Read the train/val splits as csv or parquet (default: csv)")
+    parser.add_argument("--no_cache", action="store_true",
+                        help="Re-vectorize the data instead of using the feature cache")
+    parser.add_argument("--slim", type=str, metavar="MODEL_PATH",
+                        help="Slim an existing saved model in place (checked on the validation set) and exit")
+    args = parser.parse_args()
+
+    if args.export_lite and args.vectorizer != "tfidf":
+        parser.error("--export_lite is only supported with --vectorizer tfidf")
+
+    train_path = with_format(TRAIN_PATH, args.data_format)
+    val_path = with_format(VAL_PATH, args.data_format)
+    train_df, val_df = load_train_val(train_path, val_path)
 
     X_train = train_df["text"].astype(str)
     y_train = train_df["label"].astype(int)
@@ -43,15 +253,27 @@ def main():
     X_val = val_df["text"].astype(str)
     y_val = val_df["label"].astype(int)
 
-    model = build_pipeline()
-    model.fit(X_train, y_train)
+    if args.slim:
+        slim_saved_model(args.slim, X_val)
+        return
+
+    if args.compare_vectorizers:
+        compare_vectorizers(X_train, y_train, X_val, y_val, args.n_features, promote=args.promote)
+        return
+
+    cache = FeatureCache(enabled=not args.no_cache)
+    model_path = model_path_for(args.vectorizer)
+    model = fit_cached(build_pipeline(args.vectorizer, args.n_features), X_train, y_train, train_path, cache)
 
     print("\nValidation performance:")
-    y_val_pred = model.predict(X_val)
+    y_val_pred = model.steps[-1][1].predict(cached_features(model, X_val, val_path, cache))
     print(classification_report(y_val, y_val_pred, digits=3))
+    print(cache.summary())
+
+    save_model(model, model_path, X_val, slim=not args.no_slim)
 
-    joblib.dump(model, MODEL_PATH)
-    print(f"\nModel saved → {MODEL_PATH}")
+    if args.export_lite:
+        export_lite(model, X_val, model_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,220 @@
+"""
+Out-of-core / incremental training for DeepSea Communication Orientation Auditor.
+
+Streams a labeled CSV in chunks through a stateless HashingVectorizer into
+`SGDClassifier(loss="log_loss").partial_fit`, so the corpus never has to fit in
+memory. The model is checkpointed every N chunks together with the state
+recording how far into each input file training got (stored inside the model
+file, so both are replaced at once, plus a readable .state.json copy). Re-running with
+--resume continues an interrupted run, and pointing --train at a new file folds
+newly labeled data into the existing model without retraining from scratch.
+
+The checkpoint is a regular sklearn Pipeline, so it can be used by
+score.py / serve.py / app.py like the batch-trained model.
+
+Usage:
+    python src/train_online.py --train data/train_llm_v1.csv --chunk_size 5000
+    python src/train_online.py --train data/new_labels.csv --resume
+"""
+
+import os
+import sys
+import copy
+import json
+import argparse
+from typing import Dict, Optional
+
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import classification_report
+from sklearn.pipeline import Pipeline
+import joblib
+
+from dataset_io import iter_dataset_chunks, read_dataset
+from train import DEFAULT_N_FEATURES, MODEL_DIR, TRAIN_PATH, VAL_PATH, build_hashing_vectorizer
+
+ONLINE_MODEL_PATH = os.path.join(MODEL_DIR, "deepsea_model_online.pkl")
+CLASSES = np.array([0, 1])
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_CHECKPOINT_EVERY = 10
+STATE_ATTR = "online_state_"  # Pipeline attribute carrying the training state inside the checkpoint
+
+
+def state_path_for(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".state.json"
+
+
+def build_online_pipeline(n_features: int = DEFAULT_N_FEATURES, seed: int = 42) -> Pipeline:
+    """
+    Stateless hashing features + SGD logistic regression.
+    The vectorizer needs no fitting, so every chunk can be transformed
+    independently and the classifier updated with `partial_fit`.
+    """
+    vectorizer = build_hashing_vectorizer(n_features)
+    # No corpus-wide IDF is available when streaming; L2-normalize raw counts instead
+    vectorizer.set_params(norm="l2")
+    return Pipeline([
+        ("hashing", vectorizer),
+        ("clf", SGDClassifier(
+            loss="log_loss",
+            penalty="l2",
+            alpha=1e-5,
+            random_state=seed
+        ))
+    ])
+
+
+def load_state(state_path: str) -> Dict:
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"total_rows": 0, "total_chunks": 0, "files": {}}
+
+
+def checkpoint_state(model: Pipeline, state_path: str) -> Dict:
+    """Training state of a loaded checkpoint (from the state JSON only for checkpoints that predate STATE_ATTR)."""
+    state = getattr(model, STATE_ATTR, None)
+    return copy.deepcopy(state) if state is not None else load_state(state_path)
+
+
+def save_checkpoint(model: Pipeline, state: Dict, model_path: str, state_path: str):
+    """
+    Write model and state with a single atomic replace, so a crash leaves
+    either the previous checkpoint or the new one, never a mix.
+
+    The state travels inside the model artifact (as `online_state_`, ignored by
+    the scorers). The state JSON written afterwards is a readable copy that
+    resume never uses in place of the embedded state.
+    """
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    setattr(model, STATE_ATTR, copy.deepcopy(state))
+    tmp_model = model_path + ".tmp"
+    joblib.dump(model, tmp_model)
+    os.replace(tmp_model, model_path)
+
+    tmp_state = state_path + ".tmp"
+    with open(tmp_state, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_state, state_path)
+
+
+def train_online(train_path: str, model_path: str = ONLINE_MODEL_PATH, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY, n_features: int = DEFAULT_N_FEATURES,
+                 resume: bool = False, seed: int = 42) -> Pipeline:
+    """
+    Stream `train_path` through partial_fit, checkpointing every `checkpoint_every` chunks.
+
+    Args:
+        train_path: Labeled CSV/Parquet with `text` and `label` columns
+        model_path: Checkpoint location (a state JSON is written next to it)
+        chunk_size: Rows per partial_fit call
+        checkpoint_every: Save model + state after this many chunks
+        n_features: Hash buckets (ignored when resuming; the checkpoint's value is kept)
+        resume: Continue from the existing checkpoint instead of starting fresh
+        seed: Random seed for SGD
+
+    Returns:
+        The trained pipeline
+    """
+    state_path = state_path_for(model_path)
+
+    if resume and os.path.exists(model_path):
+        model = joblib.load(model_path)
+        state = checkpoint_state(model, state_path)
+        print(f"Resuming from {model_path} ({state['total_rows']} rows seen so far)")
+    else:
+        model = build_online_pipeline(n_features, seed)
+        state = load_state("")  # fresh state
+
+    vectorizer = model.named_steps["hashing"]
+    clf = model.named_steps["clf"]
+
+    file_key = os.path.abspath(train_path)
+    file_state = state["files"].setdefault(file_key, {"chunks_done": 0, "rows_done": 0})
+    # Skip by rows, not chunks: a resumed run may use a different --chunk_size
+    skip_rows = file_state["rows_done"]
+    if skip_rows:
+        print(f"Skipping {skip_rows} rows of {train_path} already trained on")
+
+    chunks_since_checkpoint = 0
+    rows_read = 0
+    for chunk in iter_dataset_chunks(train_path, chunk_size, columns=["text", "label"]):
+        chunk_start = rows_read
+        rows_read += len(chunk)
+        if rows_read <= skip_rows:
+            continue
+        if chunk_start < skip_rows:
+            chunk = chunk.iloc[skip_rows - chunk_start:]
+
+        X = vectorizer.transform(chunk["text"].astype(str))
+        y = chunk["label"].astype(int).to_numpy()
+        clf.partial_fit(X, y, classes=CLASSES)
+
+        file_state["chunks_done"] += 1
+        file_state["rows_done"] += len(chunk)
+        state["total_rows"] += len(chunk)
+        state["total_chunks"] += 1
+        chunks_since_checkpoint += 1
+        print(f"  Chunk {file_state['chunks_done']}: {file_state['rows_done']} rows from this file, "
+              f"{state['total_rows']} total")
+
+        if chunks_since_checkpoint >= checkpoint_every:
+            save_checkpoint(model, state, model_path, state_path)
+            chunks_since_checkpoint = 0
+            print(f"  ✓ Checkpoint saved → {model_path}")
+
+    if not hasattr(clf, "coef_"):
+        raise ValueError(f"No rows were trained on: {train_path} is empty or was already fully consumed")
+
+    save_checkpoint(model, state, model_path, state_path)
+    print(f"\n✓ Model saved → {model_path} ({state['total_rows']} rows seen in total)")
+    return model
+
+
+def evaluate(model: Pipeline, val_path: Optional[str]):
+    if not val_path or not os.path.exists(val_path):
+        return
+    val_df = read_dataset(val_path, columns=["text", "label"])
+    y_pred = model.predict(val_df["text"].astype(str))
+    print("\nValidation performance:")
+    print(classification_report(val_df["label"].astype(int), y_pred, digits=3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core training with HashingVectorizer + SGD partial_fit")
+    parser.add_argument("--train", type=str, default=TRAIN_PATH,
+                        help=f"Labeled CSV/Parquet to stream (default: {TRAIN_PATH})")
+    parser.add_argument("--val", type=str, default=VAL_PATH,
+                        help=f"Validation CSV/Parquet evaluated at the end, if it exists (default: {VAL_PATH})")
+    parser.add_argument("--model", type=str, default=ONLINE_MODEL_PATH,
+                        help=f"Checkpoint path (default: {ONLINE_MODEL_PATH})")
+    parser.add_argument("--chunk_size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per partial_fit call (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--checkpoint_every", type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help=f"Checkpoint after this many chunks (default: {DEFAULT_CHECKPOINT_EVERY})")
+    parser.add_argument("--n_features", type=int, default=DEFAULT_N_FEATURES,
+                        help=f"Hash buckets for a new model (default: {DEFAULT_N_FEATURES})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the existing checkpoint (skips rows already trained on)")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed (default: 42)")
+
+    args = parser.parse_args()
+
+    if args.chunk_size <= 0 or args.checkpoint_every <= 0:
+        print("❌ Error: --chunk_size and --checkpoint_every must be positive")
+        return 1
+
+    try:
+        model = train_online(args.train, args.model, args.chunk_size, args.checkpoint_every,
+                             args.n_features, args.resume, args.seed)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"\n❌ Error: {e}")
+        return 1
+
+    evaluate(model, args.val)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
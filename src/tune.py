@@ -0,0 +1,144 @@
+"""
+Hyperparameter search for the TF-IDF + LogisticRegression pipeline.
+
+Runs a grouped cross-validated grid search over `max_features`, `min_df` and
+`C`. Folds are grouped by `scenario_id` / `template_id` (like split_data.py),
+so no scenario appears in both the training and the scoring fold. Candidates
+run in parallel across all cores, and the pipeline caches fitted vectorizers
+with `Pipeline(memory=...)`, so configurations that differ only in `C` reuse
+the same TF-IDF features instead of re-tokenizing the corpus.
+
+Usage:
+    python src/tune.py
+    python src/tune.py --C 0.1 0.3 1 3 --max_features 2000 3000 5000 --min_df 1 2 3 --n_splits 5
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+from joblib import Memory
+from sklearn.model_selection import GridSearchCV, GroupKFold
+
+from dataset_io import read_dataset
+from split_data import get_group_column
+from train import RESULTS_DIR, TRAIN_PATH, build_pipeline
+
+LEADERBOARD_PATH = os.path.join(RESULTS_DIR, "tuning_leaderboard.csv")
+CACHE_DIR = os.path.join("cache", "tune")
+
+DEFAULT_MAX_FEATURES = [1000, 3000, 5000]
+DEFAULT_MIN_DF = [1, 2, 3]
+DEFAULT_C = [0.1, 0.3, 1.0, 3.0, 10.0]
+SCORING = {"f1": "f1", "accuracy": "accuracy", "roc_auc": "roc_auc"}
+
+
+def tune(data_path: str, max_features, min_df, C, n_splits: int = 5, n_jobs: int = -1,
+         cache_dir: str = CACHE_DIR, output_path: str = LEADERBOARD_PATH) -> pd.DataFrame:
+    """
+    Grid-search the pipeline with grouped K-fold CV and write a leaderboard.
+
+    Args:
+        data_path: Labeled CSV/Parquet with `text`, `label` and a group column
+        max_features, min_df, C: Candidate values for each hyperparameter
+        n_splits: Number of grouped CV folds
+        n_jobs: Parallel jobs (-1 = all cores)
+        cache_dir: Directory for the Pipeline(memory=...) transformer cache
+        output_path: Leaderboard CSV destination
+
+    Returns:
+        Leaderboard DataFrame sorted by mean F1
+    """
+    df = read_dataset(data_path)
+    group_column = get_group_column(df)
+    X = df["text"].astype(str)
+    y = df["label"].astype(int)
+    groups = df[group_column]
+
+    n_groups = groups.nunique()
+    if n_groups < n_splits:
+        raise ValueError(f"Only {n_groups} unique {group_column}s; need at least {n_splits} for {n_splits}-fold CV")
+
+    param_grid = {
+        "tfidf__max_features": max_features,
+        "tfidf__min_df": min_df,
+        "clf__C": C,
+    }
+    n_candidates = len(max_features) * len(min_df) * len(C)
+    print(f"Tuning on {len(df)} samples ({n_groups} unique {group_column}s)")
+    print(f"{n_candidates} configurations × {n_splits} grouped folds = {n_candidates * n_splits} fits\n")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    search = GridSearchCV(
+        build_pipeline(memory=Memory(cache_dir, verbose=0)),
+        param_grid,
+        scoring=SCORING,
+        refit=False,
+        cv=GroupKFold(n_splits=n_splits),
+        n_jobs=n_jobs,
+        verbose=1,
+    )
+
+    start = time.perf_counter()
+    search.fit(X, y, groups=groups)
+    elapsed = time.perf_counter() - start
+
+    results = pd.DataFrame(search.cv_results_)
+    leaderboard = pd.DataFrame({
+        "rank": results["rank_test_f1"],
+        "max_features": results["param_tfidf__max_features"],
+        "min_df": results["param_tfidf__min_df"],
+        "C": results["param_clf__C"],
+        "mean_f1": results["mean_test_f1"],
+        "std_f1": results["std_test_f1"],
+        "mean_accuracy": results["mean_test_accuracy"],
+        "mean_roc_auc": results["mean_test_roc_auc"],
+        "mean_fit_seconds": results["mean_fit_time"],
+        "mean_score_seconds": results["mean_score_time"],
+    }).sort_values(["rank", "mean_fit_seconds"])
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    leaderboard.to_csv(output_path, index=False)
+
+    print(f"\nSearch finished in {elapsed:.1f}s")
+    print("\nTop 10 configurations (grouped CV):")
+    print(leaderboard.head(10).to_string(index=False))
+    print(f"\nLeaderboard saved to {output_path}")
+    return leaderboard
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grouped CV hyperparameter search for the TF-IDF + LogReg pipeline")
+    parser.add_argument("--data", type=str, default=TRAIN_PATH,
+                        help=f"Labeled CSV/Parquet to tune on (default: {TRAIN_PATH})")
+    parser.add_argument("--max_features", type=int, nargs="+", default=DEFAULT_MAX_FEATURES,
+                        help=f"Candidate TF-IDF max_features (default: {DEFAULT_MAX_FEATURES})")
+    parser.add_argument("--min_df", type=int, nargs="+", default=DEFAULT_MIN_DF,
+                        help=f"Candidate TF-IDF min_df (default: {DEFAULT_MIN_DF})")
+    parser.add_argument("--C", type=float, nargs="+", default=DEFAULT_C,
+                        help=f"Candidate LogisticRegression C (default: {DEFAULT_C})")
+    parser.add_argument("--n_splits", type=int, default=5,
+                        help="Number of grouped CV folds (default: 5)")
+    parser.add_argument("--n_jobs", type=int, default=-1,
+                        help="Parallel jobs, -1 for all cores (default: -1)")
+    parser.add_argument("--cache_dir", type=str, default=CACHE_DIR,
+                        help=f"Transformer cache directory (default: {CACHE_DIR})")
+    parser.add_argument("--output", type=str, default=LEADERBOARD_PATH,
+                        help=f"Leaderboard CSV path (default: {LEADERBOARD_PATH})")
+
+    args = parser.parse_args()
+
+    try:
+        tune(args.data, args.max_features, args.min_df, args.C, args.n_splits,
+             args.n_jobs, args.cache_dir, args.output)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"\n❌ Error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
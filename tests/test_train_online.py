@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+import pytest
+from sklearn.linear_model import SGDClassifier
+
+import train_online
+
+N_ROWS = 50
+CHUNK_SIZE = 10
+
+
+@pytest.fixture
+def train_csv(tmp_path):
+    path = tmp_path / "train.csv"
+    pd.DataFrame({
+        "text": [f"conversation number {i} about topic {i % 7}" for i in range(N_ROWS)],
+        "label": [i % 2 for i in range(N_ROWS)],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_crash_between_model_and_state_writes_does_not_replay_rows(train_csv, tmp_path, monkeypatch):
+    model_path = str(tmp_path / "online.pkl")
+    real_replace = os.replace
+    replaced = []
+
+    def crash_before_second_state_write(src, dst):
+        # Checkpoint writes alternate model, state JSON; die right after the second model write
+        replaced.append(dst)
+        if len(replaced) == 4:
+            raise RuntimeError("simulated crash")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(train_online.os, "replace", crash_before_second_state_write)
+    with pytest.raises(RuntimeError, match="simulated crash"):
+        train_online.train_online(train_csv, model_path, chunk_size=CHUNK_SIZE, checkpoint_every=1)
+    monkeypatch.setattr(train_online.os, "replace", real_replace)
+
+    # The state JSON on disk is one checkpoint behind the model
+    assert train_online.load_state(train_online.state_path_for(model_path))["total_rows"] == CHUNK_SIZE
+
+    fitted_rows = []
+    real_partial_fit = SGDClassifier.partial_fit
+
+    def counting_partial_fit(self, X, y, *args, **kwargs):
+        fitted_rows.append(X.shape[0])
+        return real_partial_fit(self, X, y, *args, **kwargs)
+
+    monkeypatch.setattr(SGDClassifier, "partial_fit", counting_partial_fit)
+    model = train_online.train_online(train_csv, model_path, chunk_size=CHUNK_SIZE, checkpoint_every=1, resume=True)
+
+    assert sum(fitted_rows) == N_ROWS - 2 * CHUNK_SIZE
+    state = getattr(model, train_online.STATE_ATTR)
+    assert state["total_rows"] == N_ROWS
+    assert train_online.load_state(train_online.state_path_for(model_path))["total_rows"] == N_ROWS